@@ -0,0 +1,170 @@
+import re
+from typing import Dict, List, Iterable, Tuple
+
+import segmenter
+
+# 패턴 테이블
+# app.py의 detect_section_type / count_evidence_points / analyze_argument_structure가
+# 쓰던 패턴을 그대로 옮겨 왔고, import 시 하나의 정규식으로 한 번만 컴파일한다.
+
+# 서론 패턴 ('저는' 뒤 같은 줄에 입장 표현이 나와야 함)
+INTRO_STANCE_PATTERNS = ['찬성합니다', '반대합니다']
+INTRO_PATTERNS = ['입장입니다', '생각합니다', '주장합니다']
+
+# 결론 패턴
+CONCLUSION_PATTERNS = ['따라서', '결론적으로', '마지막으로', '정리하면', '종합해보면']
+
+# 번호 패턴 (근거 1~4, 숫자 번호는 문장 맨 앞에 올 때만 셈)
+NUMBERED_PATTERNS = [
+    r'첫째|첫 번째|1\.',
+    r'둘째|두 번째|2\.',
+    r'셋째|세 번째|3\.',
+    r'넷째|네 번째|4\.'
+]
+
+# 출처 표지 (보강자료)
+SOURCE_MARKERS = ['에 따르면', '연구에서', '조사 결과']
+
+# 출처 이름에 쓰일 수 있는 문자 ([가-힣A-Za-z0-9\s]) 밖의 문자는 출처 구간을 끊는다
+SOURCE_CHAR_CLASS = r'가-힣A-Za-z0-9\s'
+
+MAX_EVIDENCE = 4
+
+
+# 모든 패턴이 리터럴이므로 하나의 교대(alternation) 정규식으로 묶고
+# 찾은 토큰 문자열을 종류로 되돌리는 표를 함께 만든다
+_TOKEN_KIND = {'저는': 'jeoneun', '\n': 'newline', '통계': 'stat'}
+_TOKEN_KIND.update({p: 'stance' for p in INTRO_STANCE_PATTERNS})
+_TOKEN_KIND.update({p: 'intro' for p in INTRO_PATTERNS})
+_TOKEN_KIND.update({p: 'conclusion' for p in CONCLUSION_PATTERNS})
+_TOKEN_KIND.update({p: 'source' for p in SOURCE_MARKERS})
+for _i, _group in enumerate(NUMBERED_PATTERNS):
+    for _p in _group.split('|'):
+        if not _p[0].isdigit():
+            _TOKEN_KIND[_p] = _i
+
+_NUMBERED_KINDS = frozenset(range(len(NUMBERED_PATTERNS)))
+
+_COMBINED = re.compile('|'.join(re.escape(t) for t in _TOKEN_KIND))
+
+# 숫자 번호 후보 ('3.5%', '1.5배' 같은 소수는 앞뒤 숫자로 제외하고, 나머지는 문장 시작인지 따로 확인)
+# 숫자로 시작해야 정규식 엔진이 후보 글자만 빠르게 찾으므로 앞 숫자 검사는 뒤로 미룸
+_DIGIT_MARKER = re.compile(r'([1-%d])(?<!\d\d)\.(?!\d)' % len(NUMBERED_PATTERNS))
+
+# 출처 표지와, 표지 바로 앞의 출처 이름 구간 (뒤집은 문자열에서 앞으로 매칭)
+_SOURCE_MARKER = re.compile('|'.join(re.escape(p) for p in SOURCE_MARKERS))
+_SOURCE_RUN = re.compile(f'[{SOURCE_CHAR_CLASS}]*')
+
+
+def _source_spans(text: str) -> List[Tuple[int, int]]:
+    """각 구간에서 마지막 출처 표지 앞부분을 출처로 본다 (기존 findall의 탐욕적 매칭과 동일)"""
+    reversed_text = text[::-1]
+    length = len(text)
+    spans = {}
+    for m in _SOURCE_MARKER.finditer(text):
+        end = m.start()
+        tail = length - end
+        start = end - (_SOURCE_RUN.match(reversed_text, tail).end() - tail)
+        if end > start:
+            spans[start] = end
+    return list(spans.items())
+
+
+def _count_evidence(text: str, kinds: set) -> int:
+    """본론의 근거 수: 번호가 있으면 번호 종류 수, 없으면 문장 수
+
+    '1.' 같은 숫자 번호는 분할기가 번호로 보고 끊지 않은 자리, 즉 문장 맨 앞에 있을 때만 센다.
+    """
+    numbered = set(kinds.intersection(_NUMBERED_KINDS))
+    spans = None
+    # 이미 센 번호는 다시 확인하지 않음 (분할기는 확인할 숫자 번호가 남았을 때만 돌림)
+    digits = [m for m in _DIGIT_MARKER.finditer(text) if int(m.group(1)) - 1 not in numbered]
+    if digits:
+        spans = segmenter.sentence_spans(text)
+        starts = {start for start, _ in spans}
+        numbered.update(int(m.group(1)) - 1 for m in digits if m.start() in starts)
+    if numbered:
+        return len(numbered)
+    if spans is None:
+        spans = segmenter.sentence_spans(text)
+    return len(spans) or 1
+
+
+def scan(text: str) -> Dict:
+    """텍스트를 한 번만 훑어 섹션 타입, 근거 개수, 출처 구간을 함께 계산"""
+
+    tokens = _COMBINED.findall(text)
+    kinds = set(map(_TOKEN_KIND.__getitem__, tokens))
+
+    has_conclusion = 'conclusion' in kinds
+    has_intro = 'intro' in kinds
+    if not has_intro and 'stance' in kinds and 'jeoneun' in kinds:
+        # '저는'과 입장 표현이 같은 줄에 있을 때만 서론
+        jeoneun_on_line = False
+        for token in tokens:
+            kind = _TOKEN_KIND[token]
+            if kind == 'newline':
+                jeoneun_on_line = False
+            elif kind == 'jeoneun':
+                jeoneun_on_line = True
+            elif kind == 'stance' and jeoneun_on_line:
+                has_intro = True
+                break
+
+    has_source = 'source' in kinds
+    has_reinforcement = has_source or 'stat' in kinds
+
+    # 결론 패턴이 서론 패턴보다 우선
+    if has_conclusion:
+        section_type = 'conclusion'
+    elif has_intro:
+        section_type = 'intro'
+    else:
+        section_type = 'body'
+
+    # 근거 수는 본론만 셈 (번호가 없으면 소수점, URL, '~니다'로 끝나는 문장을 구분하는 분할기로 문장 수)
+    evidence_count = _count_evidence(text, kinds) if section_type == 'body' else 0
+
+    source_spans = _source_spans(text) if has_source else []
+
+    return {
+        'section_type': section_type,
+        'evidence_count': min(evidence_count, MAX_EVIDENCE),
+        'has_reinforcement': has_reinforcement,
+        'sources': [text[s:e] for s, e in source_spans],
+        'source_spans': source_spans
+    }
+
+
+def analyze(text: str) -> Dict:
+    """analyze_argument_structure와 같은 형태의 논증 구조를 단일 패스로 생성"""
+
+    result = scan(text)
+    section_type = result['section_type']
+
+    structure = {
+        'section_type': section_type,
+        'has_claim': False,
+        'has_evidence': False,
+        'has_reinforcement': False,
+        'evidence_count': 0,
+        'sources': [],
+        'source_spans': []
+    }
+
+    if section_type == 'intro' or section_type == 'conclusion':
+        structure['has_claim'] = True
+    else:
+        structure['has_evidence'] = True
+        structure['evidence_count'] = result['evidence_count']
+        if result['has_reinforcement']:
+            structure['has_reinforcement'] = True
+            structure['sources'] = result['sources']
+            structure['source_spans'] = result['source_spans']
+
+    return structure
+
+
+def analyze_batch(texts: Iterable[str]) -> List[Dict]:
+    """여러 학생의 글을 한 번에 분석 (입력 순서 유지)"""
+    return [analyze(text) for text in texts]
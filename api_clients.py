@@ -0,0 +1,242 @@
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict
+
+import metrics
+from scheduler import Scheduler, scheduler as shared_scheduler
+
+UPSTAGE_BASE_URL = os.environ.get("UPSTAGE_BASE_URL", "https://api.upstage.ai/v1")
+PERPLEXITY_BASE_URL = os.environ.get("PERPLEXITY_BASE_URL", "https://api.perplexity.ai")
+
+# 전송 계층 설정 (환경 변수로 조정 가능)
+API_DEADLINE = float(os.environ.get("API_DEADLINE", 20))               # 호출 한 번(재시도 포함)의 최대 시간(초)
+API_CONNECT_TIMEOUT = float(os.environ.get("API_CONNECT_TIMEOUT", 5))  # 연결 시간 제한(초)
+API_MAX_RETRIES = int(os.environ.get("API_MAX_RETRIES", 2))            # 429/5xx/연결 오류 재시도 횟수
+API_BACKOFF_BASE = float(os.environ.get("API_BACKOFF_BASE", 0.5))      # 지수 백오프 시작 값(초)
+API_BACKOFF_MAX = float(os.environ.get("API_BACKOFF_MAX", 8))          # 백오프 최대 값(초)
+API_POOL_SIZE = int(os.environ.get("API_POOL_SIZE", 50))               # 공유 keep-alive 연결 수
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("BREAKER_FAILURE_THRESHOLD", 5))
+BREAKER_RESET_SECONDS = float(os.environ.get("BREAKER_RESET_SECONDS", 30))
+
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """제공자가 연속으로 실패해 호출을 바로 차단한 경우"""
+
+
+# 서킷 브레이커
+class CircuitBreaker:
+    """연속 실패가 기준을 넘으면 일정 시간 호출을 막고, 이후 한 번 시험 호출을 허용"""
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if now - self.opened_at >= self.reset_seconds:
+            return 'half_open'
+        return 'open'
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == 'open' or (state == 'half_open' and self._trial_in_flight):
+                raise CircuitOpenError(f"{self.name} API가 일시적으로 응답하지 않습니다.")
+            if state == 'half_open':
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+# openai/httpx는 import에 0.5초 이상 걸리므로 첫 API 호출(또는 warm_up) 때 불러온다
+def _is_retryable(error: Exception) -> bool:
+    from openai import APIConnectionError, APIStatusError, APITimeoutError
+    if isinstance(error, (APITimeoutError, APIConnectionError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRY_STATUS_CODES
+    return False
+
+
+def _retry_after(error: Exception):
+    """429 응답의 Retry-After 헤더(초)"""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = API_BACKOFF_BASE, cap: float = API_BACKOFF_MAX) -> float:
+    """지수 백오프에 full jitter 적용"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+# 재시도/데드라인/서킷 브레이커를 적용한 클라이언트
+class ResilientClient:
+    """OpenAI 클라이언트와 같은 `chat.completions.create` 인터페이스를 제공하는 래퍼
+
+    client 대신 factory를 주면 실제 SDK 클라이언트는 처음 쓸 때 만든다.
+    """
+
+    def __init__(self, name: str, client=None, deadline: float = API_DEADLINE,
+                 max_retries: int = API_MAX_RETRIES, breaker: CircuitBreaker = None,
+                 scheduler: Scheduler = None, factory: Callable = None):
+        self.name = name
+        self._client = client
+        self._factory = factory
+        self._client_lock = threading.Lock()
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker(name)
+        self.scheduler = scheduler or shared_scheduler
+        self.chat = _Chat(self)
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def call(self, func, **kwargs):
+        """API 호출 시간과 응답의 토큰 사용량을 기록"""
+        model = kwargs.get('model', '')
+        with metrics.span(f"api.{self.name}.{model}"):
+            result = self._call_with_retries(func, **kwargs)
+        metrics.record_usage(self.name, model, getattr(result, 'usage', None))
+        return result
+
+    def _call_with_retries(self, func, **kwargs):
+        """데드라인 안에서 재시도 가능한 오류만 지터 백오프로 재시도 (시도마다 스케줄러 차례를 받음)"""
+        import httpx
+        deadline = time.monotonic() + kwargs.pop('deadline', self.deadline)
+        priority = kwargs.pop('priority', 'normal')
+        model = kwargs.get('model', '')
+        attempt = 0
+        while True:
+            waited = self.scheduler.acquire(self.name, model, priority,
+                                            timeout=max(deadline - time.monotonic(), 0))
+            metrics.observe(f"scheduler.{self.name}.wait", waited)
+            self.breaker.before_call()
+            remaining = max(deadline - time.monotonic(), 0.1)
+            call_start = time.perf_counter()
+            try:
+                result = func(timeout=httpx.Timeout(remaining, connect=min(API_CONNECT_TIMEOUT, remaining)), **kwargs)
+            except Exception as e:
+                if not _is_retryable(e):
+                    # 400/401 같은 오류는 제공자가 응답한 것이므로 장애로 세지 않음
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                delay = _retry_after(e) or backoff_delay(attempt)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            # 대기열 대기와 재시도 백오프를 뺀 제공자 응답 시간 (라우터가 제공자 지연으로 씀)
+            metrics.observe(f"api.{self.name}.{model}.provider", time.perf_counter() - call_start)
+            return result
+
+
+class _Completions:
+    def __init__(self, owner: ResilientClient):
+        self._owner = owner
+
+    def create(self, **kwargs):
+        return self._owner.call(self._owner.client.chat.completions.create, **kwargs)
+
+
+class _Chat:
+    def __init__(self, owner: ResilientClient):
+        self.completions = _Completions(owner)
+
+
+def create_http_client(pool_size: int = API_POOL_SIZE):
+    """두 제공자가 함께 쓰는 keep-alive 연결 풀 (httpx.Client)"""
+    import httpx
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size, keepalive_expiry=60),
+        timeout=httpx.Timeout(API_DEADLINE, connect=API_CONNECT_TIMEOUT)
+    )
+
+
+# API 클라이언트 생성
+def create_clients(upstage_key: str = None, perplexity_key: str = None, http_client=None) -> Dict:
+    """Upstage/Perplexity 클라이언트 생성 (키가 없으면 환경 변수 사용, 둘 다 없으면 빈 dict)
+
+    SDK 클라이언트와 연결 풀은 첫 호출 때 만들어지므로 여기서는 openai를 import하지 않는다.
+    """
+    if not upstage_key:
+        upstage_key = os.environ.get("UPSTAGE_API_KEY", None)
+    if not perplexity_key:
+        perplexity_key = os.environ.get("PERPLEXITY_API_KEY", None)
+
+    clients = {}
+    if not (upstage_key or perplexity_key):
+        return clients
+
+    shared = {'http_client': http_client}
+    lock = threading.Lock()
+
+    def sdk_client(api_key: str, base_url: str):
+        def factory():
+            from openai import OpenAI
+            with lock:
+                if shared['http_client'] is None:
+                    shared['http_client'] = create_http_client()
+            # 재시도는 ResilientClient가 담당하므로 SDK 자체 재시도는 끔
+            return OpenAI(api_key=api_key, base_url=base_url, http_client=shared['http_client'], max_retries=0)
+        return factory
+
+    if upstage_key:
+        clients['upstage'] = ResilientClient('upstage', factory=sdk_client(upstage_key, UPSTAGE_BASE_URL))
+
+    if perplexity_key:
+        clients['perplexity'] = ResilientClient('perplexity', factory=sdk_client(perplexity_key, PERPLEXITY_BASE_URL))
+
+    return clients
+
+
+def warm_up(clients: Dict) -> threading.Thread:
+    """SDK import와 클라이언트 생성을 백그라운드 스레드에서 미리 해 둠 (첫 제출 지연 방지)"""
+    def build():
+        for client in clients.values():
+            client.client
+    thread = threading.Thread(target=build, name="api-warm-up", daemon=True)
+    thread.start()
+    return thread
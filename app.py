@@ -1,9 +1,46 @@
 import streamlit as st
+import functools
+import hmac
+import html
 import os
-import re
-from openai import OpenAI
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 
+import analyzer
+import metrics
+from api_clients import create_clients, warm_up
+from scheduler import scheduler
+from fact_cache import FactCheckCache
+from feedback_cache import FeedbackCache
+from fact_check import extract_claims, iter_fact_check_events, run_fact_checks
+from dossier import load_dossier, prefetch as prefetch_dossier
+from reference_index import add_documents, load_index
+from coaching import CoachingReply, FeedbackStream
+from session_store import create_session_store
+from class_stats import ALL as ALL_CLASSES, create_class_stats
+from essay_state import EssayState
+
+# 코칭 피드백을 토큰 단위로 스트리밍할지 여부
+STREAM_COACHING = os.environ.get("STREAM_COACHING", "1") != "0"
+
+# 사이드바에 교사용 메뉴(참고 자료, 성능 지표) 로그인 칸 표시 여부 (?admin=1로도 표시)
+ADMIN_PANEL = os.environ.get("ADMIN_PANEL", "0") == "1"
+
+# 한 번에 표시할 최근 메시지 수 (이전 대화는 같은 크기의 페이지로 표시)
+HISTORY_WINDOW = int(os.environ.get("HISTORY_WINDOW", 20))
+
+# 주소에 ?class=가 없을 때 학급 이름 (교사는 학급별 주소를 나눠 줌)
+DEFAULT_CLASS = os.environ.get("DEFAULT_CLASS", "미지정")
+
+# 자동 팩트체크 백그라운드 작업 수와 결과 확인 주기(초)
+BACKGROUND_WORKERS = int(os.environ.get("BACKGROUND_WORKERS", 8))
+AUTO_FACT_CHECK_POLL_SECONDS = 2
+
+# 지연 예산을 넘겨 템플릿으로 먼저 답한 코칭의 LLM 응답 확인 주기(초)
+LATE_COACHING_POLL_SECONDS = 1
+
 # 페이지 설정
 st.set_page_config(
     page_title="토론 논증 코칭 챗봇",
@@ -11,110 +48,131 @@ st.set_page_config(
     layout="wide"
 )
 
-# CSS 스타일
-st.markdown("""
-<style>
-    .main-header {
-        text-align: center;
-        padding: 20px;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border-radius: 10px;
-        margin-bottom: 30px;
-    }
-    .argument-structure {
-        background-color: #f0f2f6;
-        padding: 20px;
-        border-radius: 10px;
-        margin-bottom: 20px;
-    }
-    .claim-box {
-        background-color: #e8f4f8;
-        padding: 15px;
-        border-left: 4px solid #1e88e5;
-        border-radius: 5px;
-        margin-bottom: 10px;
-    }
-    .evidence-box {
-        background-color: #fff3e0;
-        padding: 15px;
-        border-left: 4px solid #fb8c00;
-        border-radius: 5px;
-        margin-bottom: 10px;
-    }
-    .reinforcement-box {
-        background-color: #e8f5e9;
-        padding: 15px;
-        border-left: 4px solid #43a047;
-        border-radius: 5px;
-        margin-bottom: 10px;
-    }
-    .fact-check-box {
-        background-color: #fce4ec;
-        padding: 15px;
-        border-left: 4px solid #e91e63;
-        border-radius: 5px;
-        margin-bottom: 10px;
-    }
-    .coaching-feedback {
-        background-color: #f5f5f5;
-        padding: 20px;
-        border-radius: 10px;
-        margin-top: 20px;
-    }
-    .progress-indicator {
-        padding: 10px;
-        background-color: #e3f2fd;
-        border-radius: 5px;
-        margin-bottom: 20px;
-    }
-    .chat-message {
-        padding: 15px;
-        border-radius: 10px;
-        margin-bottom: 10px;
-    }
-    .user-message {
-        background-color: #e6f7ff;
-        margin-left: 20%;
-    }
-    .assistant-message {
-        background-color: #f0f0f0;
-        margin-right: 20%;
-    }
-</style>
-""", unsafe_allow_html=True)
+# CSS 스타일 (정적 파일을 프로세스당 한 번만 읽고, 매 실행에는 같은 문자열을 그대로 내보냄)
+STYLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "style.css")
+
+@st.cache_resource
+def load_style() -> str:
+    with open(STYLE_PATH, encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+st.markdown(load_style(), unsafe_allow_html=True)
+
+# 매 실행마다 같은 정적 UI 조각
+HEADER_HTML = '<div class="main-header"><h1>🎓 토론 논증 코칭 챗봇</h1><p>체계적인 논증 구조를 만들어 설득력을 높이세요!</p></div>'
+EXAMPLE_TOPICS = [
+    "인공지능을 활용한 수행평가",
+    "학교 내 스마트폰 사용",
+    "온라인 수업의 효과성",
+    "청소년 게임 시간 제한",
+    "학생 자치권 확대"
+]
 
 # API 클라이언트 초기화
+def get_secret(name: str):
+    try:
+        return st.secrets.get(name, None)
+    except FileNotFoundError:
+        # secrets.toml이 없는 로컬 실행에서는 환경 변수 사용
+        return None
+
+# 교사 확인 (TEACHER_PASSWORD를 secrets 또는 환경 변수로 설정)
+def require_teacher(key: str) -> bool:
+    """이 세션이 교사 비밀번호를 확인했는지 (아직이면 입력 칸을 보여 주고 False)"""
+    if st.session_state.get('teacher_verified'):
+        return True
+    password = get_secret("TEACHER_PASSWORD") or os.environ.get("TEACHER_PASSWORD", "")
+    if not password:
+        st.caption("🔒 교사용 기능을 쓰려면 TEACHER_PASSWORD를 설정하세요.")
+        return False
+    entered = st.text_input("🔒 교사 비밀번호", type="password", key=f"teacher_password_{key}")
+    if not entered:
+        return False
+    if not hmac.compare_digest(entered.encode('utf-8'), password.encode('utf-8')):
+        st.error("비밀번호가 맞지 않습니다.")
+        return False
+    st.session_state.teacher_verified = True
+    return True
+
 @st.cache_resource
 def init_clients():
-    upstage_key = st.secrets.get("UPSTAGE_API_KEY", None)
-    if not upstage_key:
-        upstage_key = os.environ.get("UPSTAGE_API_KEY", None)
-    
-    perplexity_key = st.secrets.get("PERPLEXITY_API_KEY", None)
-    if not perplexity_key:
-        perplexity_key = os.environ.get("PERPLEXITY_API_KEY", None)
-    
-    clients = {}
-    
-    if upstage_key:
-        clients['upstage'] = OpenAI(
-            api_key=upstage_key,
-            base_url="https://api.upstage.ai/v1"
-        )
-    
-    if perplexity_key:
-        clients['perplexity'] = OpenAI(
-            api_key=perplexity_key,
-            base_url="https://api.perplexity.ai"
-        )
-    
+    clients = create_clients(
+        upstage_key=get_secret("UPSTAGE_API_KEY"),
+        perplexity_key=get_secret("PERPLEXITY_API_KEY")
+    )
+    # 첫 화면은 openai 없이 그리고, SDK는 학생이 글을 쓰는 동안 백그라운드에서 준비
+    warm_up(clients)
     return clients
 
+# 팩트체크 결과 캐시 (모든 세션이 공유)
+@st.cache_resource
+def init_fact_cache():
+    return FactCheckCache()
+
+# 코칭 피드백 캐시 (모든 세션이 공유)
+@st.cache_resource
+def init_feedback_cache():
+    return FeedbackCache()
+
+# 백그라운드 작업 실행기 (모든 세션이 공유)
+@st.cache_resource
+def init_background_executor():
+    return ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix="auto-fact-check")
+
+# 대화 기록 저장소 (모든 세션이 공유)
+@st.cache_resource
+def init_session_store():
+    return create_session_store()
+
+# 학급별 누적 집계 (모든 세션이 공유)
+@st.cache_resource
+def init_class_stats():
+    return create_class_stats()
+
+# 세션 설정으로 저장할 항목
+SESSION_META_KEYS = ('debate_topic', 'user_position', 'last_section', 'coaching_started', 'essay_state', 'class_id')
+
+def save_session_meta():
+    init_session_store().save_meta(
+        st.session_state.session_id,
+        {key: st.session_state[key] for key in SESSION_META_KEYS}
+    )
+
+# 세션 시작/이어하기
+def load_session(session_id: str = None):
+    """세션 ID가 저장소에 있으면 설정과 최근 기록만 불러오고, 없으면 새 세션 시작 (ID는 주소의 ?sid=로 유지)"""
+    store = init_session_store()
+    meta = store.load_meta(session_id) if session_id else None
+    if meta is None:
+        session_id = uuid.uuid4().hex
+    st.session_state.session_id = session_id
+    st.query_params["sid"] = session_id
+    
+    st.session_state.messages = store.load_recent(session_id, 'message', HISTORY_WINDOW) if meta else []
+    st.session_state.message_count = store.count(session_id, 'message') if meta else 0
+    st.session_state.fact_check_results = store.load_recent(session_id, 'fact_check', HISTORY_WINDOW) if meta else []
+    # 이전 세션의 메시지를 가리키는 늦은 코칭 응답과 자동 팩트체크 결과는 버림
+    st.session_state.pending_coaching = []
+    st.session_state.pending_fact_checks = []
+    for key, value in (meta or {}).items():
+        if key in SESSION_META_KEYS:
+            st.session_state[key] = value
+    if meta is None:
+        st.session_state.essay_state = EssayState().to_dict()
+
+# 메시지 저장
+def append_message(message: Dict) -> int:
+    """메시지를 저장소에 덧붙이고, 메모리에는 최근 HISTORY_WINDOW개만 유지 (저장소 순번 반환)"""
+    seq = init_session_store().append(st.session_state.session_id, 'message', message)
+    st.session_state.messages.append(message)
+    del st.session_state.messages[:-HISTORY_WINDOW]
+    st.session_state.message_count += 1
+    return seq
+
 # 세션 상태 초기화
 def init_session_state():
-    if 'messages' not in st.session_state:
-        st.session_state.messages = []
+    if 'session_id' not in st.session_state:
+        load_session(st.query_params.get("sid"))
     if 'debate_topic' not in st.session_state:
         st.session_state.debate_topic = ""
     if 'user_position' not in st.session_state:
@@ -123,320 +181,187 @@ def init_session_state():
         st.session_state.last_section = '아직 없음'
     if 'fact_check_results' not in st.session_state:
         st.session_state.fact_check_results = []
+    if 'pending_fact_checks' not in st.session_state:
+        st.session_state.pending_fact_checks = []
+    if 'pending_coaching' not in st.session_state:
+        st.session_state.pending_coaching = []
     if 'coaching_started' not in st.session_state:
         st.session_state.coaching_started = False
+    if 'essay_state' not in st.session_state:
+        st.session_state.essay_state = EssayState().to_dict()
+    if 'class_id' not in st.session_state:
+        st.session_state.class_id = st.query_params.get("class") or DEFAULT_CLASS
     if 'current_phase' not in st.session_state:
         st.session_state.current_phase = 'topic_selection'
 
 # 섹션 감지 및 분석
 def detect_section_type(text: str) -> Dict:
     """입력 텍스트의 섹션 타입을 감지 (서론/본론/결론)"""
-    
-    # 서론 패턴
-    intro_patterns = [
-        r'저는.*찬성합니다',
-        r'저는.*반대합니다',
-        r'.*입장입니다',
-        r'.*생각합니다',
-        r'.*주장합니다'
-    ]
-    
-    # 결론 패턴
-    conclusion_patterns = [
-        r'따라서',
-        r'결론적으로',
-        r'마지막으로',
-        r'정리하면',
-        r'종합해보면'
-    ]
-    
-    # 섹션 판별
-    section_type = 'body'  # 기본값은 본론
-    
-    for pattern in intro_patterns:
-        if re.search(pattern, text):
-            section_type = 'intro'
-            break
-    
-    for pattern in conclusion_patterns:
-        if re.search(pattern, text):
-            section_type = 'conclusion'
-            break
-    
     return {
-        'section_type': section_type,
+        'section_type': analyzer.scan(text)['section_type'],
         'text': text
     }
 
 # 근거 개수 세기
 def count_evidence_points(text: str) -> int:
     """본론에서 근거 개수를 센다"""
-    
-    # 번호 패턴
-    numbered_patterns = [
-        r'첫째|첫 번째|1\.',
-        r'둘째|두 번째|2\.',
-        r'셋째|세 번째|3\.',
-        r'넷째|네 번째|4\.'
-    ]
-    
-    # 연결어로 추가 근거 확인 (패턴 제거 - 사용 안함)
-    
-    evidence_count = 0
-    
-    # 번호 패턴 체크
-    for pattern in numbered_patterns:
-        if re.search(pattern, text):
-            evidence_count += 1
-    
-    # 번호가 없으면 연결어로 추정
-    if evidence_count == 0:
-        # 문장 분리하여 근거 추정
-        sentences = text.split('.')
-        if len(sentences) > 1:
-            evidence_count = min(len(sentences) - 1, 4)  # 최대 4개로 제한
-        else:
-            evidence_count = 1
-    
-    return min(evidence_count, 4)  # 최대 4개
+    return analyzer.scan(text)['evidence_count']
 
-# 논증 구조 분석 (기존 함수 유지하되 간소화)
+# 논증 구조 분석 (단일 패스 분석기 사용)
 def analyze_argument_structure(text: str) -> Dict:
     """텍스트에서 주장, 근거, 보강자료 구조 분석"""
-    
-    section_info = detect_section_type(text)
-    
-    structure = {
-        'section_type': section_info['section_type'],
-        'has_claim': False,
-        'has_evidence': False,
-        'has_reinforcement': False,
-        'evidence_count': 0,
-        'sources': []
-    }
-    
-    # 섹션별 분석
-    if section_info['section_type'] == 'intro':
-        structure['has_claim'] = True
-    elif section_info['section_type'] == 'body':
-        structure['has_evidence'] = True
-        structure['evidence_count'] = count_evidence_points(text)
-        # 출처 확인
-        if re.search(r'에 따르면|연구에서|조사 결과|통계', text):
-            structure['has_reinforcement'] = True
-            sources = re.findall(r'([가-힣A-Za-z0-9\s]+)(?:에 따르면|연구에서|조사 결과)', text)
-            structure['sources'] = sources
-    elif section_info['section_type'] == 'conclusion':
-        structure['has_claim'] = True
-    
-    return structure
-
-# Perplexity를 통한 팩트체크
-def perplexity_fact_check(claim: str, source_text: str, clients: Dict) -> Dict:
-    """Perplexity로 웹 검색 후 Groundedness Check 수행"""
-    result = {
-        'is_grounded': False,
-        'confidence': 0.0,
-        'search_results': '',
-        'explanation': '',
-        'sources': []
-    }
-    
-    if 'perplexity' not in clients:
-        result['explanation'] = "Perplexity API 키가 설정되지 않았습니다."
-        return result
-    
+    return analyzer.analyze(text)
+
+# 자동 팩트체크 결과 수집
+def collect_auto_fact_checks() -> bool:
+    """끝난 백그라운드 팩트체크를 fact_check_results로 옮기고, 남은 작업이 있는지 반환"""
+    pending = []
+    for job in st.session_state.pending_fact_checks:
+        if not job['future'].done():
+            pending.append(job)
+            continue
+        try:
+            results = job['future'].result()
+        except Exception as e:
+            results = [{'confidence': 0.0, 'explanation': f"팩트체크 중 오류 발생: {str(e)}"} for _ in job['claims']]
+        entry = {'text': job['text'], 'claims': job['claims'], 'results': results}
+        init_session_store().append(st.session_state.session_id, 'fact_check', entry)
+        st.session_state.fact_check_results.append(entry)
+        del st.session_state.fact_check_results[:-HISTORY_WINDOW]
+    st.session_state.pending_fact_checks = pending
+    return bool(pending)
+
+def record_when_done(future, class_id: str, topic: str):
+    """백그라운드 팩트체크가 끝나면 학급 집계에 반영 (학생이 결과를 보기 전에 떠나도 반영)"""
+    class_stats = init_class_stats()
+    
+    def record(done):
+        if done.exception() is None:
+            class_stats.record_fact_checks(class_id, topic, done.result())
+    future.add_done_callback(record)
+
+@st.fragment(run_every=AUTO_FACT_CHECK_POLL_SECONDS)
+def poll_auto_fact_checks():
+    """진행 중인 자동 팩트체크 표시 (끝나면 전체 화면을 다시 그려 결과 반영)"""
+    if collect_auto_fact_checks():
+        count = sum(len(job['claims']) for job in st.session_state.pending_fact_checks)
+        st.caption(f"⏳ 자동 팩트체크 진행 중... ({count}개 주장)")
+    else:
+        st.rerun()
+
+def render_auto_fact_checks():
+    """저장된 자동 팩트체크 결과를 간단히 표시"""
+    for entry in st.session_state.fact_check_results:
+        lines = []
+        for item, result in zip(entry['claims'], entry['results']):
+            icon, status = confidence_status(result['confidence'])
+            lines.append(f"- {icon} **{item['source'] or '전체'}**: {item['claim']} — {status} ({result['confidence']*100:.0f}%)")
+        st.markdown('<div class="fact-check-box"><strong>🔍 자동 팩트체크</strong></div>', unsafe_allow_html=True)
+        if entry.get('text'):
+            st.markdown(highlight_claims_html(entry['text'], entry['claims'], entry['results']), unsafe_allow_html=True)
+        st.markdown("\n".join(lines))
+
+# 늦게 도착한 코칭 응답 반영
+def late_message(message: Dict, future, fallback: str, submitted_at: float) -> Dict:
+    """도착한 LLM 코칭 응답으로 바꾼 임시 메시지 (끝내 실패하면 잘린 응답 대신 템플릿)"""
+    message = dict(message)
+    latency = dict(message.get('latency') or {}, provisional=False)
     try:
-        # 1. Perplexity로 웹 검색 수행
-        
-        response = clients['perplexity'].chat.completions.create(
-            model="sonar-small-online",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "당신은 팩트체커입니다. 주어진 주장에 대한 사실 여부를 웹 검색을 통해 확인하고, 신뢰할 수 있는 출처와 함께 검증 결과를 제공해주세요."
-                },
-                {
-                    "role": "user",
-                    "content": f"다음 주장의 사실 여부를 확인해주세요:\n\n출처: {source_text}\n주장: {claim}\n\n신뢰할 수 있는 출처를 바탕으로 이 주장이 사실인지 검증해주세요."
-                }
-            ],
-            temperature=0.3,
-            max_tokens=1000
-        )
-        
-        search_results = response.choices[0].message.content
-        result['search_results'] = search_results
-        
-        # 2. Upstage Groundedness Check로 검증 (검색 결과를 ground truth로 사용)
-        if 'upstage' in clients:
-            try:
-                ground_response = clients['upstage'].chat.completions.create(
-                    model="groundedness-check",
-                    messages=[
-                        {"role": "user", "content": search_results},
-                        {"role": "assistant", "content": claim}
-                    ]
-                )
-                
-                ground_content = ground_response.choices[0].message.content
-                
-                # 응답 파싱 개선
-                ground_lower = ground_content.lower()
-                
-                # 다양한 긍정 표현 체크
-                if any(word in ground_lower for word in ['grounded', 'supported', 'verified', '사실', '확인', '입증']):
-                    result['is_grounded'] = True
-                    result['confidence'] = 0.85
-                elif any(word in ground_lower for word in ['partially', 'partly', '부분적', '일부']):
-                    result['is_grounded'] = True
-                    result['confidence'] = 0.5
-                elif any(word in ground_lower for word in ['not grounded', 'unsupported', 'false', '거짓', '틀림', '오류']):
-                    result['is_grounded'] = False
-                    result['confidence'] = 0.1
-                else:
-                    # 기본값: 약한 신뢰도
-                    result['is_grounded'] = True
-                    result['confidence'] = 0.3
-                
-                result['explanation'] = ground_content
-            except Exception as e:
-                result['explanation'] = f"Groundedness Check 오류: {str(e)}"
-        else:
-            # Upstage API가 없는 경우 Perplexity 결과만으로 판단
-            search_lower = search_results.lower()
-            if any(word in search_lower for word in ['사실', '확인', '맞습니다', '정확', 'true', 'correct', 'verified']):
-                result['is_grounded'] = True
-                result['confidence'] = 0.7
-            elif any(word in search_lower for word in ['거짓', '틀림', '오류', 'false', 'incorrect', 'wrong']):
-                result['is_grounded'] = False
-                result['confidence'] = 0.1
-            else:
-                result['is_grounded'] = True
-                result['confidence'] = 0.4
-            result['explanation'] = search_results
-        
-        # 출처 추출 (Perplexity 응답에서)
-        import re
-        urls = re.findall(r'https?://[^\s]+', search_results)
-        result['sources'] = urls[:3]  # 상위 3개 출처만
-        
-    except Exception as e:
-        import traceback
-        result['explanation'] = f"팩트체크 중 오류 발생: {str(e)}\n상세: {traceback.format_exc()}"
-    
-    return result
+        message['content'] = future.result()
+        latency['upgraded'] = True
+        latency['total'] = time.time() - submitted_at
+    except Exception:
+        message['content'] = fallback
+        latency['fell_back'] = True
+    message['latency'] = latency
+    message.pop('html', None)
+    return message
 
-# 섹션별 짧은 피드백 생성
-def get_section_specific_feedback(section_type: str, evidence_count: int = 0, has_sources: bool = False) -> str:
-    """섹션별 맞춤형 짧은 피드백 생성"""
-    
-    if section_type == 'intro':
-        feedbacks = [
-            "좋은 시작이에요! 👍 입장이 명확해요. 이제 왜 그렇게 생각하는지 근거를 들어볼까요?",
-            "입장을 잘 밝혔네요! ✨ 다음엔 구체적인 이유를 설명해주세요.",
-            "명확한 주장이에요! 💡 이제 이를 뒷받침할 근거를 추가해보면 어떨까요?"
-        ]
-    elif section_type == 'conclusion':
-        feedbacks = [
-            "마무리가 깔끔해요! 🎯 핵심 주장을 한 번 더 강조했나요?",
-            "좋은 결론이에요! ✨ 가장 강력한 근거를 다시 언급하면 더 좋을 거예요.",
-            "잘 정리했어요! 👏 독자가 기억할 만한 한 문장을 추가해보는 건 어떨까요?"
-        ]
-    else:  # body
-        if evidence_count == 1:
-            if has_sources:
-                feedbacks = [
-                    "첫 번째 근거 좋네요! 출처까지 명시해서 신뢰도가 높아요. 👍 근거를 하나 더 추가해볼까요?",
-                    "근거와 자료 제시가 훌륭해요! ✨ 다른 측면의 근거도 추가하면 더 설득력 있을 거예요."
-                ]
-            else:
-                feedbacks = [
-                    "첫 번째 근거 좋아요! 💡 구체적인 통계나 사례를 추가하면 더 설득력 있을 거예요.",
-                    "좋은 시작이에요! 이 근거를 뒷받침할 자료를 찾아보면 어떨까요? 📚"
-                ]
-        elif evidence_count == 2:
-            feedbacks = [
-                "두 가지 근거가 잘 연결되고 있어요! 👍 각 근거마다 구체적 사례를 추가해보세요.",
-                "좋은 논리 전개예요! ✨ 이제 가장 강한 근거에 집중해서 보강해볼까요?"
-            ]
-        elif evidence_count == 3:
-            feedbacks = [
-                "세 가지 근거가 체계적이에요! 🎯 이제 가장 핵심적인 것에 집중해보면 어떨까요?",
-                "충실한 논증이네요! 💪 각 근거의 연결을 더 자연스럽게 만들어보세요."
-            ]
-        else:  # 4개 이상
-            feedbacks = [
-                "충분한 근거예요! 🌟 이제 가장 강력한 2-3개로 정리하면 더 임팩트 있을 거예요.",
-                "많은 근거를 제시했네요! 핵심만 추려서 깊이 있게 설명하면 어떨까요? 🎯"
-            ]
-    
-    import random
-    return random.choice(feedbacks)
+def replace_when_done(future, session_id: str, seq: int, message: Dict, fallback: str, submitted_at: float):
+    """늦은 코칭 응답이 도착하면 저장소의 임시 메시지를 바꿈 (학생이 새로 고치거나 ?sid=로 이어가도 반영)"""
+    store = init_session_store()
+    # 화면의 메시지는 collect_late_coaching이 따로 바꾸므로 지금 내용을 복사해 둠
+    message = dict(message)
+    
+    def replace(done):
+        late = late_message(message, done, fallback, submitted_at)
+        if late['latency'].get('upgraded'):
+            metrics.observe("coaching.late", late['latency']['total'])
+        store.replace(session_id, 'message', seq, late)
+    future.add_done_callback(replace)
 
-# 대화형 코칭 피드백 생성
-def generate_coaching_feedback(text: str, structure: Dict, clients: Dict, position: str = None, topic: str = None) -> str:
-    """논증 구조에 대한 코칭 피드백 생성"""
-    
-    # 섹션별 간단 피드백 우선 제공
-    section_feedback = get_section_specific_feedback(
-        structure.get('section_type', 'body'),
-        structure.get('evidence_count', 0),
-        bool(structure.get('sources', []))
-    )
-    
-    # API 없으면 섹션별 피드백만 반환
-    if 'upstage' not in clients:
-        return section_feedback
-    
-    # Solar Pro 2를 사용한 추가 피드백 (필요시)
-    system_prompt = """당신은 학생의 토론 친구이자 도우미입니다.
-
-중요 규칙:
-- 반드시 2-3문장으로만 답하세요
-- 친근하고 격려하는 톤을 사용하세요
-- 이모지를 적절히 사용하세요 (👍 💡 ✨ 🎯)
-- "~해보면 어떨까요?" 같은 제안형 표현을 사용하세요
-- 구체적 예시는 제공하지 마세요
-- 학생의 입장(찬성/반대)을 명확히 유지하도록 도와주세요
-
-피드백 방식:
-- 잘한 점 간단히 인정 (1문장)
-- 개선 방향 제안 (1-2문장)
-- 격려와 함께 마무리"""
-
-    position_str = f"\n학생의 입장: {position}" if position else ""
-    topic_str = f"\n토론 주제: {topic}" if topic else ""
-    
-    user_prompt = f"""학생의 논증을 분석하고 코칭해주세요:{position_str}{topic_str}
+def collect_late_coaching() -> bool:
+    """도착한 LLM 코칭 응답으로 화면의 임시 피드백을 바꾸고, 아직 기다리는 응답이 있는지 반환 (저장은 replace_when_done)"""
+    pending = []
+    for job in st.session_state.pending_coaching:
+        if not job['future'].done():
+            pending.append(job)
+            continue
+        message = job['message']
+        late = late_message(message, job['future'], job['fallback'], job['submitted_at'])
+        message.clear()
+        message.update(late)
+    st.session_state.pending_coaching = pending
+    return bool(pending)
 
-논증 내용: {text}
+@st.fragment(run_every=LATE_COACHING_POLL_SECONDS)
+def poll_late_coaching():
+    """기다리는 코칭 응답 표시 (도착하면 전체 화면을 다시 그려 교체)"""
+    if any(job['future'].done() for job in st.session_state.pending_coaching):
+        st.rerun()
+    st.caption("⏳ AI 코치가 더 자세한 피드백을 마무리하는 중이에요...")
 
-현재 구조 분석:
-- 주장 포함: {structure['has_claim']}
-- 근거 포함: {structure['has_evidence']}  
-- 보강자료 포함: {structure['has_reinforcement']}
+# 채팅 메시지 HTML
+def render_message_html(role: str, content: str, latency: Dict = None) -> str:
+    """채팅 말풍선 HTML 생성 (코치 응답에는 첫 토큰/전체 응답 시간 표시)"""
+    if role == "user":
+        return f'<div class="chat-message user-message"><strong>학생:</strong> {content}</div>'
+    
+    timing = ""
+    if latency and latency.get('total') is not None:
+        timing = f'<br><small>⏱️ 첫 토큰 {latency["ttft"]:.2f}초 · 전체 {latency["total"]:.2f}초'
+        if latency.get('fell_back'):
+            timing += ' · 기본 피드백으로 대체됨'
+        elif latency.get('provisional'):
+            timing += ' · 응답이 늦어 기본 피드백을 먼저 표시'
+        elif latency.get('upgraded'):
+            timing += ' · 늦게 도착한 AI 피드백으로 교체됨'
+        elif latency.get('route') == 'template':
+            timing += ' · 짧은 글이라 섹션별 피드백'
+        timing += '</small>'
+    return f'<div class="chat-message assistant-message"><strong>코치:</strong> {content}{timing}</div>'
 
-2-3문장으로 짧게 피드백을 주세요. 격려와 함께 한 가지 구체적 개선점만 제안하세요."""
+# 메시지 HTML 캐시
+def message_html(message: Dict) -> str:
+    """메시지별 HTML (한 번 만든 HTML은 메시지에 저장해 다음 실행 때 재사용)"""
+    html = message.get("html")
+    if html is None:
+        html = render_message_html(message["role"], message["content"], message.get("latency"))
+        message["html"] = html
+    return html
 
-    if 'upstage' not in clients:
-        return "Upstage API 키가 설정되지 않았습니다."
-    
-    try:
-        response = clients['upstage'].chat.completions.create(
-            model="solar-pro2",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=200  # 짧은 응답을 위해 토큰 제한
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"피드백 생성 중 오류가 발생했습니다: {str(e)}"
+# 채팅 히스토리 표시
+def render_chat_history(messages: list, total: int = None):
+    """메모리에 있는 최근 메시지만 하나의 블록으로 표시하고, 이전 대화는 요청할 때 저장소에서 페이지 단위로 읽어 표시"""
+    if total is None:
+        total = len(messages)
+    older_count = total - len(messages)
+    
+    if older_count:
+        page_count = (older_count + HISTORY_WINDOW - 1) // HISTORY_WINDOW
+        if st.toggle(f"📜 이전 대화 보기 ({older_count}개)", key="show_older_messages"):
+            page = st.number_input("페이지 (1 = 가장 최근)", min_value=1, max_value=page_count, value=1, key="older_messages_page")
+            end = older_count - (page - 1) * HISTORY_WINDOW
+            start = max(end - HISTORY_WINDOW, 0)
+            older = init_session_store().load_range(st.session_state.session_id, 'message', start, end)
+            st.markdown("".join(message_html(m) for m in older), unsafe_allow_html=True)
+            st.markdown("---")
+    
+    if messages:
+        st.markdown("".join(message_html(m) for m in messages), unsafe_allow_html=True)
 
-# 주제별 가이드 제공
+# 주제별 가이드 제공 (같은 주제/입장이면 만든 문자열 재사용)
+@functools.lru_cache(maxsize=256)
 def get_topic_guide(topic: str, position: str) -> str:
     """토론 주제와 입장에 따른 가이드 제공"""
     guide = f"""
@@ -450,9 +375,354 @@ def get_topic_guide(topic: str, position: str) -> str:
 """
     return guide
 
+# 신뢰도에 따른 아이콘과 상태
+def confidence_status(confidence: float):
+    if confidence >= 0.7:
+        return "✅", "검증됨"
+    elif confidence >= 0.4:
+        return "⚠️", "부분적으로 검증됨"
+    return "❌", "검증 실패"
+
+# 원문에 팩트체크 판정 표시
+def highlight_claims_html(text: str, claims: list, results: list) -> str:
+    """원문에서 검증한 주장 구간(출처~문장 끝)을 판정에 따라 색으로 강조 (결과가 None이면 진행 중)"""
+    parts = []
+    cursor = 0
+    for item, result in sorted(zip(claims, results), key=lambda pair: pair[0]['span'][0]):
+        start, end = item['span']
+        if start < cursor:
+            continue
+        if result is None:
+            css, title = 'claim-pending', '검증 중'
+        else:
+            confidence = result.get('confidence', 0.0)
+            css = 'claim-verified' if confidence >= 0.7 else 'claim-partial' if confidence >= 0.4 else 'claim-failed'
+            title = f"{confidence_status(confidence)[1]} ({confidence*100:.0f}%)"
+        parts.append(html.escape(text[cursor:start]))
+        parts.append(f'<mark class="{css}" title="{title}">{html.escape(text[start:end])}</mark>')
+        cursor = end
+    parts.append(html.escape(text[cursor:]))
+    return f'<div class="claim-text">{"".join(parts)}</div>'
+
+# 팩트체크 결과 표시
+def render_evidence(evidence: Dict, expanded: bool = False, cursor: str = ""):
+    """근거 (교사 참고 자료, 미리 검색한 주제 자료집, 또는 Perplexity 검색 결과)"""
+    reference = evidence.get('reference')
+    if reference == 'dossier':
+        label = "🗂️ 주제 자료집 보기"
+    elif reference:
+        label = "📚 참고 자료 보기"
+    else:
+        label = "📊 웹 검색 결과 보기"
+    with st.expander(label, expanded=expanded):
+        st.write(evidence['search_results'] + cursor)
+        
+        if evidence['sources']:
+            st.markdown("**🔗 참고 출처:**")
+            for src in evidence['sources']:
+                st.write(f"- {src}")
+
+def render_fact_check_progress(evidence: Dict, claim_info: Dict = None):
+    """판정 전 주장 하나의 근거를 표시 (검색 답변이 생성되는 동안 계속 갱신)"""
+    if claim_info and claim_info['source']:
+        st.markdown(f"**📌 {claim_info['source']}:** {claim_info['claim']}")
+    st.metric("검증 상태", "검증 중…")
+    render_evidence(evidence, expanded=True, cursor="" if evidence['complete'] else " ▌")
+
+def render_fact_check_result(fact_result: Dict, claim_info: Dict = None):
+    """주장 하나의 팩트체크 결과를 표시"""
+    if claim_info and claim_info['source']:
+        st.markdown(f"**📌 {claim_info['source']}:** {claim_info['claim']}")
+    
+    # 신뢰도에 따른 아이콘 선택
+    icon, status = confidence_status(fact_result['confidence'])
+    
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.metric("검증 상태", status, f"{fact_result['confidence']*100:.0f}%")
+    with col2:
+        st.markdown(f"**{icon} 신뢰도:** {fact_result['confidence']*100:.0f}%")
+    
+    render_evidence(fact_result)
+    
+    # Groundedness 검증 결과
+    if fact_result['explanation'] and fact_result['explanation'] != fact_result['search_results']:
+        with st.expander("🎯 Groundedness 검증 상세"):
+            st.write(fact_result['explanation'])
+    
+    # 개선 제안
+    if fact_result['confidence'] < 0.7:
+        st.info("💡 **개선 제안:** 더 신뢰할 수 있는 출처를 인용하거나, 구체적인 통계나 연구 결과를 제시해보세요.")
+
+# 입력 폼
+@st.fragment
+def render_argument_form(clients: Dict):
+    """논증 입력 폼과 제출/팩트체크 처리
+
+    fragment로 감싸 팩트체크 버튼은 폼 영역만 다시 실행한다.
+    제출하면 새 메시지를 대화에 반영하기 위해 앱 전체를 다시 실행한다.
+    """
+    with st.form("argument_form", clear_on_submit=True):
+        user_input = st.text_area("논증을 작성하세요:", 
+                                 placeholder="주장, 근거, 보강자료를 포함하여 작성해보세요...",
+                                 height=150)
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            submitted = st.form_submit_button("📤 제출하기", use_container_width=True)
+        with col2:
+            fact_check = st.form_submit_button("🔍 팩트체크", use_container_width=True)
+    
+    if submitted and user_input:
+        submit_start = time.perf_counter()
+        submitted_at = time.time()
+        
+        # 사용자 메시지 저장
+        new_session = st.session_state.message_count == 0
+        append_message({"role": "user", "content": user_input})
+        
+        # 논증 구조 분석
+        with metrics.span("submit.analyze"):
+            structure = analyze_argument_structure(user_input)
+        init_class_stats().record_submission(
+            st.session_state.class_id, st.session_state.debate_topic, structure, new_session
+        )
+        
+        # 섹션 타입 저장
+        section_labels = {
+            'intro': '서론',
+            'body': f'본론 (근거 {structure.get("evidence_count", 0)}개)',
+            'conclusion': '결론'
+        }
+        st.session_state.last_section = section_labels.get(structure.get('section_type', 'body'), '본론')
+        
+        # 지금까지 쓴 글의 요약은 코칭에 넘기고, 이번 단락은 다음 턴을 위해 반영
+        essay = EssayState.from_dict(st.session_state.essay_state)
+        context = essay.summary
+        essay.update(user_input, structure)
+        st.session_state.essay_state = essay.to_dict()
+        save_session_meta()
+        
+        # 출처가 있는 경우 자동 팩트체크를 코칭과 동시에 백그라운드에서 시작
+        if structure['sources']:
+            claims = extract_claims(user_input)
+            future = init_background_executor().submit(
+                run_fact_checks, claims, clients, init_fact_cache(),
+                load_index(st.session_state.debate_topic), load_dossier(st.session_state.debate_topic)
+            )
+            record_when_done(future, st.session_state.class_id, st.session_state.debate_topic)
+            st.session_state.pending_fact_checks.append({'text': user_input, 'claims': claims, 'future': future})
+        
+        # 코칭 피드백 생성 (입장과 주제 포함)
+        if STREAM_COACHING:
+            # 토큰이 도착하는 대로 채팅에 표시 (중간에 끊기면 섹션별 피드백으로 대체)
+            placeholder = st.empty()
+            placeholder.markdown(render_message_html("assistant", "▌"), unsafe_allow_html=True)
+            stream = FeedbackStream(
+                user_input,
+                structure,
+                clients,
+                position=st.session_state.user_position,
+                topic=st.session_state.debate_topic,
+                cache=init_feedback_cache(),
+                context=context,
+                on_wait=lambda ahead: placeholder.markdown(
+                    render_message_html("assistant", f"⏳ 요청이 많아 잠시 기다리는 중이에요 (앞에 {ahead}개)"),
+                    unsafe_allow_html=True)
+            )
+            shown = ""
+            for delta in stream:
+                shown += delta
+                placeholder.markdown(render_message_html("assistant", shown + "▌"), unsafe_allow_html=True)
+            reply = stream
+            placeholder.markdown(render_message_html("assistant", stream.text, stream.latency()), unsafe_allow_html=True)
+        else:
+            # 지연 예산(COACHING_SLO_SECONDS)을 넘기면 템플릿을 먼저 보여주고 응답은 도착하면 교체
+            queue_notice = st.empty()
+            reply = CoachingReply(
+                user_input, 
+                structure, 
+                clients,
+                position=st.session_state.user_position,
+                topic=st.session_state.debate_topic,
+                cache=init_feedback_cache(),
+                context=context,
+                on_wait=lambda ahead: queue_notice.info(f"⏳ 요청이 많아 잠시 기다리는 중이에요 (앞에 {ahead}개)")
+            )
+            with st.spinner("코칭 피드백을 생성하는 중..."):
+                reply.wait()
+            queue_notice.empty()
+        message = {"role": "assistant", "content": reply.text, "latency": reply.latency()}
+        seq = append_message(message)
+        if reply.provisional:
+            replace_when_done(reply.pending, st.session_state.session_id, seq, message, reply.fallback, submitted_at)
+            st.session_state.pending_coaching.append({
+                'seq': seq, 'message': message, 'future': reply.pending,
+                'fallback': reply.fallback, 'submitted_at': submitted_at
+            })
+        
+        metrics.observe("submit.total", time.perf_counter() - submit_start)
+        metrics.registry.export()
+        st.rerun()
+    
+    if fact_check and user_input.strip():
+        # 출처가 붙은 주장을 모두 추출해 동시에 팩트체크
+        claims = extract_claims(user_input)
+        
+        st.markdown('<div class="fact-check-box"><strong>🔍 팩트체크 결과</strong></div>', unsafe_allow_html=True)
+        if not claims[0]['source']:
+            st.caption("출처가 명시되지 않아 전체 글을 검증합니다. '~에 따르면' 형식으로 출처를 포함해주세요.")
+        
+        # 원문 강조와 주장별 자리를 먼저 만들고, 끝나는 순서대로 결과를 채움
+        highlight = st.empty()
+        verdicts = [None] * len(claims)
+        highlight.markdown(highlight_claims_html(user_input, claims, verdicts), unsafe_allow_html=True)
+        slots = [st.empty() for _ in claims]
+        for item, slot in zip(claims, slots):
+            slot.info(f"⏳ 검증 대기 중: {item['claim']}")
+        
+        references = load_index(st.session_state.debate_topic)
+        dossier = load_dossier(st.session_state.debate_topic)
+        where = "참고 자료와 웹에서" if references or dossier else "Perplexity로 웹에서"
+        # 웹 검색 답변은 생성되는 대로 보여주고, 판정(검증 상태)은 검증이 끝나면 마지막에 채움
+        check_start = time.perf_counter()
+        first_evidence = True
+        with st.spinner(f"{where} 근거를 찾는 중... ({len(claims)}개 주장) 잠시만 기다려주세요."):
+            with metrics.span("fact_check.button_total"):
+                for idx, stage, payload in iter_fact_check_events(claims, clients, cache=init_fact_cache(),
+                                                                  references=references, dossier=dossier):
+                    if first_evidence:
+                        first_evidence = False
+                        metrics.observe("fact_check.button_first_evidence", time.perf_counter() - check_start)
+                    if stage == 'evidence':
+                        with slots[idx].container():
+                            render_fact_check_progress(payload, claims[idx])
+                        continue
+                    verdicts[idx] = payload
+                    highlight.markdown(highlight_claims_html(user_input, claims, verdicts), unsafe_allow_html=True)
+                    with slots[idx].container():
+                        render_fact_check_result(payload, claims[idx])
+        init_class_stats().record_fact_checks(st.session_state.class_id, st.session_state.debate_topic, verdicts)
+        metrics.registry.export()
+
+# 교사용 참고 자료 관리
+def render_reference_panel(topic: str):
+    """현재 주제의 참고 자료 현황과 업로드 (올리면 색인을 다시 만들어 모든 세션이 바로 사용)"""
+    with st.expander("📚 참고 자료 (교사용)"):
+        if not topic:
+            st.caption("토론 주제를 먼저 입력하세요.")
+            return
+        
+        index = load_index(topic)
+        if index:
+            st.caption(f"자료 {len(index.sources)}개 · 단락 {index.size}개: {', '.join(index.sources)}")
+        else:
+            st.caption("이 주제의 참고 자료가 없어 팩트체크는 웹 검색을 사용합니다.")
+        dossier = load_dossier(topic)
+        if dossier:
+            st.caption(f"🗂️ 주제 자료집: 단락 {dossier.size}개 (웹 검색 전에 먼저 사용)")
+        
+        files = st.file_uploader("자료 올리기 (.txt/.md, PDF는 텍스트로 변환)", type=["txt", "md"],
+                                 accept_multiple_files=True, key="reference_files")
+        if files and st.button("색인 만들기"):
+            try:
+                with st.spinner("색인을 만드는 중..."):
+                    add_documents(topic, {f.name: f.getvalue() for f in files})
+                st.success("참고 자료를 반영했습니다.")
+            except ValueError as e:
+                st.error(str(e))
+
+# 교사용 학급 현황
+DASHBOARD_LABELS = {
+    'section': ("글 단계", {'intro': '서론', 'body': '본론', 'conclusion': '결론'}),
+    'evidence': ("본론 근거 수", {'0': '0개', '1': '1개', '2': '2개', '3': '3개', '4+': '4개 이상'}),
+    'confidence': ("팩트체크 판정", {'verified': '검증됨', 'partial': '부분적으로 검증됨', 'failed': '검증 실패', 'error': '검증 오류'}),
+    'evidence_source': ("팩트체크 근거", {'teacher': '교사 참고 자료', 'dossier': '주제 자료집', 'web': '웹 검색'}),
+}
+
+def render_class_dashboard():
+    """학급/주제별 누적 집계 (제출·팩트체크 때 올린 카운터만 읽으므로 글이 쌓여도 조회 비용이 같음)"""
+    class_stats = init_class_stats()
+    st.markdown("### 📊 학급 현황")
+    
+    classes = [ALL_CLASSES] + class_stats.classes()
+    requested = st.query_params.get("class")
+    col1, col2 = st.columns(2)
+    with col1:
+        class_id = st.selectbox("학급", classes, index=classes.index(requested) if requested in classes else 0,
+                                format_func=lambda c: "전체 학급" if c == ALL_CLASSES else c)
+    topics = [ALL_CLASSES] + class_stats.topics(class_id)
+    with col2:
+        topic = st.selectbox("주제", topics, format_func=lambda t: "전체 주제" if t == ALL_CLASSES else t)
+    
+    with metrics.span("dashboard.query"):
+        stats = class_stats.query(class_id, topic)
+    submissions = stats.get('submissions', {}).get('total', 0)
+    if not submissions:
+        st.info("아직 제출된 글이 없습니다.")
+        return
+    
+    confidence = stats.get('confidence', {})
+    checked = sum(count for bucket, count in confidence.items() if bucket != 'error')
+    cols = st.columns(4)
+    cols[0].metric("제출", f"{submissions}개")
+    cols[1].metric("학생(세션)", f"{stats.get('sessions', {}).get('total', 0)}명")
+    cols[2].metric("출처 인용률", f"{stats.get('sources', {}).get('cited', 0) / submissions * 100:.0f}%")
+    cols[3].metric("팩트체크 검증률", f"{confidence.get('verified', 0) / checked * 100:.0f}%" if checked else "-")
+    
+    cols = st.columns(2)
+    for idx, (metric, (title, labels)) in enumerate(DASHBOARD_LABELS.items()):
+        counts = stats.get(metric, {})
+        with cols[idx % 2]:
+            st.markdown(f"**{title}**")
+            if counts:
+                st.bar_chart([{"구간": label, "수": counts.get(bucket, 0)} for bucket, label in labels.items()],
+                             x="구간", y="수", height=220)
+            else:
+                st.caption("아직 없음")
+
+# 관리자용 성능 지표
+def render_admin_panel():
+    """단계별 지연 시간 백분위와 API 토큰 사용량 (프로세스 전체, 최근 구간 기준)"""
+    with st.expander("📈 성능 지표"):
+        rows = [
+            {
+                "단계": phase,
+                "횟수": stats['count'],
+                "p50(ms)": round(stats['p50'] * 1000, 1),
+                "p95(ms)": round(stats['p95'] * 1000, 1),
+                "p99(ms)": round(stats['p99'] * 1000, 1)
+            }
+            for phase, stats in metrics.registry.summary().items()
+        ]
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        else:
+            st.caption("아직 측정값이 없습니다.")
+        
+        usage = metrics.registry.token_usage()
+        if usage:
+            st.dataframe([
+                {"제공자": provider, "모델": model, "호출": entry['calls'],
+                 "입력 토큰": entry['prompt_tokens'], "출력 토큰": entry['completion_tokens']}
+                for (provider, model), entry in sorted(usage.items())
+            ], hide_index=True)
+        
+        stats = scheduler.stats
+        queues = ", ".join(f"{name} {length}" for name, length in sorted(scheduler.queue_lengths().items())) or "없음"
+        st.caption(f"API 대기열: {queues} · 처리 {stats['granted']} · 거절 {stats['rejected']} · "
+                   f"시간 초과 {stats['timed_out']} · 최대 대기 {stats['max_wait']:.1f}초")
+        st.caption("📊 학급 현황은 주소에 ?dashboard=1 (특정 학급은 &class=학급이름)을 붙인 뒤 교사 비밀번호로 여세요.")
+
 # 메인 앱
 def main():
-    st.markdown('<div class="main-header"><h1>🎓 토론 논증 코칭 챗봇</h1><p>체계적인 논증 구조를 만들어 설득력을 높이세요!</p></div>', unsafe_allow_html=True)
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
+    
+    # 교사용 학급 현황 (?dashboard=1, 교사 비밀번호 확인 후, 학생 세션은 만들지 않음)
+    if st.query_params.get("dashboard") == "1":
+        if require_teacher("dashboard"):
+            render_class_dashboard()
+        return
     
     # 세션 초기화
     init_session_state()
@@ -480,8 +750,10 @@ def main():
                               value=st.session_state.debate_topic)
         
         if topic != st.session_state.debate_topic:
+            # 주제가 바뀌면 새 세션으로 시작 (이전 대화는 저장소에 남음)
+            load_session()
             st.session_state.debate_topic = topic
-            st.session_state.messages = []
+            save_session_meta()
         
         # 입장 선택
         col1, col2 = st.columns(2)
@@ -489,10 +761,14 @@ def main():
             if st.button("👍 찬성", disabled=not topic):
                 st.session_state.user_position = "찬성"
                 st.session_state.coaching_started = True
+                save_session_meta()
+                prefetch_dossier(topic, clients)
         with col2:
             if st.button("👎 반대", disabled=not topic):
                 st.session_state.user_position = "반대"
                 st.session_state.coaching_started = True
+                save_session_meta()
+                prefetch_dossier(topic, clients)
         
         if st.session_state.user_position:
             st.success(f"선택된 입장: {st.session_state.user_position}")
@@ -503,11 +779,30 @@ def main():
         if 'last_section' in st.session_state:
             st.info(f"📝 현재: {st.session_state.last_section}")
         
-        # 리셋 버튼
+        # 리셋 버튼 (이전 세션은 저장소에 남고 새 세션 ID로 시작)
         if st.button("🔄 새로운 토론 시작"):
             for key in st.session_state.keys():
                 del st.session_state[key]
+            st.query_params.pop("sid", None)
             st.rerun()
+        
+        st.caption(f"🔖 세션 코드: {st.session_state.session_id[:8]} (주소를 저장하면 이어서 할 수 있어요)")
+        st.caption(f"🏫 학급: {st.session_state.class_id}")
+        
+        # 팩트체크 캐시 적중률
+        cache_stats = init_fact_cache().stats()
+        if cache_stats['lookups']:
+            st.caption(f"🗂️ 팩트체크 캐시 적중률: {cache_stats['hit_rate']*100:.0f}% (조회 {cache_stats['lookups']}회)")
+        feedback_stats = init_feedback_cache().stats()
+        if feedback_stats['lookups']:
+            st.caption(f"💬 피드백 캐시 적중률: {feedback_stats['hit_rate']*100:.0f}% "
+                       f"(API 호출 {feedback_stats['calls_saved']}회 절약)")
+        
+        # 교사용 참고 자료와 성능 지표 (ADMIN_PANEL=1 또는 ?admin=1로 메뉴를 열고 교사 비밀번호 확인)
+        if ADMIN_PANEL or st.query_params.get("admin") == "1":
+            if require_teacher("sidebar"):
+                render_reference_panel(st.session_state.debate_topic)
+                render_admin_panel()
     
     # 메인 컨텐츠
     if not st.session_state.coaching_started:
@@ -515,19 +810,12 @@ def main():
         
         # 예시 토론 주제들
         st.markdown("### 💡 토론 주제 예시")
-        example_topics = [
-            "인공지능을 활용한 수행평가",
-            "학교 내 스마트폰 사용",
-            "온라인 수업의 효과성",
-            "청소년 게임 시간 제한",
-            "학생 자치권 확대"
-        ]
-        
-        cols = st.columns(len(example_topics))
-        for idx, topic in enumerate(example_topics):
+        cols = st.columns(len(EXAMPLE_TOPICS))
+        for idx, topic in enumerate(EXAMPLE_TOPICS):
             with cols[idx]:
                 if st.button(topic, key=f"example_{idx}"):
                     st.session_state.debate_topic = topic
+                    save_session_meta()
                     st.rerun()
     
     else:
@@ -537,114 +825,22 @@ def main():
         # 채팅 히스토리 (단순화)
         st.markdown("### 💬 코칭 대화")
         
-        # 메시지 표시
-        for message in st.session_state.messages:
-            if message["role"] == "user":
-                st.markdown(f'<div class="chat-message user-message"><strong>학생:</strong> {message["content"]}</div>', unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div class="chat-message assistant-message"><strong>코치:</strong> {message["content"]}</div>', unsafe_allow_html=True)
-        
-        # 입력 폼
-        with st.form("argument_form", clear_on_submit=True):
-            user_input = st.text_area("논증을 작성하세요:", 
-                                     placeholder="주장, 근거, 보강자료를 포함하여 작성해보세요...",
-                                     height=150)
-            
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                submitted = st.form_submit_button("📤 제출하기", use_container_width=True)
-            with col2:
-                fact_check = st.form_submit_button("🔍 팩트체크", use_container_width=True)
+        # 늦게 도착한 코칭 응답을 먼저 반영한 뒤 메시지 표시 (최근 메시지만, 이전 대화는 페이지 단위로)
+        if st.session_state.pending_coaching:
+            collect_late_coaching()
+        with metrics.span("render.history"):
+            render_chat_history(st.session_state.messages, st.session_state.message_count)
+        if st.session_state.pending_coaching:
+            poll_late_coaching()
         
-        if submitted and user_input:
-            # 사용자 메시지 저장
-            st.session_state.messages.append({"role": "user", "content": user_input})
-            
-            # 논증 구조 분석
-            structure = analyze_argument_structure(user_input)
-            
-            # 섹션 타입 저장
-            section_labels = {
-                'intro': '서론',
-                'body': f'본론 (근거 {structure.get("evidence_count", 0)}개)',
-                'conclusion': '결론'
-            }
-            st.session_state.last_section = section_labels.get(structure.get('section_type', 'body'), '본론')
-            
-            # 코칭 피드백 생성 (입장과 주제 포함)
-            with st.spinner("코칭 피드백을 생성하는 중..."):
-                feedback = generate_coaching_feedback(
-                    user_input, 
-                    structure, 
-                    clients,
-                    position=st.session_state.user_position,
-                    topic=st.session_state.debate_topic
-                )
-                st.session_state.messages.append({"role": "assistant", "content": feedback})
-            
-            # 출처가 있는 경우 자동 팩트체크
-            if structure['sources']:
-                st.info(f"📌 출처 발견: {', '.join(structure['sources'])} - 자동 팩트체크를 수행합니다.")
-                # 여기에 팩트체크 로직 추가
-            
-            st.rerun()
+        # 자동 팩트체크 결과 (진행 중인 작업이 있으면 주기적으로 확인)
+        if st.session_state.pending_fact_checks:
+            poll_auto_fact_checks()
+        render_auto_fact_checks()
         
-        if fact_check and user_input:
-            # 팩트체크 수행
-            with st.spinner("Perplexity로 웹 검색 중... 잠시만 기다려주세요."):
-                # 출처 패턴 찾기
-                sources = re.findall(r'([가-힣A-Za-z0-9\s]+)(?:에 따르면|연구에서|조사 결과)', user_input)
-                
-                if sources or user_input:
-                    # 전체 텍스트 또는 특정 출처에 대해 팩트체크
-                    source_text = sources[0] if sources else ""
-                    
-                    # 주장 추출 (출처 이후 부분)
-                    claim_match = re.search(r'(?:에 따르면|연구에서|조사 결과)(.+)', user_input)
-                    claim = claim_match.group(1) if claim_match else user_input
-                    
-                    # Perplexity 팩트체크 수행
-                    fact_result = perplexity_fact_check(claim.strip(), source_text, clients)
-                    
-                    # 결과 표시
-                    st.markdown('<div class="fact-check-box"><strong>🔍 팩트체크 결과</strong></div>', unsafe_allow_html=True)
-                    
-                    # 신뢰도에 따른 아이콘 선택
-                    if fact_result['confidence'] >= 0.7:
-                        icon = "✅"
-                        status = "검증됨"
-                    elif fact_result['confidence'] >= 0.4:
-                        icon = "⚠️"
-                        status = "부분적으로 검증됨"
-                    else:
-                        icon = "❌"
-                        status = "검증 실패"
-                    
-                    col1, col2 = st.columns([1, 3])
-                    with col1:
-                        st.metric("검증 상태", status, f"{fact_result['confidence']*100:.0f}%")
-                    with col2:
-                        st.markdown(f"**{icon} 신뢰도:** {fact_result['confidence']*100:.0f}%")
-                    
-                    # Perplexity 검색 결과
-                    with st.expander("📊 웹 검색 결과 보기"):
-                        st.write(fact_result['search_results'])
-                        
-                        if fact_result['sources']:
-                            st.markdown("**🔗 참고 출처:**")
-                            for src in fact_result['sources']:
-                                st.write(f"- {src}")
-                    
-                    # Groundedness 검증 결과
-                    if fact_result['explanation'] and fact_result['explanation'] != fact_result['search_results']:
-                        with st.expander("🎯 Groundedness 검증 상세"):
-                            st.write(fact_result['explanation'])
-                    
-                    # 개선 제안
-                    if fact_result['confidence'] < 0.7:
-                        st.info("💡 **개선 제안:** 더 신뢰할 수 있는 출처를 인용하거나, 구체적인 통계나 연구 결과를 제시해보세요.")
-                else:
-                    st.warning("출처가 명시되지 않았습니다. '~에 따르면' 형식으로 출처를 포함해주세요.")
+        # 입력 폼 (폼 안의 동작은 폼 영역만 다시 실행)
+        render_argument_form(clients)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with metrics.span("render.script"):
+        main()
\ No newline at end of file
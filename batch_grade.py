@@ -0,0 +1,207 @@
+"""학급 단위 오프라인 일괄 코칭
+
+CSV 또는 JSONL로 된 학생 글을 읽어 논증 구조 분석, 코칭 피드백, 팩트체크 결과를
+JSONL로 한 줄씩 내보낸다. 출력 파일이 체크포인트 역할을 하므로 중단된 작업을
+같은 명령으로 다시 실행하면 끝난 글은 건너뛰고 이어서 처리한다.
+
+입력 필드: text(필수), id, topic, position
+
+실행 예:
+    python batch_grade.py essays.csv -o results.jsonl --concurrency 8
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import analyzer
+from api_clients import create_clients
+from coaching import generate_coaching_feedback
+from dossier import load_dossier
+from fact_cache import FactCheckCache
+from feedback_cache import FeedbackCache
+from fact_check import extract_claims, run_fact_checks
+from reference_index import load_index
+
+# 프로세스 하나가 한 번에 분석할 글 수
+ANALYSIS_CHUNK_SIZE = 64
+
+
+# 입력 읽기
+def load_essays(path: str) -> List[Dict]:
+    """CSV/JSONL에서 글 목록을 읽고, id가 없으면 줄 번호를 id로 사용"""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if path.endswith('.jsonl'):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    essays = []
+    for idx, row in enumerate(rows):
+        text = (row.get('text') or row.get('essay') or '').strip()
+        if not text:
+            continue
+        essays.append({
+            'id': str(row.get('id') or idx),
+            'text': text,
+            'topic': row.get('topic') or None,
+            'position': row.get('position') or None
+        })
+    return essays
+
+
+def load_checkpoint(path: str) -> set:
+    """이미 결과가 기록된 글의 id (마지막 줄이 잘렸으면 무시)"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)['id'])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+def trim_partial_line(path: str) -> None:
+    """중간에 끊긴 마지막 줄을 지워 이어 쓰는 결과가 새 줄에서 시작하게 함"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            step = min(4096, pos)
+            f.seek(pos - step)
+            newline = f.read(step).rfind(b'\n')
+            if newline != -1:
+                pos = pos - step + newline + 1
+                break
+            pos -= step
+        if pos != end:
+            f.truncate(pos)
+
+
+# 논증 구조 분석 (프로세스 풀)
+def analyze_all(texts: List[str], workers: int) -> List[Dict]:
+    if workers <= 1 or len(texts) <= ANALYSIS_CHUNK_SIZE:
+        return analyzer.analyze_batch(texts)
+    chunks = [texts[i:i + ANALYSIS_CHUNK_SIZE] for i in range(0, len(texts), ANALYSIS_CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [structure for chunk in pool.map(analyzer.analyze_batch, chunks) for structure in chunk]
+
+
+# 글 하나 처리 (API 호출은 스레드에서, 동시 실행 수는 세마포어로 제한)
+async def grade_essay(essay: Dict, structure: Dict, clients: Dict, cache: FactCheckCache,
+                      feedback_cache: FeedbackCache, limit: asyncio.Semaphore, coach: bool, fact_check: bool) -> Dict:
+    start = time.perf_counter()
+    record = {
+        'id': essay['id'],
+        'topic': essay['topic'],
+        'position': essay['position'],
+        'structure': structure
+    }
+
+    tasks = {}
+    async with limit:
+        if coach:
+            tasks['feedback'] = asyncio.to_thread(
+                generate_coaching_feedback, essay['text'], structure, clients,
+                position=essay['position'], topic=essay['topic'], cache=feedback_cache
+            )
+        if fact_check and structure['sources']:
+            claims = extract_claims(essay['text'])
+            tasks['fact_checks'] = asyncio.to_thread(run_fact_checks, claims, clients, cache,
+                                                    load_index(essay['topic']), load_dossier(essay['topic']))
+        results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+
+    record['feedback'] = results.get('feedback')
+    if 'fact_checks' in results:
+        record['fact_checks'] = [
+            {
+                'source': item['source'],
+                'claim': item['claim'],
+                'is_grounded': result.get('is_grounded', False),
+                'confidence': result.get('confidence', 0.0),
+                'sources': result.get('sources', [])
+            }
+            for item, result in zip(claims, results['fact_checks'])
+        ]
+    else:
+        record['fact_checks'] = []
+    record['elapsed'] = round(time.perf_counter() - start, 3)
+    return record
+
+
+async def grade_all(essays: List[Dict], structures: List[Dict], clients: Dict, out, concurrency: int,
+                    coach: bool, fact_check: bool, feedback_cache: FeedbackCache = None) -> int:
+    """완료되는 순서대로 결과를 출력 파일에 한 줄씩 기록"""
+    limit = asyncio.Semaphore(concurrency)
+    fact_check = fact_check and 'perplexity' in clients
+    cache = FactCheckCache() if fact_check else None
+    jobs = [
+        asyncio.create_task(grade_essay(essay, structure, clients, cache, feedback_cache, limit, coach, fact_check))
+        for essay, structure in zip(essays, structures)
+    ]
+
+    written = 0
+    for job in asyncio.as_completed(jobs):
+        record = await job
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        out.flush()
+        written += 1
+        if written % 10 == 0 or written == len(jobs):
+            print(f"  {written}/{len(jobs)}", file=sys.stderr)
+    return written
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="학급 단위 토론 글 일괄 코칭")
+    parser.add_argument('input', help="입력 파일 (.csv 또는 .jsonl)")
+    parser.add_argument('-o', '--output', default='results.jsonl', help="결과 JSONL (체크포인트 겸용)")
+    parser.add_argument('--concurrency', type=int, default=8, help="동시에 처리할 글 수")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="구조 분석 프로세스 수")
+    parser.add_argument('--no-coaching', action='store_true', help="코칭 피드백 생략")
+    parser.add_argument('--no-fact-check', action='store_true', help="팩트체크 생략")
+    parser.add_argument('--no-feedback-cache', action='store_true', help="거의 같은 글이어도 피드백을 매번 새로 생성")
+    args = parser.parse_args(argv)
+
+    essays = load_essays(args.input)
+    done = load_checkpoint(args.output)
+    todo = [essay for essay in essays if essay['id'] not in done]
+    print(f"전체 {len(essays)}개 중 {len(done & {e['id'] for e in essays})}개 완료, {len(todo)}개 처리", file=sys.stderr)
+    if not todo:
+        return
+
+    clients = create_clients()
+    if not clients:
+        print("⚠️ API 키가 없어 섹션별 기본 피드백만 생성합니다.", file=sys.stderr)
+
+    start = time.perf_counter()
+    structures = analyze_all([essay['text'] for essay in todo], args.workers)
+    analysis_time = time.perf_counter() - start
+
+    feedback_cache = None if args.no_feedback_cache else FeedbackCache()
+    trim_partial_line(args.output)
+    with open(args.output, 'a', encoding='utf-8') as out:
+        written = asyncio.run(grade_all(
+            todo, structures, clients, out, args.concurrency,
+            coach=not args.no_coaching, fact_check=not args.no_fact_check, feedback_cache=feedback_cache
+        ))
+
+    elapsed = time.perf_counter() - start
+    print(f"완료: {written}개, 분석 {analysis_time:.2f}초, 전체 {elapsed:.1f}초 "
+          f"({written / elapsed * 60:.1f}개/분)", file=sys.stderr)
+    if feedback_cache is not None:
+        stats = feedback_cache.stats()
+        print(f"피드백 캐시: 적중률 {stats['hit_rate']*100:.0f}%, API 호출 {stats['calls_saved']}회 절약", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import threading
+from concurrent.futures import Executor, Future
+from typing import Callable, Dict, Hashable, List
+
+
+class MicroBatcher:
+    """짧은 시간 창 안에 들어온 요청을 모아 한 번에 처리
+
+    submit()은 항목을 키별 대기 묶음에 넣고 Future를 돌려준다. 묶음은 처음 항목이 들어온 뒤
+    window초가 지나거나 max_size개가 차면 executor에서 handler(key, items)로 처리된다.
+    handler는 항목 순서대로 결과 목록을 돌려주며, 결과가 예외 객체인 항목은 그 예외로 끝난다.
+    handler 자체가 예외를 던지면 묶음의 모든 항목이 그 예외로 끝난다.
+    """
+
+    def __init__(self, handler: Callable[[Hashable, List], List], executor: Callable[[], Executor],
+                 window: float, max_size: int):
+        self.handler = handler
+        self.window = window
+        self.max_size = max_size
+        self._executor = executor
+        self._pending = {}  # 키 -> (항목 목록, Future 목록, 타이머)
+        self._lock = threading.Lock()
+        self._stats = {'items': 0, 'batches': 0}
+
+    def submit(self, key: Hashable, item) -> Future:
+        future = Future()
+        with self._lock:
+            batch = self._pending.get(key)
+            if batch is None:
+                timer = threading.Timer(self.window, self._flush, args=(key,))
+                timer.daemon = True
+                batch = self._pending[key] = ([], [], timer)
+                timer.start()
+            batch[0].append(item)
+            batch[1].append(future)
+            full = len(batch[0]) >= self.max_size
+        if full:
+            self._flush(key)
+        return future
+
+    def _flush(self, key: Hashable) -> None:
+        with self._lock:
+            batch = self._pending.pop(key, None)
+            if batch is None:
+                return
+            self._stats['items'] += len(batch[0])
+            self._stats['batches'] += 1
+        items, futures, timer = batch
+        timer.cancel()
+        self._executor().submit(self._run, key, items, futures)
+
+    def _run(self, key: Hashable, items: List, futures: List[Future]) -> None:
+        try:
+            results = self.handler(key, items)
+        except Exception as e:
+            results = [e] * len(items)
+        for future, result in zip(futures, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['mean_size'] = stats['items'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
@@ -0,0 +1,219 @@
+"""분석기 처리량과 정확도 벤치마크 (라벨이 붙은 합성 단락 기준)
+
+corpus.py로 만든(또는 --corpus로 읽은) 단락 묶음을 분석기로 돌려 다음을 잰다.
+  - 처리량     : 초당 분석한 단락 수 (analyze_argument_structure, get_section_specific_feedback)
+  - 길이별 지연 : 단락 길이 구간별 한 건당 지연 p50/p95
+  - 정확도     : 섹션 분류(혼동 행렬 포함), 본론 근거 수, 출처 추출, 섹션별 피드백 선택.
+                 tricky 종류별 정확도와 틀린 예시도 함께 보여준다.
+
+패턴이나 엔진을 바꾸기 전후를 비교하려면 바꾸기 전에 --save로 결과를 남기고, 바꾼 뒤
+--baseline으로 그 결과를 넘기면 항목마다 차이를 함께 출력한다. --engine legacy는
+bench_analyzer.py에 보존한 기존 정규식 루프 구현을 같은 기준으로 잰다.
+
+실행: python benchmarks/bench_analyzer_accuracy.py --n 10000 --save .cache/analyzer-before.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import analyzer  # noqa: E402
+import metrics  # noqa: E402
+from bench_analyzer import legacy_analyze_argument_structure  # noqa: E402
+from coaching import get_section_specific_feedback  # noqa: E402
+from corpus import load_corpus, make_corpus  # noqa: E402
+
+ENGINES = {
+    'analyzer': analyzer.analyze,
+    'legacy': legacy_analyze_argument_structure,
+}
+
+# 단락 길이 구간 (문자 수 상한)
+SIZE_BUCKETS = [(100, "~100자"), (300, "100~300자"), (1000, "300~1000자"), (float('inf'), "1000자~")]
+SECTIONS = ('intro', 'body', 'conclusion')
+
+
+def bucket_of(text):
+    for limit, label in SIZE_BUCKETS:
+        if len(text) < limit:
+            return label
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def feedback(section, evidence, sources, seed):
+    """같은 난수 상태에서 고른 피드백 (고른 문구 묶음이 같아야 같은 문구가 나옴)"""
+    random.seed(seed)
+    return get_section_specific_feedback(section, evidence or 0, bool(sources))
+
+
+# 측정
+def measure_speed(corpus, analyze, repeat):
+    texts = [item['text'] for item in corpus]
+    n = len(texts)
+    analyze_time = best_of(lambda: [analyze(text) for text in texts], repeat)
+    structures = [analyze(text) for text in texts]
+    feedback_time = best_of(lambda: [get_section_specific_feedback(s['section_type'], s['evidence_count'],
+                                                                    bool(s['sources'])) for s in structures], repeat)
+
+    # 한 건씩 재서 길이 구간별 지연 (여러 번 중 가장 빠른 값)
+    latencies = defaultdict(list)
+    for text in texts:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            analyze(text)
+            best = min(best, time.perf_counter() - start)
+        latencies[bucket_of(text)].append(best)
+
+    buckets = {}
+    for _, label in SIZE_BUCKETS:
+        values = sorted(latencies.get(label, []))
+        if values:
+            buckets[label] = {'count': len(values),
+                              'p50_us': metrics._quantile(values, 0.5) * 1e6,
+                              'p95_us': metrics._quantile(values, 0.95) * 1e6}
+    return {'essays_per_sec': n / analyze_time, 'feedback_per_sec': n / feedback_time, 'buckets': buckets}
+
+
+def measure_accuracy(corpus, analyze):
+    totals = Counter()
+    correct = Counter()
+    by_trick = defaultdict(Counter)
+    confusion = Counter()
+    errors = defaultdict(list)
+
+    def check(name, item, ok, got, expected):
+        totals[name] += 1
+        correct[name] += ok
+        trick = item['tricky'] or 'none'
+        by_trick[trick]['total'] += 1
+        by_trick[trick]['correct'] += ok
+        if not ok:
+            errors[name].append((item, got, expected))
+
+    for item in corpus:
+        structure = analyze(item['text'])
+        section = structure['section_type']
+        sources = [s.strip() for s in structure['sources']]
+        confusion[(item['section'], section)] += 1
+
+        check('section', item, section == item['section'], section, item['section'])
+        if item['section'] == 'body' and section == 'body':
+            check('evidence', item, structure['evidence_count'] == item['evidence_count'],
+                  structure['evidence_count'], item['evidence_count'])
+            if item['sources']:
+                check('sources', item, sources == item['sources'], sources, item['sources'])
+        expected_feedback = feedback(item['section'], item['evidence_count'], item['sources'], item['id'])
+        got_feedback = feedback(section, structure['evidence_count'], sources, item['id'])
+        check('feedback', item, got_feedback == expected_feedback, got_feedback, expected_feedback)
+
+    return {
+        'accuracy': {name: correct[name] / totals[name] for name in totals},
+        'counts': dict(totals),
+        'by_trick': {trick: c['correct'] / c['total'] for trick, c in sorted(by_trick.items())},
+        'confusion': {f"{a}->{b}": count for (a, b), count in sorted(confusion.items())},
+        'errors': errors
+    }
+
+
+# 출력
+def delta(value, baseline, fmt, key, scale=1):
+    """이전 결과(baseline)의 같은 항목과의 차이 (없으면 빈 문자열)"""
+    base = baseline
+    for part in key:
+        base = base.get(part) if isinstance(base, dict) else None
+    if base is None:
+        return ""
+    return f"  ({format((value - base) * scale, '+' + fmt)})"
+
+
+def report(speed, accuracy, baseline, show_errors):
+    for key, label, unit in (('essays_per_sec', "처리량", "단락/초"), ('feedback_per_sec', "피드백", "건/초")):
+        print(f"  {label:<6} : {speed[key]:>10,.0f} {unit}{delta(speed[key], baseline, ',.0f', [key])}")
+
+    print(f"\n  {'길이 구간':<11} | {'단락 수':>6} | {'p50(us)':>8} | {'p95(us)':>8}")
+    for label, entry in speed['buckets'].items():
+        print(f"  {label:<11} | {entry['count']:>6} | {entry['p50_us']:8.1f} | {entry['p95_us']:8.1f}"
+              f"{delta(entry['p95_us'], baseline, '.1f', ['buckets', label, 'p95_us'])}")
+
+    print(f"\n  {'항목':<9} | {'정확도':>7} | 검사 수")
+    for name, value in accuracy['accuracy'].items():
+        print(f"  {name:<9} | {value:7.1%} | {accuracy['counts'][name]:>6}"
+              f"{delta(value, baseline, '.1f', ['accuracy', name], scale=100)}")
+
+    print(f"\n  섹션 혼동 (정답 → 결과)")
+    print(f"  {'':<11}" + ''.join(f"{s:>12}" for s in SECTIONS))
+    for expected in SECTIONS:
+        row = ''.join(f"{accuracy['confusion'].get(f'{expected}->{got}', 0):>12}" for got in SECTIONS)
+        print(f"  {expected:<11}{row}")
+
+    print(f"\n  {'tricky 종류':<26} | 정확도 (모든 검사 항목)")
+    for trick, value in accuracy['by_trick'].items():
+        print(f"  {trick:<26} | {value:7.1%}")
+
+    for name, items in accuracy['errors'].items():
+        for item, got, expected in items[:show_errors]:
+            text = item['text'] if len(item['text']) <= 80 else item['text'][:77] + "..."
+            print(f"\n  [{name}] 결과 {got!r} / 정답 {expected!r} ({item['tricky'] or 'none'})\n    {text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분석기 처리량과 정확도")
+    parser.add_argument('--n', type=int, default=10000, help="생성할 단락 수")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tricky', type=float, default=0.15, help="패턴이 틀리기 쉬운 단락 비율 (0~1)")
+    parser.add_argument('--corpus', default='', help="corpus.py로 저장한 JSONL (주면 생성하지 않음)")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='analyzer')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--show-errors', type=int, default=2, help="항목마다 보여줄 틀린 예시 수")
+    parser.add_argument('--save', default='', help="결과를 JSON으로 저장")
+    parser.add_argument('--baseline', default='', help="비교할 이전 --save 결과")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else make_corpus(args.n, args.seed, args.tricky)
+    sections = Counter(item['section'] for item in corpus)
+    chars = sum(len(item['text']) for item in corpus)
+    print(f"엔진 {args.engine}, 단락 {len(corpus)}개 (서론 {sections['intro']} / 본론 {sections['body']} / "
+          f"결론 {sections['conclusion']}), 평균 {chars / len(corpus):.0f}자, "
+          f"글자 수 중앙값 {statistics.median(len(item['text']) for item in corpus):.0f}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"비교 기준: {args.baseline} (엔진 {baseline.get('engine')}, 단락 {baseline.get('n')}개)")
+
+    analyze = ENGINES[args.engine]
+    speed = measure_speed(corpus, analyze, args.repeat)
+    accuracy = measure_accuracy(corpus, analyze)
+    report(speed, accuracy, baseline, args.show_errors)
+
+    if args.save:
+        directory = os.path.dirname(args.save)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        result = dict(speed, engine=args.engine, n=len(corpus),
+                      **{k: v for k, v in accuracy.items() if k != 'errors'})
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.save}")
+
+
+if __name__ == "__main__":
+    main()
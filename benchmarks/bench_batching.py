@@ -0,0 +1,92 @@
+"""수업 중 동시 제출 때 코칭 요청 묶기(micro-batching) 전후 비교
+
+학생 N명이 1초 안에 거의 동시에 본론을 제출하는 상황을 로컬 스텁 서버로 만들고, 요청마다 따로
+보낼 때와 COACHING_BATCH_WINDOW 안에 들어온 요청을 JSON 배열 프롬프트 하나로 묶을 때의
+제공자 요청 수, 총 토큰 수, 학생별 응답 시간 p50/p95를 비교한다. 분당 요청 한도(PROVIDER_RPM)는
+기본값 그대로 두므로, 따로 보내면 한도 때문에 대기열에서 기다리는 시간도 함께 드러난다.
+스텁은 묶음이 클수록 출력이 길어지는 만큼 지연을 늘리고, --malformed로 형식이 깨진 응답
+비율을 주면 개별 호출로 되돌아가는 경우도 잰다.
+
+실행: python benchmarks/bench_batching.py --students 40
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_analyzer import make_essays  # noqa: E402
+from stub_server import StubConfig, start_stub_server  # noqa: E402
+
+BURST_SECONDS = 1.0         # 제출이 몰리는 시간
+REFILL_SECONDS = 8          # 두 번째 측정 전에 분당 한도 버킷이 다시 찰 때까지 기다리는 시간
+
+
+def run(essays, window, malformed):
+    import analyzer
+    import api_clients
+    import coaching
+    import metrics
+    import router
+
+    config = StubConfig(latency={'solar-pro2': (1.0, 0.2)}, malformed_rate=malformed, seed=1)
+    server = start_stub_server(config)
+    api_clients.UPSTAGE_BASE_URL = f"http://127.0.0.1:{server.server_port}/v1"
+    clients = api_clients.create_clients(upstage_key="stub")
+    clients['upstage'].client  # SDK import는 측정에서 제외
+
+    metrics.registry.reset()
+    router.ROUTER_ENABLED = False
+    coaching.COACHING_BATCH_WINDOW = window
+    coaching._batcher = None
+    rng = random.Random(7)
+
+    def submit(text):
+        time.sleep(rng.random() * BURST_SECONDS)
+        start = time.perf_counter()
+        coaching.generate_coaching_feedback(text, analyzer.analyze(text), clients, topic="학교 내 스마트폰 사용")
+        return time.perf_counter() - start
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(essays)) as pool:
+            elapsed = sorted(pool.map(submit, essays))
+    finally:
+        server.shutdown()
+
+    tokens = sum(entry['prompt_tokens'] + entry['completion_tokens']
+                 for entry in metrics.registry.token_usage().values())
+    fallbacks = metrics.registry.counters("coaching_batch").get((('outcome', 'fallback'),), 0)
+    return {
+        'requests': config.requests,
+        'tokens': tokens,
+        'p50': statistics.median(elapsed),
+        'p95': elapsed[int(len(elapsed) * 0.95) - 1],
+        'fallbacks': fallbacks
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="코칭 요청 묶기 효과")
+    parser.add_argument('--students', type=int, default=40)
+    parser.add_argument('--window', type=float, default=0.05, help="묶음 시간 창(초)")
+    parser.add_argument('--malformed', type=float, default=0.0, help="형식이 깨진 묶음 응답 비율 (0~1)")
+    args = parser.parse_args()
+
+    essays = make_essays(args.students, seed=3)
+    print(f"학생 {args.students}명, {BURST_SECONDS:.0f}초 안에 제출, 묶음 창 {args.window * 1000:.0f}ms")
+    print(f"{'방식':<6} | {'요청 수':>6} | {'총 토큰':>8} | {'p50(초)':>7} | {'p95(초)':>7} | 개별 호출로 되돌림")
+    for label, window in (("따로", 0.0), ("묶음", args.window)):
+        result = run(essays, window, args.malformed)
+        print(f"{label:<6} | {result['requests']:>6} | {result['tokens']:>8} | {result['p50']:7.2f} | "
+              f"{result['p95']:7.2f} | {result['fallbacks']}")
+        time.sleep(REFILL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""학급 현황 조회 비용 (누적 카운터 vs 모든 세션 기록 다시 읽기)
+
+저장된 글 수를 늘려 가며 대시보드 한 번 그리는 데 필요한 집계 조회 시간을 잰다.
+누적 카운터는 글 수와 무관해야 하고, 비교용으로 세션 저장소의 메시지를 모두 읽어
+다시 분석하는 방식도 함께 잰다.
+
+실행: python benchmarks/bench_class_stats.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import analyzer  # noqa: E402
+from bench_analyzer import make_essays  # noqa: E402
+from class_stats import SQLiteClassStats  # noqa: E402
+from session_store import SQLiteSessionStore  # noqa: E402
+
+CLASSES = ["1반", "2반", "3반", "4반"]
+TOPICS = ["학교 내 스마트폰 사용", "온라인 수업의 효과성", "학생 자치권 확대"]
+ESSAYS_PER_SESSION = 5
+SIZES = (1000, 10000, 50000)
+
+
+def best_of(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def rescan(store, sessions):
+    counts = {}
+    for session_id in sessions:
+        for message in store.load_range(session_id, 'message', 0, store.count(session_id, 'message')):
+            section = analyzer.analyze(message['content'])['section_type']
+            counts[section] = counts.get(section, 0) + 1
+    return counts
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="class-stats-bench-")
+    stats = SQLiteClassStats(os.path.join(directory, "stats.sqlite3"))
+    store = SQLiteSessionStore(os.path.join(directory, "sessions.sqlite3"))
+    essays = make_essays(max(SIZES))
+
+    print(f"{'저장된 글':>10} | {'카운터 조회(ms)':>15} | {'다시 읽기(ms)':>14} | 제출당 기록(ms)")
+    sessions = []
+    written = 0
+    for size in SIZES:
+        start = time.perf_counter()
+        for i in range(written, size):
+            if i % ESSAYS_PER_SESSION == 0:
+                sessions.append(f"s{i}")
+            class_id, topic = CLASSES[i % len(CLASSES)], TOPICS[i % len(TOPICS)]
+            store.append(sessions[-1], 'message', {'role': 'user', 'content': essays[i]})
+            stats.record_submission(class_id, topic, analyzer.analyze(essays[i]),
+                                    new_session=i % ESSAYS_PER_SESSION == 0)
+        per_write = (time.perf_counter() - start) / (size - written)
+        written = size
+
+        query = best_of(lambda: stats.query("3반", TOPICS[0]))
+        scan = best_of(lambda: rescan(store, sessions), repeat=1)
+        print(f"{size:>10} | {query * 1000:15.3f} | {scan * 1000:14.1f} | {per_write * 1000:.3f}")
+
+
+if __name__ == "__main__":
+    main()
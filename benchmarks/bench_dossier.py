@@ -0,0 +1,83 @@
+"""주제 자료집 미리 가져오기 전후의 팩트체크 지연 시간
+
+예시 주제 하나로 학생 글에 자주 나오는 주장들을 팩트체크해, 자료집이 없을 때(매번 웹 검색)와
+입장 선택 시점에 자료집을 만들어 둔 뒤(로컬 색인에서 먼저 근거를 찾음)의 지연 중앙값과
+로컬 적중률을 비교한다. 결과 캐시는 끄고 잰다.
+
+기본은 로컬 스텁 서버를 쓰며, 스텁의 검색 응답은 주제 자료 조사 결과처럼 보이는 고정 문서다.
+실제 적중률은 Perplexity 응답 내용에 따라 달라진다.
+
+실행: python benchmarks/bench_dossier.py
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import StubConfig, start_stub_server  # noqa: E402
+
+TOPIC = "학교 내 스마트폰 사용"
+
+DOSSIER_TEXT = (
+    "2023년 과학기술정보통신부 조사에 따르면 청소년의 95%가 스마트폰을 사용합니다. "
+    "청소년의 스마트폰 과의존 위험군 비율은 40.1%로 전 연령대 중 가장 높았습니다. "
+    "한국교육개발원 연구에서 학습 앱을 활용한 수업의 학업 성취도가 3.5% 향상되었습니다. "
+    "2023년 교육부 설문 결과 학부모의 60%가 학교 내 스마트폰 제한적 허용에 찬성했습니다. "
+    "국가인권위원회는 2024년 학교의 일괄 휴대전화 수거가 인권 침해가 아니라고 판단을 바꾸었습니다. "
+    "유네스코는 2023년 보고서에서 학교 내 스마트폰 사용 제한을 권고했습니다.\n"
+    "출처: https://www.msit.go.kr/ https://www.kedi.re.kr/ https://www.humanrights.go.kr/"
+)
+
+CLAIMS = [
+    ("과학기술정보통신부", "청소년의 95%가 스마트폰을 사용합니다"),
+    ("한국교육개발원", "학습 앱 활용 수업의 학업 성취도가 3.5% 향상되었습니다"),
+    ("교육부 설문", "학부모의 60%가 스마트폰 제한적 허용에 찬성했습니다"),
+    ("유네스코", "학교 내 스마트폰 사용 제한을 권고했습니다"),
+    ("조사", "청소년 스마트폰 과의존 위험군 비율이 40.1%입니다"),
+    ("뉴스", "스마트폰 사용 시간이 긴 학생일수록 수면 시간이 짧습니다"),
+]
+
+
+def run_checks(clients, dossier):
+    from fact_check import perplexity_fact_check
+
+    times, local = [], 0
+    for source, claim in CLAIMS:
+        start = time.perf_counter()
+        result = perplexity_fact_check(claim, source, clients, dossier=dossier)
+        times.append(time.perf_counter() - start)
+        local += result.get('reference') == 'dossier'
+    return times, local
+
+
+def main():
+    server = start_stub_server(StubConfig(search_text=DOSSIER_TEXT))
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    os.environ.update(UPSTAGE_BASE_URL=base_url + "/v1", PERPLEXITY_BASE_URL=base_url,
+                      UPSTAGE_API_KEY="stub", PERPLEXITY_API_KEY="stub")
+    os.environ["DOSSIER_DIR"] = tempfile.mkdtemp(prefix="dossier-bench-")
+
+    from api_clients import create_clients
+    import dossier
+
+    clients = create_clients()
+    before, _ = run_checks(clients, None)
+
+    start = time.perf_counter()
+    dossier.build_dossier(TOPIC, clients)
+    build_time = time.perf_counter() - start
+    after, local = run_checks(clients, dossier.load_dossier(TOPIC))
+
+    print(f"주제: {TOPIC} (주장 {len(CLAIMS)}개)")
+    print(f"자료집 생성 (입장 선택 시 백그라운드): {build_time:.2f}초, 검색 {len(dossier.DOSSIER_QUESTIONS)}회")
+    print(f"자료집 없음  : 중앙값 {statistics.median(before):.2f}초")
+    print(f"자료집 있음  : 중앙값 {statistics.median(after):.2f}초 (로컬 근거 {local}/{len(CLAIMS)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""팩트체크 근거 스트리밍 전후의 첫 근거 표시 시간과 전체 시간
+
+출처가 붙은 주장 여러 개를 로컬 스텁 서버로 팩트체크하면서, 웹 검색 답변을 다 받은 뒤 보여줄 때와
+생성되는 대로 보여줄 때(iter_fact_check_events)의 버튼 기준 첫 근거 표시 시간, 주장별 첫 근거
+표시 시간 p50/p95, 주장별 판정 완료 시간 p50/p95를 비교한다. 스트리밍을 끄면 근거는 판정과 함께
+처음 보이므로 첫 근거 시간이 곧 판정 시간이다.
+
+실행: python benchmarks/bench_fact_check_stream.py --claims 6
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import StubConfig, start_stub_server  # noqa: E402
+
+SOURCES = ["통계청에 따르면", "한국교육개발원 연구에 따르면", "OECD 보고서에 의하면", "교육부 조사 결과"]
+
+
+def make_claims(n):
+    return [{'source': SOURCES[i % len(SOURCES)],
+             'claim': f"청소년의 {40 + i}%가 하루 세 시간 이상 스마트폰을 사용한다",
+             'span': (0, 0)} for i in range(n)]
+
+
+def run(claims, stream, search_latency):
+    import api_clients
+    import fact_check
+    import metrics
+
+    server = start_stub_server(StubConfig(latency={'sonar-small-online': (search_latency, 0.3),
+                                                   'groundedness-check': (0.5, 0.2)}, seed=1))
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    api_clients.UPSTAGE_BASE_URL = f"{base_url}/v1"
+    api_clients.PERPLEXITY_BASE_URL = base_url
+    clients = api_clients.create_clients(upstage_key="stub", perplexity_key="stub")
+    clients['perplexity'].client, clients['upstage'].client  # SDK import는 측정에서 제외
+
+    start = time.perf_counter()
+    first_seen, done_at = {}, {}
+    try:
+        for idx, stage, _ in fact_check.iter_fact_check_events(claims, clients, stream=stream):
+            now = time.perf_counter() - start
+            first_seen.setdefault(idx, now)
+            if stage == 'done':
+                done_at[idx] = now
+    finally:
+        server.shutdown()
+    first, done = sorted(first_seen.values()), sorted(done_at.values())
+    return {
+        'button_first': first[0],
+        'first_p50': metrics._quantile(first, 0.5),
+        'first_p95': metrics._quantile(first, 0.95),
+        'done_p50': metrics._quantile(done, 0.5),
+        'done_p95': metrics._quantile(done, 0.95)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="팩트체크 근거 스트리밍 효과")
+    parser.add_argument('--claims', type=int, default=6)
+    parser.add_argument('--search-latency', type=float, default=2.0, help="웹 검색 지연 중앙값(초)")
+    args = parser.parse_args()
+
+    claims = make_claims(args.claims)
+    print(f"주장 {args.claims}개, 웹 검색 지연 중앙값 {args.search_latency:.1f}초")
+    print(f"{'근거 표시':<10} | {'첫 근거(초)':>10} | {'주장별 첫 근거 p50/p95':>22} | {'판정 p50/p95':>14}")
+    for label, stream in (("다 받은 뒤", False), ("스트리밍", True)):
+        r = run(claims, stream, args.search_latency)
+        print(f"{label:<10} | {r['button_first']:10.2f} | {r['first_p50']:10.2f} / {r['first_p95']:<9.2f} | "
+              f"{r['done_p50']:5.2f} / {r['done_p95']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""세션 길이에 따른 코칭 프롬프트 토큰 수 (전체 기록 재전송 vs 글 상태 요약)
+
+학생 한 명이 서론 → 본론 여러 단락 → 결론을 반복해 쓰는 세션을 흉내 내고,
+턴마다 코칭 호출의 prompt_tokens를 API 응답의 usage에서 읽는다.
+기본은 로컬 스텁 서버를 쓰고, --live를 주면 환경 변수의 실제 API 키를 쓴다.
+
+실행: python benchmarks/bench_prompt_tokens.py --turns 40
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import StubConfig, start_stub_server  # noqa: E402
+
+PARAGRAPHS = [
+    "저는 학교 내 스마트폰 사용에 찬성합니다. 학생들의 자율성을 믿어야 하기 때문입니다.",
+    "첫째, 통계청에 따르면 청소년의 95%가 스마트폰을 사용합니다. 이미 생활의 일부입니다.",
+    "둘째, 비상시 보호자와 바로 연락할 수 있습니다. 안전은 무엇보다 중요합니다.",
+    "셋째, 한국교육개발원 연구에서 학습 앱 활용 시 성취도가 3.5% 향상되었습니다.",
+    "넷째, 2023년 조사 결과 학부모의 60%가 제한적 허용에 찬성했습니다.",
+    "따라서 학교 내 스마트폰 사용을 규칙과 함께 허용해야 합니다.",
+]
+
+
+def prompt_tokens(metrics) -> int:
+    return metrics.registry.token_usage().get(('upstage', 'solar-pro2'), {}).get('prompt_tokens', 0)
+
+
+def run_session(turns, clients, use_state):
+    import analyzer
+    import metrics
+    from coaching import generate_coaching_feedback
+    from essay_state import EssayState
+
+    essay = EssayState()
+    history = []
+    per_turn = []
+    for turn in range(turns):
+        text = PARAGRAPHS[turn % len(PARAGRAPHS)]
+        structure = analyzer.analyze(text)
+        context = essay.summary if use_state else "\n".join(history)
+        before = prompt_tokens(metrics)
+        generate_coaching_feedback(text, structure, clients, position="찬성", topic="학교 내 스마트폰 사용",
+                                   context=context)
+        per_turn.append(prompt_tokens(metrics) - before)
+        essay.update(text, structure)
+        history.append(text)
+    return per_turn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="턴별 코칭 프롬프트 토큰 수")
+    parser.add_argument('--turns', type=int, default=40)
+    parser.add_argument('--live', action='store_true', help="스텁 대신 실제 API 사용")
+    args = parser.parse_args()
+
+    if not args.live:
+        server = start_stub_server(StubConfig(latency={'solar-pro2': (0.0, 0.0)}))
+        os.environ["UPSTAGE_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+        os.environ["UPSTAGE_API_KEY"] = "stub"
+
+    from api_clients import create_clients
+    clients = {'upstage': create_clients()['upstage']}
+
+    naive = run_session(args.turns, clients, use_state=False)
+    state = run_session(args.turns, clients, use_state=True)
+
+    print(f"{'턴':>4} | {'전체 기록':>9} | {'글 상태 요약':>11}")
+    for turn in sorted({0, 1, 5, 10, 20, args.turns - 1} & set(range(args.turns))):
+        print(f"{turn + 1:>4} | {naive[turn]:>9} | {state[turn]:>11}")
+    print(f"최대   | {max(naive):>9} | {max(state):>11}")
+
+
+if __name__ == "__main__":
+    main()
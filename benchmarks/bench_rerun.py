@@ -0,0 +1,69 @@
+"""대화 길이에 따른 app.py 재실행 시간 벤치마크 (Streamlit AppTest 사용)
+
+메시지 수를 10개에서 500개까지 늘리며 한 번의 재실행에 걸리는 시간을 잰다.
+대화는 임시 세션 저장소에 미리 기록해 두고 ?sid=로 이어서 연다.
+API는 호출하지 않는다 (가짜 키로 클라이언트만 만든다).
+
+실행: python benchmarks/bench_rerun.py
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+SIZES = [10, 50, 100, 250, 500]
+REPEAT = 5
+
+
+def make_messages(n):
+    messages = []
+    for i in range(n):
+        if i % 2 == 0:
+            messages.append({"role": "user", "content": f"통계청에 따르면 청소년의 {i}%가 스마트폰을 사용합니다. 첫째, 자율성이 길러집니다."})
+        else:
+            messages.append({"role": "assistant", "content": "좋은 근거예요! 👍 구체적인 사례를 추가해보면 어떨까요?",
+                             "latency": {"ttft": 0.4, "total": 1.2, "fell_back": False}})
+    return messages
+
+
+def measure(n):
+    from session_store import SQLiteSessionStore
+
+    store = SQLiteSessionStore(os.environ["SESSION_DB_PATH"])
+    session_id = uuid.uuid4().hex
+    store.save_meta(session_id, {"coaching_started": True, "debate_topic": "학교 내 스마트폰 사용",
+                                 "user_position": "찬성", "last_section": "본론"})
+    for message in make_messages(n):
+        store.append(session_id, 'message', message)
+
+    at = AppTest.from_file(APP_PATH, default_timeout=30)
+    at.query_params["sid"] = session_id
+    at.run()  # 첫 실행 (import, 캐시 준비, 최근 기록 불러오기)
+
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    os.environ.setdefault("UPSTAGE_API_KEY", "bench")
+    os.environ.setdefault("PERPLEXITY_API_KEY", "bench")
+    os.environ["SESSION_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "sessions.sqlite3")
+    sys.path.insert(0, ROOT)
+
+    print(f"{'메시지 수':>8} | {'재실행(ms)':>10}")
+    for n in SIZES:
+        print(f"{n:>8} | {measure(n) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""코칭 모델 라우팅 전후의 응답 시간과 예상 비용
+
+예시 글 묶음(서론/본론/결론이 섞인 학생 글)을 로컬 스텁 서버로 코칭하면서, 항상 큰 모델로 보낼 때와
+라우터가 템플릿/빠른 모델/큰 모델을 고를 때의 응답 시간 p50/p95와 경로 비율, 큰 모델만 쓸 때
+대비 예상 비용을 비교한다. 큰 모델이 느려진 상황(지연 중앙값 4초)도 함께 잰다.
+비용은 ROUTER_MODEL_COSTS의 호출당 상대 비용으로 추정한다.
+
+실행: python benchmarks/bench_router.py --essays 120
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_analyzer import make_essays  # noqa: E402
+from stub_server import StubConfig, start_stub_server  # noqa: E402
+
+INTROS = ["저는 학교 내 스마트폰 사용에 찬성합니다.", "저는 온라인 수업 확대에 반대합니다."]
+CONCLUSIONS = ["따라서 학교 내 스마트폰 사용을 허용해야 합니다.", "결론적으로 대면 수업이 더 효과적입니다."]
+
+
+def make_turns(n):
+    """학생 한 명이 서론, 본론 두 단락, 결론 순서로 제출한다고 보고 n개 제출 생성"""
+    bodies = iter(make_essays(n))
+    turns = []
+    for i in range(n):
+        step = i % 4
+        if step == 0:
+            turns.append(INTROS[i // 4 % len(INTROS)])
+        elif step == 3:
+            turns.append(CONCLUSIONS[i // 4 % len(CONCLUSIONS)])
+        else:
+            turns.append(next(bodies))
+    return turns
+
+
+def run(turns, enabled, full_latency, concurrency):
+    import analyzer
+    import api_clients
+    import coaching
+    import metrics
+    import router
+
+    server = start_stub_server(StubConfig(latency={'solar-pro2': (full_latency, 0.3)}, seed=1))
+    api_clients.UPSTAGE_BASE_URL = f"http://127.0.0.1:{server.server_port}/v1"
+    clients = api_clients.create_clients(upstage_key="stub")
+
+    metrics.registry.reset()
+    router.ROUTER_ENABLED = enabled
+    log_path = os.path.join(tempfile.mkdtemp(prefix="router-bench-"), "routing.jsonl")
+    router.ROUTER_LOG_PATH = log_path
+
+    def submit(text):
+        coaching.generate_coaching_feedback(text, analyzer.analyze(text), clients, topic="학교 내 스마트폰 사용")
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(submit, turns))
+    finally:
+        server.shutdown()
+
+    with open(log_path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    elapsed = sorted(r['elapsed'] for r in records)
+    return router.summarize(records), statistics.median(elapsed), elapsed[int(len(elapsed) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="코칭 모델 라우팅 효과")
+    parser.add_argument('--essays', type=int, default=120)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    turns = make_turns(args.essays)
+    print(f"{'상황':<14} | {'라우팅':<4} | {'p50(초)':>7} | {'p95(초)':>7} | {'template/fast/full':>17} | 예상 비용")
+    for label, full_latency in (("보통", 1.0), ("큰 모델 지연", 4.0)):
+        for enabled in (False, True):
+            summary, p50, p95 = run(turns, enabled, full_latency, args.concurrency)
+            shares = "/".join(f"{summary['routes'].get(r, {}).get('share', 0):.0%}" for r in ('template', 'fast', 'full'))
+            print(f"{label:<14} | {'켬' if enabled else '끔':<4} | {p50:7.2f} | {p95:7.2f} | {shares:>17} | "
+                  f"{summary['relative_cost']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
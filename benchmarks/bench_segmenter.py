@@ -0,0 +1,67 @@
+"""문장 분할기 처리량 벤치마크
+
+합성 한국어 글 묶음을 분할해 초당 문자 수/문장 수를 재고, 글 길이를 늘려도
+글자당 시간이 일정한지(선형인지) 확인한다. 기존 split('.') 추정이 틀리던
+예문들의 문장 수도 함께 보여준다.
+
+실행: python benchmarks/bench_segmenter.py [글 수]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import segmenter  # noqa: E402
+from bench_analyzer import make_essays  # noqa: E402
+
+# (예문, 실제 문장 수)
+CASES = [
+    ("한국교육개발원 연구에서 학습 효과가 3.5% 향상되었습니다.", 1),
+    ("자세한 내용은 https://example.com/report.pdf 를 참고하세요.", 1),
+    ("1. 수업 집중도가 떨어질 수 있습니다. 2. 사이버 폭력 위험이 있습니다.", 2),
+    ("정말 그럴까요? 저는 아니라고 봅니다!", 2),
+    ("저는 찬성합니다 왜냐하면 자율성이 중요하기 때문이에요", 2),
+    ("그런데... 다음 문장입니다.", 1),
+    ("그렇습니다... 하지만 반대 의견도 있습니다.", 2),
+    ("그러니까 우리는 찬성합니다.", 1),
+    ("정말 그렇습니까 저는 아니라고 봅니다.", 2),
+    ("사이다 한 잔이 건강에 나쁩니다.", 1),
+]
+
+
+def bench(texts, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            segmenter.sentence_spans(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    essays = make_essays(n)
+    chars = sum(len(text) for text in essays)
+    count = sum(segmenter.count_sentences(text) for text in essays)
+    elapsed = bench(essays)
+    print(f"글 {n}개, {chars / 1e6:.1f}M자, 문장 {count}개")
+    print(f"  {elapsed * 1000:8.1f} ms  ({chars / elapsed / 1e6:5.2f}M자/초, {count / elapsed:,.0f}문장/초)")
+
+    # 글 길이를 늘려도 글자당 시간이 같아야 함
+    print("\n  길이 배수 | 글자당(ns)")
+    for factor in (1, 10, 100):
+        long_texts = [' '.join(essays[i:i + factor]) for i in range(0, min(n, 100 * factor), factor)]
+        long_chars = sum(len(text) for text in long_texts)
+        print(f"  {factor:>9} | {bench(long_texts) / long_chars * 1e9:9.1f}")
+
+    print("\n  예문 (split('.') 추정 → 분할기 / 실제)")
+    for text, expected in CASES:
+        legacy = text.count('.') or 1
+        print(f"  {legacy:>2} → {segmenter.count_sentences(text):>2} / {expected}  {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""HTTP 서비스 처리량과 워커 프로세스 수
+
+service.py를 워커 1/2/4개로 띄우고, 동시 요청을 계속 보내 /coach와 /analyze의 초당 처리량을 잰다.
+/coach는 스텁 서버의 고정 지연(LLM 호출) 동안 스레드를 붙잡고 있는 I/O 위주 요청이라 워커당
+동시 처리 수(SERVICE_THREADS)를 작게 두면 워커 수에 비례해 늘어나야 한다. /analyze는 CPU만
+쓰므로 CPU 코어 수까지만 늘어난다. 피드백 캐시는 건너뛰도록(FEEDBACK_CACHE_BYPASS=1) 두고 잰다.
+
+실행: python benchmarks/bench_service.py --workers 1 2 4 --threads 4 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import StubConfig, start_stub_server  # noqa: E402
+
+ESSAY = ("첫째, 통계청에 따르면 청소년의 95%가 스마트폰을 사용합니다. 둘째, 비상시 연락이 가능합니다. "
+         "한국교육개발원 연구에서 학습 효과가 3.5% 향상되었습니다.")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_service(workers: int, threads: int, stub_url: str, state_dir: str):
+    port = free_port()
+    env = dict(
+        os.environ,
+        UPSTAGE_BASE_URL=f"{stub_url}/v1", PERPLEXITY_BASE_URL=stub_url,
+        UPSTAGE_API_KEY="stub", PERPLEXITY_API_KEY="stub",
+        PROVIDER_RPM="upstage=0,perplexity=0", FEEDBACK_CACHE_BYPASS="1",
+        SERVICE_THREADS=str(threads), SERVICE_STATE="sqlite",
+        FACT_CACHE_PATH=os.path.join(state_dir, "fact.sqlite3"),
+        SERVICE_FEEDBACK_CACHE_PATH=os.path.join(state_dir, "feedback.sqlite3"),
+        CLASS_STATS_DB_PATH=os.path.join(state_dir, "stats.sqlite3"),
+    )
+    process = subprocess.Popen(
+        [sys.executable, "service.py", "--workers", str(workers), "--port", str(port)],
+        cwd=ROOT, env=env
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    pids = set()
+    while time.monotonic() < deadline:
+        try:
+            # 모든 워커가 뜰 때까지 (서로 다른 pid가 workers개 보일 때까지)
+            pids.add(httpx.get(f"{url}/healthz", timeout=1).json()['pid'])
+            if len(pids) >= workers:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("서비스가 시작되지 않았습니다.")
+
+
+async def run_load(url: str, path: str, concurrency: int, duration: float):
+    done, errors = 0, 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(client):
+        nonlocal done, errors
+        while time.perf_counter() < deadline:
+            body = {'text': ESSAY, 'topic': "학교 내 스마트폰 사용", 'position': "찬성"}
+            try:
+                response = await client.post(f"{url}{path}", json=body)
+                response.raise_for_status()
+                done += 1
+            except httpx.HTTPError:
+                errors += 1
+
+    # keep-alive 연결은 처음 받은 워커에 묶이므로 요청마다 새로 연결해 워커에 고르게 나뉘게 함
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=0)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return done / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서비스 워커 수별 처리량")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=4, help="워커당 동시 코어 호출 수 (SERVICE_THREADS)")
+    parser.add_argument('--concurrency', type=int, default=64, help="동시에 보내는 요청 수")
+    parser.add_argument('--duration', type=float, default=10, help="엔드포인트별 측정 시간(초)")
+    parser.add_argument('--llm-latency', type=float, default=0.5, help="스텁 코칭 응답 지연(초)")
+    args = parser.parse_args()
+
+    stub = start_stub_server(StubConfig(latency={'solar-pro2': (args.llm_latency, 0)}))
+    stub_url = f"http://127.0.0.1:{stub.server_port}"
+    print(f"CPU 코어 {os.cpu_count()}개, 워커당 스레드 {args.threads}, 동시 요청 {args.concurrency}, "
+          f"코칭 지연 {args.llm_latency}s")
+    print(f"{'워커':>4} | {'/coach req/s':>12} | {'배율':>5} | {'/analyze req/s':>14} | {'배율':>5} | 오류")
+
+    base = {}
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as state_dir:
+            process, url = start_service(workers, args.threads, stub_url, state_dir)
+            try:
+                # 워커마다 첫 호출 때 SDK를 불러오므로 잠깐 돌린 뒤 잰다
+                asyncio.run(run_load(url, '/coach', args.concurrency, 3))
+                coach, coach_errors = asyncio.run(run_load(url, '/coach', args.concurrency, args.duration))
+                analyze, analyze_errors = asyncio.run(run_load(url, '/analyze', args.concurrency, args.duration))
+            finally:
+                process.terminate()
+                process.wait()
+        base.setdefault('coach', coach)
+        base.setdefault('analyze', analyze)
+        print(f"{workers:>4} | {coach:12.1f} | {coach / base['coach']:5.2f} | {analyze:14.1f} | "
+              f"{analyze / base['analyze']:5.2f} | {coach_errors + analyze_errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""콜드 스타트와 재실행 시간 벤치마크
+
+새 프로세스에서 다음을 잰다.
+  - 앱 모듈 import 시간과, 그 시점에 openai/httpx가 이미 올라왔는지
+  - AppTest 첫 실행(콜드) 시간과 이후 재실행의 스크립트 시간 중앙값
+
+API는 호출하지 않는다 (가짜 키로 클라이언트만 만든다).
+
+실행: python benchmarks/bench_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPEAT = 10
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import streamlit
+streamlit_time = time.perf_counter() - start
+start = time.perf_counter()
+import analyzer, api_clients, coaching, fact_check, fact_cache, feedback_cache, metrics, scheduler, session_store
+print(json.dumps({
+    'streamlit': streamlit_time,
+    'app_modules': time.perf_counter() - start,
+    'openai_loaded': 'openai' in sys.modules,
+    'httpx_loaded': 'httpx' in sys.modules
+}))
+"""
+
+RUN_PROBE = """
+import json, os, statistics, sys, threading, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(os.path.join(%(root)r, 'app.py'), default_timeout=60)
+start = time.perf_counter()
+at.run()
+cold = time.perf_counter() - start
+# 백그라운드 SDK 준비가 끝난 뒤의 재실행만 잰다
+start = time.perf_counter()
+for thread in threading.enumerate():
+    if thread.name == 'api-warm-up':
+        thread.join()
+warm_up = time.perf_counter() - start
+times = []
+for _ in range(%(repeat)d):
+    start = time.perf_counter()
+    at.run()
+    times.append(time.perf_counter() - start)
+print(json.dumps({'cold': cold, 'warm_up': warm_up, 'rerun': statistics.median(times)}))
+"""
+
+
+def probe(code):
+    env = dict(os.environ, UPSTAGE_API_KEY="bench", PERPLEXITY_API_KEY="bench",
+               SESSION_STORE="memory", FACT_CACHE_PATH=":memory:")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    imports = probe(IMPORT_PROBE)
+    runs = probe(RUN_PROBE % {'root': ROOT, 'repeat': REPEAT})
+
+    print(f"import streamlit     : {imports['streamlit'] * 1000:7.1f} ms")
+    print(f"import 앱 모듈        : {imports['app_modules'] * 1000:7.1f} ms "
+          f"(openai {'로드됨' if imports['openai_loaded'] else '지연'}, httpx {'로드됨' if imports['httpx_loaded'] else '지연'})")
+    print(f"첫 실행 (콜드)        : {runs['cold'] * 1000:7.1f} ms")
+    print(f"SDK 준비 대기         : {runs['warm_up'] * 1000:7.1f} ms (백그라운드, 첫 화면과 무관)")
+    print(f"재실행 (중앙값 {REPEAT}회) : {runs['rerun'] * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
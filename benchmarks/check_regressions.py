@@ -0,0 +1,152 @@
+"""고친 동시성/복구 버그가 다시 생기지 않았는지 확인
+
+API 키나 네트워크 없이 가짜 클라이언트로 각 버그를 재현하는 조건을 만들고, 고친 동작이
+유지되는지 본다. 하나라도 어긋나면 AssertionError로 멈춘다.
+  - hedge : 호출 전에 바로 실패한 시도(CircuitOpenError)에 request_feedback이 멈추지 않고
+            예외를 돌려주는지, 헤지한 두 번째 시도가 먼저 오면 그 응답을 쓰는지
+  - scheduler : 대기 순번 콜백이 느려도(화면 갱신) 다른 제공자의 요청이 그동안 기다리지 않는지
+  - checkpoint : 마지막 줄이 잘린 결과 파일에 batch_grade로 이어 쓰면 모든 줄이 JSON이고 id가 한 번씩인지
+
+실행: python benchmarks/check_regressions.py
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_grade  # noqa: E402
+import coaching  # noqa: E402
+from api_clients import CircuitOpenError  # noqa: E402
+from scheduler import Scheduler  # noqa: E402
+
+# 묶음 호출을 거치지 않도록 시스템 프롬프트가 다른 메시지 사용
+MESSAGES = [{"role": "system", "content": "check"}, {"role": "user", "content": "check"}]
+
+
+def fake_clients(create):
+    """chat.completions.create만 흉내 내는 upstage 클라이언트"""
+    return {'upstage': SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))}
+
+
+def reply(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+def call_with_timeout(func, timeout):
+    """func()를 다른 스레드에서 부르고 timeout 안에 돌아오지 않으면 AssertionError"""
+    result = []
+    worker = threading.Thread(target=lambda: result.append(func()), daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        raise AssertionError(f"{timeout}초 안에 돌아오지 않음 (교착)")
+    return result[0]
+
+
+# 검사
+def check_hedge(rounds=200):
+    def broken(**kwargs):
+        raise CircuitOpenError("open")
+
+    clients = fake_clients(broken)
+    for _ in range(rounds):
+        future = call_with_timeout(lambda: coaching.request_feedback(MESSAGES, clients, hedge_after=0), 2)
+        error = future.exception(timeout=2)
+        if not isinstance(error, CircuitOpenError):
+            raise AssertionError(f"바로 실패한 시도의 예외가 전달되지 않음: {error!r}")
+
+    calls = []
+
+    def slow_then_fast(**kwargs):
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(1.0)
+            return reply("느린 응답")
+        return reply("헤지 응답")
+
+    stored = []
+    future = coaching.request_feedback(MESSAGES, fake_clients(slow_then_fast), hedge_after=0.1,
+                                       on_success=stored.append)
+    if future.result(timeout=2) != "헤지 응답" or stored != ["헤지 응답"]:
+        raise AssertionError(f"헤지 응답을 쓰지 않음: {future.result()!r}, {stored!r}")
+    return f"즉시 실패 {rounds}회 교착 없음, 헤지 응답 사용"
+
+
+def check_scheduler(callback_seconds=1.0):
+    scheduler = Scheduler(provider_rpm={'upstage': 60, 'perplexity': 60})
+    # upstage 토큰을 모두 써서 다음 요청이 대기열에서 기다리게 함
+    while scheduler._buckets['upstage'].tokens >= 1:
+        scheduler.acquire('upstage', 'check')
+    in_callback = threading.Event()
+
+    def slow_callback(ahead):
+        in_callback.set()
+        time.sleep(callback_seconds)
+
+    def waiting():
+        with scheduler.report_position(slow_callback):
+            scheduler.acquire('upstage', 'check', timeout=10)
+
+    worker = threading.Thread(target=waiting, daemon=True)
+    worker.start()
+    if not in_callback.wait(2):
+        raise AssertionError("대기 순번 콜백이 호출되지 않음")
+    start = time.perf_counter()
+    call_with_timeout(lambda: scheduler.acquire('perplexity', 'check'), callback_seconds * 2)
+    blocked = time.perf_counter() - start
+    worker.join(10)
+    if blocked > callback_seconds / 2:
+        raise AssertionError(f"콜백이 도는 동안 다른 제공자 요청이 {blocked:.2f}초 기다림")
+    return f"콜백 {callback_seconds:.1f}초 동안 다른 제공자 대기 {blocked * 1000:.1f}ms"
+
+
+def check_checkpoint(n=6):
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "essays.jsonl")
+        output = os.path.join(directory, "results.jsonl")
+        with open(source, 'w', encoding='utf-8') as f:
+            for i in range(n):
+                f.write(json.dumps({'id': i, 'text': f"첫째, 근거 {i}입니다. 둘째, 또 다른 근거입니다."},
+                                   ensure_ascii=False) + "\n")
+        args = [source, '-o', output, '--workers', '1', '--no-coaching', '--no-fact-check']
+        with contextlib.redirect_stderr(io.StringIO()):
+            batch_grade.main(args)
+            # 기록 중에 멈춘 것처럼 마지막 줄을 반쯤 자름
+            with open(output, 'rb+') as f:
+                size = f.seek(0, os.SEEK_END)
+                f.truncate(size - 40)
+            batch_grade.main(args)
+        with open(output, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    try:
+        ids = [json.loads(line)['id'] for line in lines]
+    except ValueError as e:
+        raise AssertionError(f"이어 쓴 결과에 JSON이 아닌 줄이 있음: {e}")
+    if sorted(ids) != [str(i) for i in range(n)]:
+        raise AssertionError(f"id가 빠지거나 겹침: {ids}")
+    return f"잘린 줄을 지우고 {n}개 id를 한 번씩 기록"
+
+
+CHECKS = [
+    ('hedge', check_hedge),
+    ('scheduler', check_scheduler),
+    ('checkpoint', check_checkpoint),
+]
+
+
+def main():
+    for name, check in CHECKS:
+        start = time.perf_counter()
+        detail = check()
+        print(f"  {name:<10} 통과 ({time.perf_counter() - start:.2f}초) {detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""라벨이 붙은 합성 한국어 토론 단락 생성기
+
+서론/본론/결론 단락을 만들고, 각 단락에 정답 라벨을 함께 붙인다.
+  - section        : 'intro' / 'body' / 'conclusion'
+  - evidence_count : 본론의 근거 수 (1~4, 서론/결론은 None)
+  - sources        : 본론에 인용한 출처 이름 (쓰인 순서대로)
+  - numbered       : 근거에 번호('첫째', '첫 번째로', '1.')를 붙였는지
+  - tricky         : 현재 패턴이 틀리기 쉬운 표현을 일부러 넣었으면 그 종류, 아니면 None
+
+라벨은 분석기 결과가 아니라 글을 만든 의도다. 그래서 tricky 단락에서 정확도가 떨어지는 것은
+생성기 오류가 아니라 패턴의 한계다. 정교화 문장 수를 다양하게 두어 짧은 한 줄부터
+1000자가 넘는 단락까지 섞여 나온다.
+
+실행: python benchmarks/corpus.py --n 10000 --out .cache/corpus.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Dict, List
+
+TOPICS = ["학교 내 스마트폰 사용", "교복 착용 의무화", "온라인 수업 확대", "청소년 게임 시간 제한",
+          "학생 자치권 확대", "급식 잔반 줄이기 정책", "초등학생 코딩 교육 의무화", "두발 자유화"]
+
+REASONS = [
+    "학생들의 자율성과 책임감이 길러집니다",
+    "비상시 보호자와 바로 연락할 수 있습니다",
+    "수업 중에 필요한 자료를 바로 찾아볼 수 있습니다",
+    "디지털 소양을 자연스럽게 기를 수 있습니다",
+    "통학에 드는 시간과 비용이 줄어듭니다",
+    "가정 형편에 따라 학습 격차가 커질 수 있습니다",
+    "친구들과 협동할 기회가 줄어듭니다",
+    "수면 시간이 부족해져 건강을 해칠 수 있습니다",
+    "학생들이 스스로 규칙을 만들고 지키는 경험을 합니다",
+    "학부모의 경제적 부담이 줄어듭니다",
+]
+
+ELABORATIONS = [
+    "예를 들어 여러 학교에서 이미 비슷한 방식을 운영하고 있습니다.",
+    "이는 학생들의 하루 생활에 직접적인 영향을 줍니다.",
+    "실제로 주변 친구들도 같은 경험을 이야기합니다.",
+    "이런 변화는 한두 달 안에 눈에 띄게 나타납니다.",
+    "선생님들 역시 이 점을 중요하게 여깁니다.",
+    "특히 저학년 학생들에게서 이런 모습이 자주 보입니다.",
+]
+
+INTRO_CONTEXT = [
+    "최근 우리 학교에서도 이 문제로 의견이 나뉘고 있습니다.",
+    "이 문제는 모든 학생의 학교생활과 관련이 있습니다.",
+    "많은 학생과 선생님이 이 주제에 관심을 보이고 있습니다.",
+]
+
+ORGS = ["통계청", "한국교육개발원", "교육부", "여성가족부", "OECD", "한국청소년정책연구원"]
+
+# 출처 문장 틀: (출처 이름, 출처 표지, 사실)
+SOURCE_TEMPLATES = [
+    ("{org}", "에 따르면", "청소년의 {n}%가 하루 세 시간 이상 스마트폰을 사용합니다"),
+    ("{org}", " 연구에서", "학습 효과가 {n}% 향상되었습니다"),
+    ("{year}년 {org}", " 조사 결과", "학부모의 {n}%가 이 정책에 찬성했습니다"),
+]
+
+ORDINALS = {
+    'word': ["첫째,", "둘째,", "셋째,", "넷째,"],
+    'ordinal': ["첫 번째로,", "두 번째로,", "세 번째로,", "네 번째로,"],
+    'digit': ["1.", "2.", "3.", "4."],
+}
+
+CONCLUSION_MARKERS = ["따라서", "결론적으로", "정리하면", "종합해보면"]
+
+# 현재 패턴이 틀리기 쉬운 표현 (종류 -> 적용할 섹션)
+TRICKS = {
+    'intro_without_marker': 'intro',         # '~다고 봅니다'처럼 표지 없는 서론
+    'conclusion_without_marker': 'conclusion',  # '이상의 이유로', '그러므로'로 시작하는 결론
+    'last_point_marker': 'body',             # 마지막 근거를 '마지막으로'로 시작
+    'decimal_statistic': 'body',             # 번호 없는 본론의 '3.5%' 같은 소수
+    'lead_sentence': 'body',                 # 번호 없는 본론 앞의 도입 문장
+    'connector_before_source': 'body',       # '또한 통계청에 따르면'
+    'opinion_in_body': 'body',               # 본론 끝의 '저는 ~다고 생각합니다'
+}
+
+
+def _has_final_consonant(word: str) -> bool:
+    last = word[-1]
+    if '가' <= last <= '힣':
+        return (ord(last) - 0xAC00) % 28 != 0
+    return last in "LMN0136789"
+
+
+def _josa(word: str, with_final: str, without_final: str) -> str:
+    return word + (with_final if _has_final_consonant(word) else without_final)
+
+
+# 섹션별 단락
+def _intro(rng: random.Random, topic: str, trick: str = None) -> str:
+    if trick == 'intro_without_marker':
+        core = rng.choice([f"{_josa(topic, '은', '는')} 반드시 필요하다고 봅니다.",
+                           f"{_josa(topic, '이', '가')} 학생들에게 도움이 된다고 믿습니다."])
+    else:
+        stance = rng.choice(["찬성", "반대"])
+        core = rng.choice([f"저는 {topic}에 {stance}합니다.",
+                           f"{topic}에 대해 저는 {stance}하는 입장입니다.",
+                           f"저는 {_josa(topic, '이', '가')} 필요하다고 생각합니다.",
+                           f"{_josa(topic, '을', '를')} 허용해야 한다고 주장합니다."])
+    context = [rng.choice(INTRO_CONTEXT) for _ in range(_elaboration_count(rng) // 2)]
+    return ' '.join(context + [core])
+
+
+def _conclusion(rng: random.Random, topic: str, trick: str = None) -> str:
+    if trick == 'conclusion_without_marker':
+        lead = rng.choice(["이상의 이유로", "그러므로", "이런 점에서"])
+    else:
+        lead = rng.choice(CONCLUSION_MARKERS)
+    core = f"{lead} {_josa(topic, '은', '는')} {rng.choice(['허용되어야 합니다.', '다시 검토되어야 합니다.'])}"
+    tail = [rng.choice(ELABORATIONS) for _ in range(_elaboration_count(rng) // 2)]
+    return ' '.join([core] + tail)
+
+
+def _source_sentence(rng: random.Random, decimal: bool = False):
+    """출처를 인용한 근거 문장 하나와 출처 이름"""
+    name, marker, fact = rng.choice(SOURCE_TEMPLATES)
+    name = name.format(org=rng.choice(ORGS), year=rng.randint(2018, 2024))
+    n = f"{rng.randint(1, 9)}.{rng.randint(1, 9)}" if decimal else str(rng.randint(10, 95))
+    return f"{name}{marker} {fact.format(n=n)}.", name
+
+
+def _body(rng: random.Random, trick: str = None) -> Dict:
+    k = rng.randint(1, 4)
+    if trick in ('last_point_marker', 'connector_before_source'):
+        k = max(k, 2)
+    if trick == 'last_point_marker':
+        numbered = True
+    elif trick in ('decimal_statistic', 'lead_sentence', 'connector_before_source'):
+        numbered = False
+    else:
+        numbered = rng.random() < 0.5
+    reasons = rng.sample(REASONS, k)
+    cite = [rng.random() < 0.4 for _ in range(k)]
+    if trick == 'decimal_statistic':
+        cite[rng.randrange(k)] = True
+    if trick == 'connector_before_source':
+        cite[-1] = True
+
+    sources = []
+    points = []
+    style = rng.choice(list(ORDINALS))
+    for i, (reason, cited) in enumerate(zip(reasons, cite)):
+        if cited:
+            sentence, name = _source_sentence(rng, decimal=trick == 'decimal_statistic')
+            if trick == 'connector_before_source' and i == k - 1:
+                sentence = "또한 " + sentence
+            sources.append(name)
+        else:
+            sentence = reason + "."
+        if numbered:
+            label = ORDINALS[style][i]
+            if trick == 'last_point_marker' and i == k - 1:
+                label = "마지막으로,"
+            elaboration = [rng.choice(ELABORATIONS) for _ in range(_elaboration_count(rng))]
+            sentence = ' '.join([f"{label} {sentence}"] + elaboration)
+        points.append(sentence)
+
+    if trick == 'lead_sentence':
+        points.insert(0, "그 이유는 다음과 같습니다.")
+    if trick == 'opinion_in_body':
+        points[-1] += " 저는 이 점이 가장 중요하다고 생각합니다."
+    return {'text': ' '.join(points), 'evidence_count': k, 'sources': sources, 'numbered': numbered}
+
+
+def _elaboration_count(rng: random.Random) -> int:
+    # 대부분은 짧고, 일부는 1000자가 넘도록 길게
+    return rng.choice([0, 0, 0, 1, 1, 2, 3, 5, 8, 13, 21])
+
+
+def make_corpus(n: int, seed: int = 0, tricky_rate: float = 0.15) -> List[Dict]:
+    """라벨이 붙은 단락 n개 (서론:본론:결론 = 1:2:1)"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(n):
+        section = rng.choice(['intro', 'body', 'body', 'conclusion'])
+        trick = None
+        if rng.random() < tricky_rate:
+            trick = rng.choice([name for name, target in TRICKS.items() if target == section])
+        topic = rng.choice(TOPICS)
+        if section == 'body':
+            item = _body(rng, trick)
+        else:
+            text = _intro(rng, topic, trick) if section == 'intro' else _conclusion(rng, topic, trick)
+            item = {'text': text, 'evidence_count': None, 'sources': [], 'numbered': False}
+        item.update(id=i, section=section, tricky=trick)
+        corpus.append(item)
+    return corpus
+
+
+def load_corpus(path: str) -> List[Dict]:
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="라벨이 붙은 합성 토론 단락 생성")
+    parser.add_argument('--n', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tricky', type=float, default=0.15, help="패턴이 틀리기 쉬운 단락 비율 (0~1)")
+    parser.add_argument('--out', default='', help="JSONL 출력 경로 (없으면 표준 출력)")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.n, args.seed, args.tricky)
+    if args.out:
+        directory = os.path.dirname(args.out)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        out = open(args.out, 'w', encoding='utf-8')
+    else:
+        out = sys.stdout
+    for item in corpus:
+        out.write(json.dumps(item, ensure_ascii=False) + "\n")
+    if args.out:
+        out.close()
+        print(f"단락 {len(corpus)}개 → {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""학급 단위 동시 제출 부하 테스트 (로컬 스텁 서버 + Streamlit AppTest)
+
+학생 N명이 동시에 주제와 입장을 고른 뒤 논증을 제출하고 팩트체크를 누르는 흐름을
+main() 그대로 실행하고, 제출/팩트체크 지연 시간의 p50/p95/p99를 보고한다.
+AppTest는 한 프로세스에서 동시에 여러 개를 돌릴 수 없으므로 학생마다 프로세스를 쓴다.
+--max-p95-submit / --max-p95-fact-check를 주면 기준을 넘을 때 종료 코드 1을 반환해
+회귀를 잡을 수 있다.
+
+실행: python benchmarks/load_test.py --students 30 --error-rate 0.02
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import StubConfig, start_stub_server, parse_latency  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "app.py")
+
+ESSAYS = [
+    "저는 학교 내 스마트폰 사용에 찬성합니다.",
+    "첫째, 통계청에 따르면 청소년의 95%가 스마트폰을 사용합니다. 둘째, 비상시 연락이 가능합니다.",
+    "한국교육개발원 연구에서 학습 효과가 3.5% 향상되었습니다. 2023년 조사 결과 학부모의 60%가 찬성했습니다.",
+    "따라서 학교 내 스마트폰 사용을 허용해야 합니다.",
+]
+
+
+def percentile(values, p):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def find_button(at, label):
+    for button in at.button:
+        if button.label == label:
+            return button
+    raise LookupError(label)
+
+
+def simulate_student(student_id, fact_check_every):
+    """학생 한 명의 흐름을 실행하고 (지연 시간, 오류 목록) 반환"""
+    from streamlit.testing.v1 import AppTest
+
+    timings = {'submit': [], 'fact_check': []}
+    errors = []
+    try:
+        at = AppTest.from_file(APP_PATH, default_timeout=120)
+        at.session_state["debate_topic"] = "학교 내 스마트폰 사용"
+        at.run()
+        find_button(at, "👍 찬성").click()
+        at.run()
+
+        for turn, essay in enumerate(ESSAYS):
+            at.text_area[0].input(essay)
+            start = time.perf_counter()
+            find_button(at, "📤 제출하기").click()
+            at.run()
+            timings['submit'].append(time.perf_counter() - start)
+
+            has_source = any(marker in essay for marker in ("에 따르면", "연구에서", "조사 결과"))
+            if fact_check_every and turn % fact_check_every == 0 and has_source:
+                at.text_area[0].input(essay)
+                start = time.perf_counter()
+                find_button(at, "🔍 팩트체크").click()
+                at.run()
+                timings['fact_check'].append(time.perf_counter() - start)
+
+        if at.exception:
+            errors.append(f"학생 {student_id}: {at.exception[0].message}")
+    except Exception as e:
+        errors.append(f"학생 {student_id}: {e!r}")
+    return timings, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 제출 부하 테스트")
+    parser.add_argument('--students', type=int, default=20)
+    parser.add_argument('--fact-check-every', type=int, default=1, help="몇 번째 턴마다 팩트체크할지 (0이면 안 함)")
+    parser.add_argument('--latency', action='append', help="모델=중앙값:sigma (초)")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--max-p95-submit', type=float, default=None, help="제출 p95 허용 한도(초)")
+    parser.add_argument('--max-p95-fact-check', type=float, default=None, help="팩트체크 p95 허용 한도(초)")
+    args = parser.parse_args()
+
+    config = StubConfig(latency=parse_latency(args.latency), error_rate=args.error_rate, seed=args.seed)
+    server = start_stub_server(config)
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    # app.py가 처음 import되기 전에 스텁을 가리키도록 설정
+    os.environ["UPSTAGE_BASE_URL"] = base + "/v1"
+    os.environ["PERPLEXITY_BASE_URL"] = base
+    os.environ["UPSTAGE_API_KEY"] = "stub"
+    os.environ["PERPLEXITY_API_KEY"] = "stub"
+    os.environ.setdefault("FACT_CACHE_PATH", ":memory:")
+    os.environ.setdefault("SESSION_STORE", "memory")
+    # 이전 실행에서 만든 주제 자료집이 결과에 섞이지 않도록 매번 빈 디렉터리에서 시작
+    os.environ.setdefault("DOSSIER_DIR", tempfile.mkdtemp(prefix="load-test-dossiers-"))
+    sys.path.insert(0, ROOT)
+
+    timings = {'submit': [], 'fact_check': []}
+    errors = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.students, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [pool.submit(simulate_student, i, args.fact_check_every) for i in range(args.students)]
+        for future in futures:
+            student_timings, student_errors = future.result()
+            for name, values in student_timings.items():
+                timings[name].extend(values)
+            errors.extend(student_errors)
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"학생 {args.students}명, 총 {elapsed:.1f}초, 스텁 요청 {config.requests}회, 오류 {len(errors)}건")
+    failed = False
+    for name, limit in (('submit', args.max_p95_submit), ('fact_check', args.max_p95_fact_check)):
+        values = timings[name]
+        p50, p95, p99 = (percentile(values, p) for p in (50, 95, 99))
+        print(f"  {name:<10} n={len(values):<4} p50={p50:.2f}s p95={p95:.2f}s p99={p99:.2f}s")
+        if limit is not None and values and p95 > limit:
+            print(f"  ❌ {name} p95 {p95:.2f}s > 한도 {limit:.2f}s")
+            failed = True
+    for error in errors[:5]:
+        print(f"  ! {error}")
+
+    sys.exit(1 if failed or errors else 0)
+
+
+if __name__ == "__main__":
+    main()
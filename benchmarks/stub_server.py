@@ -0,0 +1,222 @@
+"""로컬 OpenAI 호환 스텁 서버 (유료 API 없이 부하 테스트용)
+
+앱이 쓰는 chat.completions 엔드포인트만 흉내 낸다.
+  - solar-pro2          : 코칭 피드백 (stream=true 지원, 그 밖의 모델 이름도 같은 응답)
+                          사용자 메시지가 JSON 배열(묶음 코칭)이면 항목마다 피드백을 담은 JSON 배열
+  - groundedness-check  : grounded / notGrounded
+  - sonar-small-online  : 출처 URL이 포함된 검색 결과
+
+모델별 지연 시간은 로그정규분포(중앙값, sigma)로, 오류는 비율로 설정한다.
+묶음 코칭은 출력이 길어지는 만큼 항목 하나당 batch_item_cost 비율씩 지연이 늘어난다.
+
+실행:
+    python benchmarks/stub_server.py --port 8900 \
+        --latency solar-pro2=1.2:0.4 --latency sonar-small-online=2.5:0.5 --error-rate 0.02
+
+앱을 스텁에 연결:
+    UPSTAGE_BASE_URL=http://127.0.0.1:8900/v1 PERPLEXITY_BASE_URL=http://127.0.0.1:8900 \
+    UPSTAGE_API_KEY=stub PERPLEXITY_API_KEY=stub streamlit run app.py
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 모델별 기본 지연 (중앙값 초, 로그정규 sigma)
+DEFAULT_LATENCY = {
+    'solar-pro2': (1.0, 0.4),
+    'solar-mini': (0.4, 0.3),
+    'groundedness-check': (0.6, 0.3),
+    'sonar-small-online': (2.0, 0.5),
+}
+
+FEEDBACK_TEXT = "좋은 근거예요! 👍 주장이 분명하게 드러나요. 구체적인 통계나 사례를 하나 더 추가해보면 어떨까요? ✨"
+SEARCH_TEXT = ("확인 결과 해당 주장은 대체로 사실입니다. 통계청 자료에 따르면 관련 수치가 보고되어 있습니다.\n"
+               "출처: https://kostat.go.kr/board.es?mid=a10301 https://www.kedi.re.kr/khome/main/research")
+
+
+class StubConfig:
+    def __init__(self, latency=None, error_rate=0.0, rate_limit_share=0.5, grounded_rate=0.8, seed=None,
+                 search_text=SEARCH_TEXT, batch_item_cost=0.15, malformed_rate=0.0):
+        self.latency = dict(DEFAULT_LATENCY)
+        self.latency.update(latency or {})
+        self.error_rate = error_rate
+        self.rate_limit_share = rate_limit_share  # 오류 중 429 비율 (나머지는 503)
+        self.grounded_rate = grounded_rate
+        self.search_text = search_text
+        self.batch_item_cost = batch_item_cost
+        self.malformed_rate = malformed_rate  # 묶음 응답을 JSON이 아닌 글로 돌려줄 비율
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def sample_delay(self, model: str) -> float:
+        median, sigma = self.latency.get(model, (0.5, 0.3))
+        with self.lock:
+            return median * math.exp(self.random.gauss(0, sigma)) if sigma else median
+
+    def sample_error(self):
+        with self.lock:
+            self.requests += 1
+            if self.random.random() >= self.error_rate:
+                return None
+            return 429 if self.random.random() < self.rate_limit_share else 503
+
+    def grounded(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.grounded_rate
+
+
+def _batch_items(messages) -> list:
+    content = messages[-1].get('content') or '' if messages else ''
+    if not content.startswith('['):
+        return []
+    try:
+        items = json.loads(content)
+    except ValueError:
+        return []
+    return items if isinstance(items, list) else []
+
+
+def _reply_text(model: str, config: StubConfig, messages=None) -> str:
+    if model == 'groundedness-check':
+        return 'grounded' if config.grounded() else 'notGrounded'
+    if model.startswith('sonar'):
+        return config.search_text
+    items = _batch_items(messages)
+    if items:
+        with config.lock:
+            malformed = config.random.random() < config.malformed_rate
+        if malformed:
+            return "피드백을 정리하면 다음과 같아요. " + FEEDBACK_TEXT
+        return json.dumps([{'id': item.get('id'), 'feedback': FEEDBACK_TEXT} for item in items], ensure_ascii=False)
+    return FEEDBACK_TEXT
+
+
+def _usage(messages, text: str) -> dict:
+    # 대략적인 토큰 수 (문자 수 / 2)
+    prompt = sum(len(m.get('content') or '') for m in messages) // 2
+    completion = len(text) // 2
+    return {'prompt_tokens': prompt, 'completion_tokens': completion, 'total_tokens': prompt + completion}
+
+
+def make_handler(config: StubConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict, headers=None):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self._send_json(404, {'error': {'message': 'not found'}})
+                return
+
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            model = request.get('model', '')
+            messages = request.get('messages', [])
+            delay = config.sample_delay(model) * (1 + config.batch_item_cost * max(len(_batch_items(messages)) - 1, 0))
+
+            status = config.sample_error()
+            if status:
+                time.sleep(delay * 0.2)
+                headers = {'Retry-After': '1'} if status == 429 else None
+                self._send_json(status, {'error': {'message': f'stub error {status}'}}, headers)
+                return
+
+            text = _reply_text(model, config, messages)
+            usage = _usage(messages, text)
+            created = int(time.time())
+
+            if not request.get('stream'):
+                time.sleep(delay)
+                self._send_json(200, {
+                    'id': f'stub-{created}',
+                    'object': 'chat.completion',
+                    'created': created,
+                    'model': model,
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': text}}],
+                    'usage': usage
+                })
+                return
+
+            # 스트리밍: 전체 지연의 30%를 첫 토큰까지, 나머지를 조각에 나눠 보냄
+            pieces = [text[i:i + 8] for i in range(0, len(text), 8)]
+            time.sleep(delay * 0.3)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            for i, piece in enumerate(pieces):
+                chunk = {
+                    'id': f'stub-{created}',
+                    'object': 'chat.completion.chunk',
+                    'created': created,
+                    'model': model,
+                    'choices': [{'index': 0, 'delta': {'content': piece},
+                                 'finish_reason': 'stop' if i == len(pieces) - 1 else None}]
+                }
+                if i == len(pieces) - 1:
+                    chunk['usage'] = usage
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                time.sleep(delay * 0.7 / len(pieces))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+    return Handler
+
+
+def start_stub_server(config: StubConfig = None, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """스텁 서버를 백그라운드 스레드에서 시작 (port=0이면 빈 포트 사용)"""
+    server = ThreadingHTTPServer((host, port), make_handler(config or StubConfig()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_latency(values):
+    latency = {}
+    for value in values or []:
+        model, spec = value.split('=', 1)
+        median, _, sigma = spec.partition(':')
+        latency[model] = (float(median), float(sigma or 0))
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호환 스텁 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', action='append', help="모델=중앙값:sigma (초), 여러 번 지정 가능")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="오류 응답 비율 (0~1)")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    config = StubConfig(latency=parse_latency(args.latency), error_rate=args.error_rate, seed=args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    server.daemon_threads = True
+    print(f"스텁 서버: http://{args.host}:{args.port}  (Ctrl+C로 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import abc
+import os
+import threading
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from session_store import SESSION_DB_PATH, SESSION_STORE
+from sqlite_db import open_sqlite
+
+# 기본 설정 (환경 변수로 조정 가능, 기본은 대화 기록과 같은 저장소/파일)
+CLASS_STATS_STORE = os.environ.get("CLASS_STATS_STORE", SESSION_STORE)   # sqlite | memory
+CLASS_STATS_DB_PATH = os.environ.get("CLASS_STATS_DB_PATH", SESSION_DB_PATH)
+
+# 학급/주제 전체를 뜻하는 값 (제출마다 전체 합계 행도 함께 올려 조회 때 다시 더하지 않음)
+ALL = '*'
+
+# 근거 수 분포 구간 (본론만)
+EVIDENCE_BUCKETS = ('0', '1', '2', '3', '4+')
+
+
+def evidence_bucket(count: int) -> str:
+    return EVIDENCE_BUCKETS[min(count, len(EVIDENCE_BUCKETS) - 1)]
+
+
+def confidence_bucket(result: Dict) -> str:
+    """팩트체크 결과의 판정 구간 (앱의 검증됨/부분적/실패 기준과 같음, 검색 자체가 실패하면 error)"""
+    if not result.get('search_results'):
+        return 'error'
+    confidence = result.get('confidence', 0.0)
+    if confidence >= 0.7:
+        return 'verified'
+    if confidence >= 0.4:
+        return 'partial'
+    return 'failed'
+
+
+def _rollups(class_id: str, topic: str) -> List[Tuple[str, str]]:
+    return list(dict.fromkeys([(class_id, topic), (class_id, ALL), (ALL, topic), (ALL, ALL)]))
+
+
+class ClassStats(abc.ABC):
+    """학급/주제별 누적 집계 인터페이스
+
+    제출과 팩트체크 때마다 (지표, 구간) 카운터만 올리고, 대시보드는 카운터를 그대로 읽는다.
+    학급·주제 전체 합계도 쓸 때 함께 올리므로 조회 비용은 저장된 글 수와 무관하다.
+    """
+
+    @abc.abstractmethod
+    def add(self, class_id: str, topic: str, counts: Dict[Tuple[str, str], int]) -> None:
+        """(지표, 구간) -> 증가량을 학급/주제와 그 전체 합계에 더함"""
+
+    @abc.abstractmethod
+    def query(self, class_id: str = ALL, topic: str = ALL) -> Dict[str, Dict[str, int]]:
+        """지표 -> {구간: 누적 수}"""
+
+    @abc.abstractmethod
+    def keys(self) -> List[Tuple[str, str]]:
+        """집계가 있는 (학급, 주제) 목록 (전체 합계 포함)"""
+
+    def classes(self) -> List[str]:
+        return sorted({c for c, _ in self.keys() if c != ALL})
+
+    def topics(self, class_id: str = ALL) -> List[str]:
+        return sorted({t for c, t in self.keys() if c == class_id and t != ALL})
+
+    def record_submission(self, class_id: str, topic: str, structure: Dict, new_session: bool = False) -> None:
+        """제출 한 번의 구조 분석 결과를 반영"""
+        section = structure.get('section_type', 'body')
+        counts = Counter({
+            ('submissions', 'total'): 1,
+            ('section', section): 1,
+            ('sources', 'cited' if structure.get('sources') else 'none'): 1
+        })
+        if section == 'body':
+            counts[('evidence', evidence_bucket(structure.get('evidence_count', 0)))] += 1
+        if new_session:
+            counts[('sessions', 'total')] += 1
+        self.add(class_id, topic, counts)
+
+    def record_fact_checks(self, class_id: str, topic: str, results: List[Dict]) -> None:
+        """팩트체크 결과들의 판정과 근거 출처(교사 자료/자료집/웹)를 반영"""
+        counts = Counter()
+        for result in results:
+            if not result:
+                continue
+            bucket = confidence_bucket(result)
+            counts[('confidence', bucket)] += 1
+            if bucket != 'error':
+                reference = result.get('reference')
+                if reference is True:
+                    reference = 'teacher'
+                counts[('evidence_source', reference or 'web')] += 1
+        if counts:
+            self.add(class_id, topic, counts)
+
+
+class MemoryClassStats(ClassStats):
+    """프로세스 메모리 집계 (재시작하면 사라짐, 개발/테스트용)"""
+
+    def __init__(self):
+        self._counts = {}  # (학급, 주제) -> {지표: Counter}
+        self._lock = threading.Lock()
+
+    def add(self, class_id: str, topic: str, counts: Dict[Tuple[str, str], int]) -> None:
+        with self._lock:
+            for key in _rollups(class_id, topic):
+                metrics = self._counts.setdefault(key, {})
+                for (metric, bucket), n in counts.items():
+                    metrics.setdefault(metric, Counter())[bucket] += n
+
+    def query(self, class_id: str = ALL, topic: str = ALL) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {metric: dict(buckets) for metric, buckets in self._counts.get((class_id, topic), {}).items()}
+
+    def keys(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return list(self._counts)
+
+
+class SQLiteClassStats(ClassStats):
+    """SQLite(WAL) 카운터 테이블 (여러 프로세스가 같은 파일에 더해도 UPSERT 한 문장으로 합산)"""
+
+    def __init__(self, path: str = CLASS_STATS_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = open_sqlite(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS class_stats ("
+            " class_id TEXT NOT NULL,"
+            " topic TEXT NOT NULL,"
+            " metric TEXT NOT NULL,"
+            " bucket TEXT NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " PRIMARY KEY (class_id, topic, metric, bucket))"
+        )
+        self._db.commit()
+
+    def add(self, class_id: str, topic: str, counts: Dict[Tuple[str, str], int]) -> None:
+        rows = [
+            (c, t, metric, bucket, n)
+            for c, t in _rollups(class_id, topic)
+            for (metric, bucket), n in counts.items()
+        ]
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO class_stats (class_id, topic, metric, bucket, count) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (class_id, topic, metric, bucket) DO UPDATE SET count = count + excluded.count",
+                rows
+            )
+            self._db.commit()
+
+    def query(self, class_id: str = ALL, topic: str = ALL) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT metric, bucket, count FROM class_stats WHERE class_id = ? AND topic = ?",
+                (class_id, topic)
+            ).fetchall()
+        stats = {}
+        for metric, bucket, count in rows:
+            stats.setdefault(metric, {})[bucket] = count
+        return stats
+
+    def keys(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return self._db.execute("SELECT DISTINCT class_id, topic FROM class_stats").fetchall()
+
+
+# 집계 저장소 생성
+def create_class_stats(kind: str = CLASS_STATS_STORE, path: str = CLASS_STATS_DB_PATH) -> ClassStats:
+    """CLASS_STATS_STORE 설정에 맞는 집계 저장소 생성"""
+    if kind == 'memory':
+        return MemoryClassStats()
+    if kind == 'sqlite':
+        return SQLiteClassStats(path)
+    raise ValueError(f"알 수 없는 CLASS_STATS_STORE: {kind}")
@@ -0,0 +1,625 @@
+import json
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Iterator, List
+
+import metrics
+from api_clients import CircuitOpenError
+from batcher import MicroBatcher
+from feedback_cache import FeedbackCache
+from router import log_decision, route_coaching
+from scheduler import SchedulerBusyError, scheduler
+
+# 코칭에 사용하는 모델 (간단한 단락이나 큰 모델이 느릴 때는 라우터가 빠른 모델을 고름)
+COACHING_MODEL = "solar-pro2"
+COACHING_FAST_MODEL = os.environ.get("COACHING_FAST_MODEL", "solar-mini")
+
+# 코칭 응답 지연 예산(초): 넘기면 섹션별 템플릿을 먼저 보여주고 LLM 응답은 도착하면 교체 (0이면 끝까지 기다림)
+COACHING_SLO_SECONDS = float(os.environ.get("COACHING_SLO_SECONDS", 4))
+# 이 시간(초)이 지나도 응답이 없으면 같은 요청을 한 번 더 보내 먼저 온 쪽을 씀 (0이면 보내지 않음)
+COACHING_HEDGE_SECONDS = float(os.environ.get("COACHING_HEDGE_SECONDS", 0))
+# 예산을 넘긴 요청을 끝까지 받아오는 백그라운드 작업 수
+COACHING_WORKERS = int(os.environ.get("COACHING_WORKERS", 16))
+# 이 시간(초) 안에 여러 세션에서 들어온 코칭 요청을 한 번의 호출로 묶음 (0이면 묶지 않음, 스트리밍은 제외)
+COACHING_BATCH_WINDOW = float(os.environ.get("COACHING_BATCH_WINDOW", 0.05))
+COACHING_BATCH_MAX = int(os.environ.get("COACHING_BATCH_MAX", 8))   # 한 번에 묶을 최대 요청 수
+COACHING_MAX_TOKENS = 200   # 짧은 응답을 위해 학생 한 명당 토큰 제한
+
+SYSTEM_PROMPT = """당신은 학생의 토론 친구이자 도우미입니다.
+
+중요 규칙:
+- 반드시 2-3문장으로만 답하세요
+- 친근하고 격려하는 톤을 사용하세요
+- 이모지를 적절히 사용하세요 (👍 💡 ✨ 🎯)
+- "~해보면 어떨까요?" 같은 제안형 표현을 사용하세요
+- 구체적 예시는 제공하지 마세요
+- 학생의 입장(찬성/반대)을 명확히 유지하도록 도와주세요
+
+피드백 방식:
+- 잘한 점 간단히 인정 (1문장)
+- 개선 방향 제안 (1-2문장)
+- 격려와 함께 마무리"""
+
+# 여러 학생의 요청을 묶어 보낼 때 시스템 프롬프트 뒤에 붙이는 지시
+BATCH_INSTRUCTIONS = """
+
+여러 학생의 논증이 JSON 배열로 한꺼번에 주어집니다. 항목마다 request를 따로 읽고 위 규칙대로
+학생별 피드백을 작성하세요. 다른 설명 없이 아래 형식의 JSON 배열로만 답하세요.
+[{"id": 1, "feedback": "..."}, {"id": 2, "feedback": "..."}]"""
+
+# 섹션별 짧은 피드백 생성
+def get_section_specific_feedback(section_type: str, evidence_count: int = 0, has_sources: bool = False) -> str:
+    """섹션별 맞춤형 짧은 피드백 생성"""
+    
+    if section_type == 'intro':
+        feedbacks = [
+            "좋은 시작이에요! 👍 입장이 명확해요. 이제 왜 그렇게 생각하는지 근거를 들어볼까요?",
+            "입장을 잘 밝혔네요! ✨ 다음엔 구체적인 이유를 설명해주세요.",
+            "명확한 주장이에요! 💡 이제 이를 뒷받침할 근거를 추가해보면 어떨까요?"
+        ]
+    elif section_type == 'conclusion':
+        feedbacks = [
+            "마무리가 깔끔해요! 🎯 핵심 주장을 한 번 더 강조했나요?",
+            "좋은 결론이에요! ✨ 가장 강력한 근거를 다시 언급하면 더 좋을 거예요.",
+            "잘 정리했어요! 👏 독자가 기억할 만한 한 문장을 추가해보는 건 어떨까요?"
+        ]
+    else:  # body
+        if evidence_count == 1:
+            if has_sources:
+                feedbacks = [
+                    "첫 번째 근거 좋네요! 출처까지 명시해서 신뢰도가 높아요. 👍 근거를 하나 더 추가해볼까요?",
+                    "근거와 자료 제시가 훌륭해요! ✨ 다른 측면의 근거도 추가하면 더 설득력 있을 거예요."
+                ]
+            else:
+                feedbacks = [
+                    "첫 번째 근거 좋아요! 💡 구체적인 통계나 사례를 추가하면 더 설득력 있을 거예요.",
+                    "좋은 시작이에요! 이 근거를 뒷받침할 자료를 찾아보면 어떨까요? 📚"
+                ]
+        elif evidence_count == 2:
+            feedbacks = [
+                "두 가지 근거가 잘 연결되고 있어요! 👍 각 근거마다 구체적 사례를 추가해보세요.",
+                "좋은 논리 전개예요! ✨ 이제 가장 강한 근거에 집중해서 보강해볼까요?"
+            ]
+        elif evidence_count == 3:
+            feedbacks = [
+                "세 가지 근거가 체계적이에요! 🎯 이제 가장 핵심적인 것에 집중해보면 어떨까요?",
+                "충실한 논증이네요! 💪 각 근거의 연결을 더 자연스럽게 만들어보세요."
+            ]
+        else:  # 4개 이상
+            feedbacks = [
+                "충분한 근거예요! 🌟 이제 가장 강력한 2-3개로 정리하면 더 임팩트 있을 거예요.",
+                "많은 근거를 제시했네요! 핵심만 추려서 깊이 있게 설명하면 어떨까요? 🎯"
+            ]
+    
+    return random.choice(feedbacks)
+
+def _section_feedback(structure: Dict) -> str:
+    return get_section_specific_feedback(
+        structure.get('section_type', 'body'),
+        structure.get('evidence_count', 0),
+        bool(structure.get('sources', []))
+    )
+
+# 코칭 프롬프트 구성
+def build_coaching_messages(text: str, structure: Dict, position: str = None, topic: str = None,
+                            context: str = None) -> List[Dict]:
+    """Solar Pro 2에 보낼 메시지 목록 생성 (context는 지금까지 쓴 글의 고정 크기 요약)"""
+    position_str = f"\n학생의 입장: {position}" if position else ""
+    topic_str = f"\n토론 주제: {topic}" if topic else ""
+    context_str = f"""
+
+지금까지 쓴 글 요약:
+{context}
+(이번 단락이 서론 주장과 어긋나면 부드럽게 짚어주세요)""" if context else ""
+    
+    user_prompt = f"""학생의 논증을 분석하고 코칭해주세요:{position_str}{topic_str}{context_str}
+
+논증 내용: {text}
+
+현재 구조 분석:
+- 주장 포함: {structure['has_claim']}
+- 근거 포함: {structure['has_evidence']}  
+- 보강자료 포함: {structure['has_reinforcement']}
+
+2-3문장으로 짧게 피드백을 주세요. 격려와 함께 한 가지 구체적 개선점만 제안하세요."""
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+_executor = None
+_batch_executor = None
+_batcher = None
+_executor_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=COACHING_WORKERS, thread_name_prefix="coaching")
+        return _executor
+
+
+def _batch_pool() -> ThreadPoolExecutor:
+    # 묶음 호출은 _pool()의 작업이 기다리므로 같은 풀을 쓰면 교착될 수 있어 따로 둠
+    global _batch_executor
+    with _executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ThreadPoolExecutor(max_workers=COACHING_WORKERS, thread_name_prefix="coaching-batch")
+        return _batch_executor
+
+
+def _coaching_batcher() -> MicroBatcher:
+    global _batcher
+    with _executor_lock:
+        if _batcher is None:
+            _batcher = MicroBatcher(_send_batch, _batch_pool, COACHING_BATCH_WINDOW, COACHING_BATCH_MAX)
+        return _batcher
+
+
+def _call_feedback(messages: List[Dict], clients: Dict, model: str) -> str:
+    response = clients['upstage'].chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=0.7,
+        max_tokens=COACHING_MAX_TOKENS,
+        priority='coaching'
+    )
+    return response.choices[0].message.content
+
+
+def parse_batch_reply(content: str, size: int) -> Dict[int, str]:
+    """묶음 응답의 JSON 배열에서 id(1부터) -> 피드백 (형식이 깨진 항목은 빠짐)"""
+    start, end = content.find('['), content.rfind(']')
+    if start < 0 or end < start:
+        return {}
+    try:
+        items = json.loads(content[start:end + 1])
+    except ValueError:
+        return {}
+    feedbacks = {}
+    for item in items if isinstance(items, list) else ():
+        if not isinstance(item, dict) or not isinstance(item.get('feedback'), str) or not item['feedback'].strip():
+            continue
+        try:
+            idx = int(item.get('id'))
+        except (TypeError, ValueError):
+            continue
+        if 1 <= idx <= size:
+            feedbacks[idx] = item['feedback'].strip()
+    return feedbacks
+
+
+def _send_batch(key: tuple, items: List[tuple]) -> List:
+    """(메시지, 클라이언트, 순번 콜백) 묶음을 JSON 배열 프롬프트 한 번으로 보내고 학생별 피드백으로 나눔"""
+    model = key[0]
+    clients = items[0][1]
+    callbacks = [on_wait for _, _, on_wait in items if on_wait is not None]
+
+    def report(ahead: int) -> None:
+        # 묶음 호출의 대기 순번은 묶인 요청 모두의 순번
+        for on_wait in callbacks:
+            on_wait(ahead)
+
+    if len(items) == 1:
+        with scheduler.report_position(report):
+            return [_call_feedback(items[0][0], clients, model)]
+
+    requests = [{'id': i + 1, 'request': messages[-1]['content']} for i, (messages, _, _) in enumerate(items)]
+    with scheduler.report_position(report):
+        response = clients['upstage'].chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT + BATCH_INSTRUCTIONS},
+                {"role": "user", "content": json.dumps(requests, ensure_ascii=False)}
+            ],
+            temperature=0.7,
+            max_tokens=COACHING_MAX_TOKENS * len(items),
+            priority='coaching'
+        )
+    feedbacks = parse_batch_reply(response.choices[0].message.content or '', len(items))
+    results = [feedbacks.get(i + 1) for i in range(len(items))]
+    missing = [i for i, feedback in enumerate(results) if feedback is None]
+    metrics.count("coaching_batch", outcome='fallback' if missing else 'parsed')
+    if missing:
+        # 형식이 깨진 학생의 요청만 원래 프롬프트로 따로 다시 보냄
+        with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+            retries = {i: pool.submit(_call_feedback, items[i][0], clients, model) for i in missing}
+        for i, retry in retries.items():
+            results[i] = retry.exception() or retry.result()
+    return results
+
+
+def _request_feedback(messages: List[Dict], clients: Dict, model: str = COACHING_MODEL,
+                      on_wait: Callable[[int], None] = None) -> str:
+    """on_wait는 API 호출이 스케줄러에서 기다리는 동안 순번이 바뀔 때마다 호출됨 (호출하는 스레드는 정해지지 않음)"""
+    with metrics.span("coaching.llm"):
+        # 시스템 프롬프트가 같은 일반 코칭 요청만 묶음 (그 밖의 메시지는 그대로 한 번에 보냄)
+        if COACHING_BATCH_WINDOW <= 0 or len(messages) != 2 or messages[0]['content'] != SYSTEM_PROMPT:
+            with scheduler.report_position(on_wait):
+                return _call_feedback(messages, clients, model)
+        return _coaching_batcher().submit((model, id(clients)), (messages, clients, on_wait)).result()
+
+
+# 백그라운드 코칭 요청 (선택적 헤지)
+def request_feedback(messages: List[Dict], clients: Dict, hedge_after: float = COACHING_HEDGE_SECONDS,
+                     on_success: Callable[[str], None] = None, model: str = COACHING_MODEL,
+                     on_wait: Callable[[int], None] = None) -> Future:
+    """코칭 요청을 백그라운드에서 보내고 피드백 텍스트를 담을 Future 반환
+
+    hedge_after초가 지나도 응답이 없으면 같은 요청을 한 번 더 보내고 먼저 성공한 응답을 쓴다.
+    on_success는 처음 성공한 응답으로 한 번만 호출된다 (캐시 저장 등).
+    on_wait는 스케줄러 대기 순번이 바뀔 때 작업 스레드에서 호출된다.
+    """
+    result = Future()
+    attempts = []
+    launched = [0]
+    settled = []
+    lock = threading.Lock()
+
+    def settle(attempt: Future):
+        with lock:
+            if settled:
+                return
+            error = attempt.exception()
+            if error is not None and (len(attempts) < launched[0] or not all(a.done() for a in attempts)):
+                return
+            settled.append(attempt)
+            timer.cancel()
+        if error is not None:
+            result.set_exception(error)
+            return
+        if on_success is not None:
+            on_success(attempt.result())
+        result.set_result(attempt.result())
+
+    def call() -> str:
+        feedback = _request_feedback(messages, clients, model, on_wait)
+        if not feedback:
+            raise ValueError("빈 응답")
+        return feedback
+
+    def submit():
+        # 이미 끝난 시도에는 add_done_callback이 settle을 바로 부르므로 lock 밖에서 등록
+        with lock:
+            launched[0] += 1
+        attempt = _pool().submit(call)
+        with lock:
+            attempts.append(attempt)
+        attempt.add_done_callback(settle)
+
+    def hedge():
+        with lock:
+            if settled:
+                return
+        metrics.observe("coaching.hedge", hedge_after)
+        submit()
+
+    timer = threading.Timer(hedge_after, hedge)
+    timer.daemon = True
+    submit()
+    if hedge_after > 0:
+        timer.start()
+    return result
+
+
+# 대화형 코칭 피드백 생성
+def generate_coaching_feedback(text: str, structure: Dict, clients: Dict, position: str = None, topic: str = None,
+                               cache: FeedbackCache = None, context: str = None) -> str:
+    """논증 구조에 대한 코칭 피드백 생성 (cache가 있으면 거의 같은 제출의 피드백 재사용)"""
+    
+    # API 없으면 섹션별 피드백만 반환
+    if 'upstage' not in clients:
+        return _section_feedback(structure)
+    
+    start = time.perf_counter()
+    decision = route_coaching(text, structure, COACHING_MODEL, COACHING_FAST_MODEL)
+    outcome = 'ok'
+    try:
+        if decision['route'] == 'template':
+            return _section_feedback(structure)
+        if cache is not None:
+            cached = cache.get(text, structure, position, topic, decision['model'])
+            if cached is not None:
+                outcome = 'cached'
+                return cached
+        with metrics.span("coaching.prompt"):
+            messages = build_coaching_messages(text, structure, position, topic, context)
+        feedback = _request_feedback(messages, clients, decision['model'])
+        if cache is not None and feedback:
+            cache.set(text, structure, feedback, position, topic, decision['model'])
+        return feedback
+    except (CircuitOpenError, SchedulerBusyError):
+        # 제공자 장애나 대기열 포화 중에는 기다리지 않고 섹션별 피드백으로 대체
+        outcome = 'fell_back'
+        return _section_feedback(structure)
+    except Exception as e:
+        outcome = 'error'
+        return f"피드백 생성 중 오류가 발생했습니다: {str(e)}"
+    finally:
+        log_decision(decision, time.perf_counter() - start, outcome)
+
+def _outcome(reply) -> str:
+    """라우팅 기록에 남길 응답 결과"""
+    if reply.fell_back:
+        return 'fell_back'
+    if reply.provisional:
+        return 'provisional'
+    return 'cached' if reply.cached else 'ok'
+
+
+class _BudgetExceeded(Exception):
+    """지연 예산 안에 스트림이 끝나지 않음"""
+
+
+# 스트리밍 코칭 피드백
+class FeedbackStream:
+    """코칭 피드백을 토큰 단위로 받아오는 스트림
+
+    순회하면 도착한 텍스트 조각을 돌려준다. 스트림이 중간에 끊기면 순회를 멈추고
+    `text`를 섹션별 템플릿 피드백으로 바꾼 뒤 `fell_back`을 True로 둔다.
+    순회가 끝나면 `ttft`(첫 토큰까지 시간)와 `total`(전체 시간)이 초 단위로 채워진다.
+    cache에서 거의 같은 제출의 피드백을 찾으면 API 없이 한 번에 돌려주고 `cached`를 True로 둔다.
+    slo초 안에 스트림이 끝나지 않으면 순회를 멈추고 받은 만큼(없으면 템플릿)을 `text`로 둔 채
+    `provisional`을 True로 두며, 전체 응답은 백그라운드에서 계속 받아 `pending`(Future)에 담는다.
+    `route`는 라우터가 고른 경로(template/fast/full)이고 template이면 API 없이 템플릿을 돌려준다.
+    on_wait는 스케줄러 대기 순번이 바뀔 때마다 순회하는 스레드에서 호출된다 (스트림은 다른 스레드에서
+    받더라도 순번은 순회하는 쪽으로 넘겨 화면을 그 스레드에서 그리게 함).
+    """
+
+    def __init__(self, text: str, structure: Dict, clients: Dict, position: str = None, topic: str = None,
+                 cache: FeedbackCache = None, context: str = None, slo: float = COACHING_SLO_SECONDS,
+                 on_wait: Callable[[int], None] = None):
+        self.text = ''
+        self.ttft = None
+        self.total = None
+        self.fell_back = False
+        self.cached = False
+        self.provisional = False
+        self.pending = None
+        self.route = None
+        self.fallback = _section_feedback(structure)
+        self._model = COACHING_MODEL
+        self._clients = clients
+        self._messages = build_coaching_messages(text, structure, position, topic, context)
+        self._cache = cache
+        self._cache_args = (text, structure, position, topic)
+        self._slo = slo
+        self._on_wait = on_wait
+
+    def _deltas(self, on_wait: Callable[[int], None] = None) -> Iterator[str]:
+        with scheduler.report_position(on_wait):
+            stream = self._clients['upstage'].chat.completions.create(
+                model=self._model,
+                messages=self._messages,
+                temperature=0.7,
+                max_tokens=COACHING_MAX_TOKENS,
+                stream=True,
+                priority='coaching'
+            )
+        for chunk in stream:
+            # 제공자가 마지막 조각에 usage를 붙여 주면 토큰 수 기록
+            if getattr(chunk, 'usage', None):
+                metrics.record_usage('upstage', self._model, chunk.usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+    def _store(self, feedback: str) -> None:
+        if self._cache is not None:
+            text, structure, position, topic = self._cache_args
+            self._cache.set(text, structure, feedback, position, topic, self._model)
+
+    def _budgeted_deltas(self, deadline: float) -> Iterator[str]:
+        """스트림은 백그라운드 스레드에서 받고, 조각은 deadline까지만 돌려줌 (넘기면 _BudgetExceeded)"""
+        chunks = queue.Queue()
+        pending = Future()
+
+        def pump():
+            parts = []
+            try:
+                # 대기 순번(int)도 조각과 같은 큐로 넘겨 순회하는 스레드에서 on_wait를 부름
+                for delta in self._deltas(chunks.put if self._on_wait is not None else None):
+                    parts.append(delta)
+                    chunks.put(delta)
+                feedback = ''.join(parts)
+                if not feedback:
+                    raise ValueError("빈 응답")
+                self._store(feedback)
+                pending.set_result(feedback)
+            except Exception as e:
+                pending.set_exception(e)
+            finally:
+                chunks.put(None)
+
+        threading.Thread(target=pump, name="coaching-stream", daemon=True).start()
+        while True:
+            try:
+                delta = chunks.get(timeout=max(deadline - time.perf_counter(), 0))
+            except queue.Empty:
+                self.pending = pending
+                raise _BudgetExceeded()
+            if delta is None:
+                break
+            if isinstance(delta, int):
+                self._on_wait(delta)
+                continue
+            yield delta
+        # 스트림이 실패했으면 예외를 그대로 올려 템플릿으로 대체
+        pending.result()
+
+    def __iter__(self) -> Iterator[str]:
+        start = time.perf_counter()
+        
+        # API 없으면 섹션별 피드백만 한 번에 반환
+        if 'upstage' not in self._clients:
+            self.text = self.fallback
+            self.ttft = self.total = time.perf_counter() - start
+            yield self.text
+            return
+        
+        decision = route_coaching(self._cache_args[0], self._cache_args[1], COACHING_MODEL, COACHING_FAST_MODEL)
+        self.route = decision['route']
+        if self.route == 'template':
+            self.text = self.fallback
+            self.ttft = self.total = time.perf_counter() - start
+            log_decision(decision, self.total)
+            yield self.text
+            return
+        self._model = decision['model']
+        
+        if self._cache is not None:
+            cached = self._cache.get(*self._cache_args, self._model)
+            if cached is not None:
+                self.text = cached
+                self.cached = True
+                self.ttft = self.total = time.perf_counter() - start
+                log_decision(decision, self.total, 'cached')
+                yield self.text
+                return
+        
+        parts = []
+        budgeted = self._slo > 0
+        deltas = self._budgeted_deltas(start + self._slo) if budgeted else self._deltas(self._on_wait)
+        try:
+            for delta in deltas:
+                if self.ttft is None:
+                    self.ttft = time.perf_counter() - start
+                parts.append(delta)
+                yield delta
+            self.text = ''.join(parts)
+            if not self.text:
+                raise ValueError("빈 응답")
+            if not budgeted:
+                self._store(self.text)
+        except _BudgetExceeded:
+            # 제공자가 느리면 기다리지 않고 받은 만큼(없으면 템플릿)을 먼저 보여줌
+            self.provisional = True
+            self.text = ''.join(parts) + " …" if parts else self.fallback
+        except Exception:
+            self.text = self.fallback
+            self.fell_back = True
+        finally:
+            self.total = time.perf_counter() - start
+            if self.ttft is None:
+                self.ttft = self.total
+            metrics.observe("coaching.stream_ttft", self.ttft)
+            metrics.observe("coaching.stream_total", self.total)
+            log_decision(decision, self.total, _outcome(self))
+
+    def latency(self) -> Dict:
+        return {'ttft': self.ttft, 'total': self.total, 'fell_back': self.fell_back, 'cached': self.cached,
+                'provisional': self.provisional, 'route': self.route}
+
+
+# 지연 예산이 있는 코칭 요청 (스트리밍을 쓰지 않을 때)
+class CoachingReply:
+    """slo초 안에 오면 LLM 피드백을, 아니면 섹션별 템플릿을 먼저 돌려주는 코칭 요청
+
+    wait()는 예산까지만 기다린다. 예산을 넘기면 `text`는 템플릿이고 `provisional`이 True이며,
+    LLM 응답은 백그라운드에서 계속 받아 `pending`(Future)에 담는다. hedge_after초가 지나도
+    응답이 없으면 같은 요청을 한 번 더 보낸다. slo가 0이면 응답이 올 때까지 기다린다.
+    API 호출은 작업 스레드에서 하지만, on_wait(대기 순번)는 wait()를 부른 스레드에서 호출된다.
+    모델은 FeedbackStream처럼 라우터가 고른다.
+    """
+
+    def __init__(self, text: str, structure: Dict, clients: Dict, position: str = None, topic: str = None,
+                 cache: FeedbackCache = None, context: str = None, slo: float = COACHING_SLO_SECONDS,
+                 hedge_after: float = COACHING_HEDGE_SECONDS, on_wait: Callable[[int], None] = None):
+        self.text = ''
+        self.elapsed = None
+        self.fell_back = False
+        self.cached = False
+        self.provisional = False
+        self.pending = None
+        self.route = None
+        self.fallback = _section_feedback(structure)
+        self._text = text
+        self._structure = structure
+        self._clients = clients
+        self._position = position
+        self._topic = topic
+        self._cache = cache
+        self._context = context
+        self._slo = slo
+        self._hedge_after = hedge_after
+        self._on_wait = on_wait
+        self._model = COACHING_MODEL
+
+    def _store(self, feedback: str) -> None:
+        if self._cache is not None:
+            self._cache.set(self._text, self._structure, feedback, self._position, self._topic, self._model)
+
+    def wait(self) -> str:
+        start = time.perf_counter()
+        decision = None
+        try:
+            if 'upstage' not in self._clients:
+                self.text = self.fallback
+                return self.text
+            decision = route_coaching(self._text, self._structure, COACHING_MODEL, COACHING_FAST_MODEL)
+            self.route = decision['route']
+            if self.route == 'template':
+                self.text = self.fallback
+                return self.text
+            self._model = decision['model']
+            if self._cache is not None:
+                cached = self._cache.get(self._text, self._structure, self._position, self._topic, self._model)
+                if cached is not None:
+                    self.text = cached
+                    self.cached = True
+                    return self.text
+
+            with metrics.span("coaching.prompt"):
+                messages = build_coaching_messages(self._text, self._structure, self._position, self._topic,
+                                                   self._context)
+            positions = queue.Queue()
+            future = request_feedback(messages, self._clients, self._hedge_after, on_success=self._store,
+                                      model=self._model, on_wait=positions.put if self._on_wait else None)
+            try:
+                self._relay_positions(future, positions, start + self._slo if self._slo > 0 else None)
+                self.text = future.result(timeout=0)
+            except FutureTimeout:
+                # 제공자가 느리면 템플릿을 먼저 보여주고 응답은 pending으로 받아옴
+                self.provisional = True
+                self.pending = future
+                self.text = self.fallback
+            return self.text
+        except (CircuitOpenError, SchedulerBusyError):
+            # 제공자 장애나 대기열 포화 중에는 기다리지 않고 섹션별 피드백으로 대체
+            self.text = self.fallback
+            self.fell_back = True
+            return self.text
+        except Exception as e:
+            self.text = f"피드백 생성 중 오류가 발생했습니다: {str(e)}"
+            return self.text
+        finally:
+            self.elapsed = time.perf_counter() - start
+            if decision is not None:
+                log_decision(decision, self.elapsed, _outcome(self))
+
+    def _relay_positions(self, future: Future, positions: queue.Queue, deadline: float = None) -> None:
+        """응답이 오거나 deadline이 될 때까지 기다리며, 작업 스레드가 넘긴 대기 순번으로 on_wait 호출"""
+        future.add_done_callback(lambda _: positions.put(None))
+        while not future.done():
+            timeout = None if deadline is None else deadline - time.perf_counter()
+            if timeout is not None and timeout <= 0:
+                return
+            try:
+                ahead = positions.get(timeout=timeout)
+            except queue.Empty:
+                return
+            if ahead is not None:
+                self._on_wait(ahead)
+
+    def latency(self) -> Dict:
+        return {'ttft': self.elapsed, 'total': self.elapsed, 'fell_back': self.fell_back, 'cached': self.cached,
+                'provisional': self.provisional, 'route': self.route}
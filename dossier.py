@@ -0,0 +1,167 @@
+"""토론 주제별 자료집 미리 가져오기
+
+학생이 주제와 입장을 고르는 순간, 주제의 핵심 사실 질문 몇 개를 Perplexity로 백그라운드에서
+검색해 자료집을 만든다. 자료집은 참고 자료와 같은 형식의 BM25 색인(DOSSIER_DIR 아래 주제별)
+으로 저장되어 모든 세션과 프로세스가 공유하고, 팩트체크는 웹 검색 전에 이 색인에서 먼저
+근거를 찾는다.
+
+미리 만들어 두기 (예시 주제 등):
+    python dossier.py "학교 내 스마트폰 사용"
+"""
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import metrics
+from fact_check import PERPLEXITY_MODEL
+from reference_index import build_index, current_version, load_index, topic_key, topic_lock, version_time
+
+DOSSIER_DIR = os.environ.get("DOSSIER_DIR", os.path.join(".cache", "dossiers"))
+DOSSIER_TTL = int(os.environ.get("DOSSIER_TTL", 7 * 24 * 3600))   # 자료집을 다시 만드는 주기(초)
+DOSSIER_RETRY_SECONDS = 300    # 검색이 모두 실패한 주제를 다시 시도하기까지 기다리는 시간(초)
+DOSSIER_WORKERS = 2            # 주제 하나에 동시에 보낼 검색 수
+
+# 주제의 핵심 사실 질문 (찬성/반대 양쪽 근거를 모두 담아 입장과 무관하게 공유)
+DOSSIER_QUESTIONS = [
+    "'{topic}' 관련 최근 국내외 통계와 수치",
+    "'{topic}' 관련 주요 연구 결과와 연구 기관",
+    "'{topic}' 관련 국내 법령, 정책, 학교 규정 현황",
+    "'{topic}'에 찬성하는 쪽과 반대하는 쪽이 드는 대표적인 사실 근거와 사례",
+]
+
+_URL = re.compile(r'https?://[^\s)\]]+')
+
+_in_flight = set()   # 자료집을 만들고 있는 주제 키
+_failed = {}         # 주제 키 -> 마지막 실패 시각
+_lock = threading.Lock()
+
+
+def _topic_dir(topic: str, root: str) -> str:
+    return os.path.join(root, topic_key(topic))
+
+
+def _age(version: str) -> float:
+    return time.time() - version_time(version)
+
+
+def is_fresh(topic: str, root: str = DOSSIER_DIR) -> bool:
+    version = current_version(_topic_dir(topic, root))
+    return version is not None and _age(version) < DOSSIER_TTL
+
+
+def load_dossier(topic: str, root: str = DOSSIER_DIR):
+    """주제의 자료집 색인 (없거나 오래됐으면 None)"""
+    if not topic or not is_fresh(topic, root):
+        return None
+    return load_index(topic, root)
+
+
+def _search(topic: str, question: str, clients: Dict) -> Dict:
+    response = clients['perplexity'].chat.completions.create(
+        model=PERPLEXITY_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "당신은 중고등학생 토론 수업을 돕는 자료 조사원입니다. 신뢰할 수 있는 출처의 사실과 수치만 간결하게 정리해주세요."
+            },
+            {
+                "role": "user",
+                "content": f"토론 주제: {topic}\n\n{question}을(를) 조사해주세요. 문장마다 구체적인 수치, 연도, 기관명을 밝히고 출처 URL을 함께 적어주세요."
+            }
+        ],
+        temperature=0.2,
+        max_tokens=1000,
+        priority='prefetch'
+    )
+    text = response.choices[0].message.content
+    urls = list(getattr(response, 'citations', None) or []) + _URL.findall(text)
+    return {'question': question, 'text': text, 'urls': list(dict.fromkeys(urls))}
+
+
+# 자료집 생성
+def build_dossier(topic: str, clients: Dict, root: str = DOSSIER_DIR):
+    """핵심 질문을 검색해 자료집 색인을 새로 만듦 (새 버전 이름, 검색이 모두 실패하면 None)"""
+    questions = [q.format(topic=topic) for q in DOSSIER_QUESTIONS]
+    with metrics.span("dossier.build"):
+        with ThreadPoolExecutor(max_workers=DOSSIER_WORKERS) as pool:
+            futures = [pool.submit(_search, topic, question, clients) for question in questions]
+        answers = []
+        for future in futures:
+            try:
+                answers.append(future.result())
+            except Exception:
+                # 일부 질문이 실패해도 나머지로 자료집을 만듦
+                continue
+        if not answers:
+            return None
+
+        # 이전 자료집의 답변이 섞이지 않도록 새 디렉터리에 다 쓴 뒤 docs/와 바꿔 넣고,
+        # 다른 프로세스(앱과 CLI)의 생성과 겹치지 않도록 주제 잠금 안에서 교체와 색인을 함께 함
+        topic_dir = _topic_dir(topic, root)
+        docs_dir = os.path.join(topic_dir, 'docs')
+        with topic_lock(topic_dir):
+            staging = tempfile.mkdtemp(prefix='docs-', dir=topic_dir)
+            urls = {}
+            for i, answer in enumerate(answers):
+                name = f"{i + 1:02d}.md"
+                with open(os.path.join(staging, name), 'w', encoding='utf-8') as f:
+                    f.write(answer['text'])
+                urls[name] = answer['urls']
+            with open(os.path.join(topic_dir, 'topic.txt'), 'w', encoding='utf-8') as f:
+                f.write(topic)
+            if os.path.isdir(docs_dir):
+                retired = tempfile.mkdtemp(prefix='old-', dir=topic_dir)
+                os.replace(docs_dir, os.path.join(retired, 'docs'))
+                shutil.rmtree(retired, ignore_errors=True)
+            os.replace(staging, docs_dir)
+            return build_index(topic_dir, urls)
+
+
+def prefetch(topic: str, clients: Dict, root: str = DOSSIER_DIR) -> bool:
+    """자료집이 없거나 오래됐으면 백그라운드에서 만들기 시작 (시작했으면 True, 바로 반환)"""
+    if not topic or 'perplexity' not in clients or is_fresh(topic, root):
+        return False
+    key = topic_key(topic)
+    with _lock:
+        if key in _in_flight or time.time() - _failed.get(key, 0) < DOSSIER_RETRY_SECONDS:
+            return False
+        _in_flight.add(key)
+
+    def run():
+        try:
+            version = build_dossier(topic, clients, root)
+        except Exception:
+            version = None
+        with _lock:
+            _in_flight.discard(key)
+            if version is None:
+                _failed[key] = time.time()
+            else:
+                _failed.pop(key, None)
+
+    threading.Thread(target=run, name="dossier-prefetch", daemon=True).start()
+    return True
+
+
+def main(argv: List[str] = None):
+    from api_clients import create_clients
+
+    topics = argv if argv is not None else sys.argv[1:]
+    if not topics:
+        sys.exit('사용법: python dossier.py "토론 주제" [...]')
+    clients = create_clients()
+    if 'perplexity' not in clients:
+        sys.exit("PERPLEXITY_API_KEY가 필요합니다.")
+    for topic in topics:
+        version = build_dossier(topic, clients)
+        print(f"{topic}: {version or '실패'}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import os
+from typing import Dict, List
+
+import segmenter
+
+# 코칭 프롬프트에 넣을 글 전체 요약의 최대 길이(문자) — 세션이 길어져도 프롬프트 크기가 일정
+ESSAY_CONTEXT_CHARS = int(os.environ.get("ESSAY_CONTEXT_CHARS", 400))
+# 요약에 남길 근거/출처 수 (넘으면 오래된 것부터 빠지고 개수만 유지)
+MAX_EVIDENCE_ITEMS = 4
+MAX_SOURCE_ITEMS = 4
+# 항목 하나의 최대 길이(문자)
+ITEM_CHARS = 60
+
+
+def _first_sentence(text: str) -> str:
+    spans = segmenter.sentence_spans(text)
+    return text[spans[0][0]:spans[0][1]] if spans else ''
+
+
+def _clip(text: str, limit: int = ITEM_CHARS) -> str:
+    text = ' '.join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+# 글 전체 상태
+class EssayState:
+    """지금까지 제출한 단락에서 뽑은 주장/근거/출처/결론과 고정 크기 요약
+
+    턴마다 update()로 분석 결과를 한 번 반영하고, 코칭 프롬프트에는 summary만 넣는다.
+    세션 저장소에 그대로 저장할 수 있도록 to_dict()/from_dict()로 변환한다.
+    """
+
+    def __init__(self, claim: str = '', evidence: List[str] = None, evidence_total: int = 0,
+                 sources: List[str] = None, conclusion: str = '', turns: int = 0, summary: str = ''):
+        self.claim = claim
+        self.evidence = list(evidence or [])
+        self.evidence_total = evidence_total
+        self.sources = list(sources or [])
+        self.conclusion = conclusion
+        self.turns = turns
+        self.summary = summary
+
+    def update(self, text: str, structure: Dict) -> None:
+        """단락 하나의 분석 결과를 반영하고 요약을 다시 만든다"""
+        section = structure.get('section_type', 'body')
+        sentence = _clip(_first_sentence(text))
+        if section == 'intro':
+            self.claim = sentence
+        elif section == 'conclusion':
+            self.conclusion = sentence
+        elif sentence:
+            self.evidence.append(sentence)
+            del self.evidence[:-MAX_EVIDENCE_ITEMS]
+            self.evidence_total += max(structure.get('evidence_count', 0), 1)
+
+        for source in structure.get('sources', []):
+            source = _clip(source.strip(), 30)
+            if source and source not in self.sources:
+                self.sources.append(source)
+        del self.sources[:-MAX_SOURCE_ITEMS]
+
+        self.turns += 1
+        self.summary = self._summarize()
+
+    def _summarize(self) -> str:
+        lines = []
+        if self.claim:
+            lines.append(f"- 서론 주장: {self.claim}")
+        if self.evidence:
+            lines.append(f"- 본론 근거 (지금까지 {self.evidence_total}개):")
+            lines.extend(f"  · {item}" for item in self.evidence)
+        if self.sources:
+            lines.append(f"- 인용한 출처: {', '.join(self.sources)}")
+        if self.conclusion:
+            lines.append(f"- 결론: {self.conclusion}")
+
+        # 예산을 넘으면 가장 오래된 근거부터 뺀다 (주장과 결론은 끝까지 유지)
+        summary = "\n".join(lines)
+        while len(summary) > ESSAY_CONTEXT_CHARS:
+            removable = [i for i, line in enumerate(lines) if line.startswith("  · ")]
+            if not removable:
+                summary = summary[:ESSAY_CONTEXT_CHARS - 1] + '…'
+                break
+            del lines[removable[0]]
+            summary = "\n".join(lines)
+        return summary
+
+    def to_dict(self) -> Dict:
+        return {
+            'claim': self.claim,
+            'evidence': list(self.evidence),
+            'evidence_total': self.evidence_total,
+            'sources': list(self.sources),
+            'conclusion': self.conclusion,
+            'turns': self.turns,
+            'summary': self.summary
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict = None) -> 'EssayState':
+        return cls(**(data or {}))
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from sqlite_db import open_sqlite
+
+# 기본 설정 (환경 변수로 조정 가능)
+DEFAULT_CACHE_PATH = os.environ.get("FACT_CACHE_PATH", os.path.join(".cache", "fact_check.sqlite3"))
+DEFAULT_TTL_SECONDS = int(os.environ.get("FACT_CACHE_TTL", 7 * 24 * 3600))
+DEFAULT_MEMORY_ENTRIES = int(os.environ.get("FACT_CACHE_MEMORY_ENTRIES", 512))
+DEFAULT_DISK_ENTRIES = int(os.environ.get("FACT_CACHE_DISK_ENTRIES", 20000))
+DISK_EVICT_SLACK = 0.1   # 디스크 한도를 넘으면 한도의 이 비율만큼 더 지워 매 기록마다 정리하지 않게 함
+
+
+def normalize_text(text: str) -> str:
+    """공백, 전각/반각, 대소문자, 앞뒤 문장부호 차이를 없앤 비교용 텍스트"""
+    text = unicodedata.normalize('NFKC', text or '')
+    text = re.sub(r'\s+', ' ', text).strip().lower()
+    return text.strip(' .,!?~\'"“”‘’')
+
+
+def make_key(claim: str, source_text: str, models: tuple) -> str:
+    """정규화된 주장/출처와 모델 이름으로 만든 내용 기반 키"""
+    payload = '\x1f'.join([normalize_text(claim), normalize_text(source_text), *models])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class FactCheckCache:
+    """팩트체크 결과 캐시 (프로세스 내 LRU + SQLite 디스크 계층)
+
+    디스크 계층은 여러 프로세스가 함께 쓰므로 잠금 대기 시간 초과 같은 SQLite 오류가 나면
+    그 조회/저장만 디스크를 건너뛰고 메모리 계층으로 계속한다 (팩트체크 결과는 버리지 않음).
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL_SECONDS,
+                 max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 max_disk_entries: int = DEFAULT_DISK_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self._memory = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'disk_errors': 0}
+
+        self._db = open_sqlite(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS fact_checks ("
+            " key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_fact_checks_accessed ON fact_checks(accessed_at)")
+        self._db.commit()
+        # 디스크 행 수 (다른 프로세스의 기록과 교체한 행은 정리할 때 다시 셈)
+        self._disk_rows = self._db.execute("SELECT COUNT(*) FROM fact_checks").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Dict]:
+        """캐시된 결과 조회 (없거나 만료되면 None)"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return dict(entry[1])
+                del self._memory[key]
+
+            try:
+                row = self._db.execute(
+                    "SELECT result, expires_at FROM fact_checks WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or row[1] <= now:
+                    if row is not None:
+                        self._db.execute("DELETE FROM fact_checks WHERE key = ?", (key,))
+                        self._db.commit()
+                    self._stats['misses'] += 1
+                    return None
+                self._db.execute("UPDATE fact_checks SET accessed_at = ? WHERE key = ?", (now, key))
+                self._db.commit()
+            except sqlite3.Error:
+                self._disk_error()
+                self._stats['misses'] += 1
+                return None
+            result = json.loads(row[0])
+            self._remember(key, row[1], result)
+            self._stats['disk_hits'] += 1
+            return dict(result)
+
+    def set(self, key: str, result: Dict) -> None:
+        """결과 저장 (TTL 적용, 용량 초과 시 오래 안 쓴 항목부터 제거)"""
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, dict(result))
+            self._stats['stores'] += 1
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO fact_checks (key, result, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(result, ensure_ascii=False), expires_at, now)
+                )
+                self._disk_rows += 1
+                if self._disk_rows > self.max_disk_entries:
+                    self._evict_disk(now)
+                self._db.commit()
+            except sqlite3.Error:
+                self._disk_error()
+
+    def _disk_error(self) -> None:
+        self._stats['disk_errors'] += 1
+        try:
+            self._db.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _remember(self, key: str, expires_at: float, result: Dict) -> None:
+        self._memory[key] = (expires_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now: float) -> None:
+        # 만료된 행을 먼저 지우고, 다른 프로세스가 쓴 행까지 다시 센 뒤 한도보다 조금 더 지워 정리를 드물게 함
+        removed = self._db.execute("DELETE FROM fact_checks WHERE expires_at <= ?", (now,)).rowcount
+        count = self._db.execute("SELECT COUNT(*) FROM fact_checks").fetchone()[0]
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            overflow += int(self.max_disk_entries * DISK_EVICT_SLACK)
+            deleted = self._db.execute(
+                "DELETE FROM fact_checks WHERE key IN "
+                "(SELECT key FROM fact_checks ORDER BY accessed_at ASC LIMIT ?)", (overflow,)
+            ).rowcount
+            removed += deleted
+            count -= deleted
+        self._disk_rows = max(count, 0)
+        self._stats['evictions'] += max(removed, 0)
+
+    def stats(self) -> Dict:
+        """적중률 통계"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['lookups'] = lookups
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM fact_checks")
+            self._db.commit()
+            self._disk_rows = 0
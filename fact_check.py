@@ -0,0 +1,410 @@
+import queue
+import re
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import analyzer
+import metrics
+import segmenter
+from api_clients import CircuitOpenError
+from fact_cache import FactCheckCache, make_key
+from reference_index import ReferenceIndex
+from scheduler import SchedulerBusyError
+
+# 팩트체크에 사용하는 모델
+PERPLEXITY_MODEL = "sonar-small-online"
+GROUNDEDNESS_MODEL = "groundedness-check"
+
+# 동시에 진행할 단계별 최대 요청 수
+MAX_SEARCH_WORKERS = 4
+MAX_GROUND_WORKERS = 4
+
+# 교사 참고 자료로 검증할 때 근거로 넘길 단락 수와, 주장 용어 중 단락에 있어야 하는 최소 비율
+REFERENCE_PASSAGES = 3
+REFERENCE_MIN_COVERAGE = 0.5
+
+# 검색 결과를 스트리밍할 때 화면에 넘기는 최소 간격(초) (새 출처 URL이 나오면 바로 넘김)
+PROGRESS_INTERVAL = 0.15
+
+_SOURCE_MARKER = re.compile('|'.join(re.escape(p) for p in analyzer.SOURCE_MARKERS))
+_URL = re.compile(r'https?://[^\s]+')
+
+
+def _new_result() -> Dict:
+    return {
+        'is_grounded': False,
+        'confidence': 0.0,
+        'search_results': '',
+        'explanation': '',
+        'sources': []
+    }
+
+
+def _cache_key(claim: str, source_text: str, clients: Dict, references: ReferenceIndex = None,
+               dossier: ReferenceIndex = None) -> str:
+    models = (PERPLEXITY_MODEL, GROUNDEDNESS_MODEL if 'upstage' in clients else '')
+    # 자료를 새로 올리거나 자료집을 다시 만들면 색인 버전이 바뀌어 이전 결과를 쓰지 않음
+    if references is not None:
+        models += (references.version,)
+    if dossier is not None:
+        models += ('dossier', dossier.version)
+    return make_key(claim, source_text, models)
+
+
+def _cacheable(clients: Dict, references: ReferenceIndex = None, dossier: ReferenceIndex = None) -> bool:
+    local = references is not None or dossier is not None
+    return 'perplexity' in clients or (local and 'upstage' in clients)
+
+
+# 주장 추출
+def extract_claims(text: str) -> List[Dict]:
+    """출처 표지('~에 따르면' 등)가 붙은 모든 주장을 출처와 함께 추출
+
+    주장은 표지 뒤부터 그 문장 끝까지이고, span은 원문에서 출처부터 문장 끝까지의 위치다.
+    """
+    claims = []
+    source_spans = analyzer.scan(text)['source_spans']
+    sentence_spans = segmenter.sentence_spans(text) if source_spans else []
+    for start, end in source_spans:
+        # 마침표 없이 이어 쓴 앞 문장이 출처에 섞이지 않도록 출처를 표지가 있는 문장 안으로 자름
+        sentence = segmenter.sentence_at(sentence_spans, end)
+        if sentence and sentence[0] > start:
+            start = sentence[0]
+        marker = _SOURCE_MARKER.match(text, end)
+        claim_start = marker.end()
+        sentence = segmenter.sentence_at(sentence_spans, claim_start)
+        claim_end = sentence[1] if sentence else len(text)
+        claim = text[claim_start:claim_end].strip(' ,.!?')
+        if claim:
+            claims.append({
+                'source': text[start:end].strip(),
+                'claim': claim,
+                'span': (start, claim_end)
+            })
+
+    # 출처가 없으면 전체 텍스트를 하나의 주장으로 검증
+    if not claims and text.strip():
+        claims.append({'source': '', 'claim': text.strip(), 'span': (0, len(text))})
+    return claims
+
+
+class UrlScanner:
+    """스트리밍으로 도착하는 글에서 끝난(뒤에 글자가 더 온) URL만 순서대로 추출
+
+    URL에는 공백이 없으므로 마지막 공백 앞은 다시 훑지 않는다.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self._offset = 0
+
+    def feed(self, text: str, final: bool = False) -> bool:
+        """지금까지 받은 전체 글을 넘기고, 새 URL이 나왔는지 반환 (final이면 끝에 걸친 URL도 포함)"""
+        found = False
+        for match in _URL.finditer(text, self._offset):
+            if match.end() == len(text) and not final:
+                break
+            self.urls.append(match.group())
+            self._offset = match.end()
+            found = True
+        self._offset = max(self._offset, max(text.rfind(' '), text.rfind('\n')) + 1)
+        return found
+
+
+def _evidence(result: Dict, complete: bool = True) -> Dict:
+    """화면에 먼저 보여줄 근거 (검증 판정 전)"""
+    return {
+        'search_results': result['search_results'],
+        'sources': result.get('reference_sources') or _URL.findall(result['search_results'])[:3],
+        'reference': result.get('reference'),
+        'complete': complete
+    }
+
+
+def _stream_search(clients: Dict, request: Dict, on_progress: Callable[[Dict], None]) -> str:
+    stream = clients['perplexity'].chat.completions.create(stream=True, **request)
+    text = ''
+    scanner = UrlScanner()
+    shown = 0.0
+    for chunk in stream:
+        if getattr(chunk, 'usage', None):
+            metrics.record_usage('perplexity', PERPLEXITY_MODEL, chunk.usage)
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        text += delta
+        found = scanner.feed(text)
+        now = time.perf_counter()
+        if found or now - shown >= PROGRESS_INTERVAL:
+            shown = now
+            on_progress({'search_results': text, 'sources': scanner.urls[:3], 'reference': None, 'complete': False})
+    return text
+
+
+# 1단계: Perplexity 웹 검색
+def search_claim(claim: str, source_text: str, clients: Dict,
+                 on_progress: Callable[[Dict], None] = None) -> Tuple[Dict, bool]:
+    """Perplexity로 웹 검색 (결과와 성공 여부 반환)
+
+    on_progress가 있으면 답변을 스트리밍으로 받아, 받은 만큼의 글과 지금까지 나온 출처 URL을 넘긴다.
+    """
+    result = _new_result()
+
+    if 'perplexity' not in clients:
+        result['explanation'] = "Perplexity API 키가 설정되지 않았습니다."
+        return result, False
+
+    try:
+        with metrics.span("fact_check.search"):
+            request = dict(
+                model=PERPLEXITY_MODEL,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "당신은 팩트체커입니다. 주어진 주장에 대한 사실 여부를 웹 검색을 통해 확인하고, 신뢰할 수 있는 출처와 함께 검증 결과를 제공해주세요."
+                    },
+                    {
+                        "role": "user",
+                        "content": f"다음 주장의 사실 여부를 확인해주세요:\n\n출처: {source_text}\n주장: {claim}\n\n신뢰할 수 있는 출처를 바탕으로 이 주장이 사실인지 검증해주세요."
+                    }
+                ],
+                temperature=0.3,
+                max_tokens=1000,
+                priority='fact_check'
+            )
+            if on_progress is None:
+                response = clients['perplexity'].chat.completions.create(**request)
+                result['search_results'] = response.choices[0].message.content
+            else:
+                result['search_results'] = _stream_search(clients, request, on_progress)
+        return result, True
+    except (CircuitOpenError, SchedulerBusyError) as e:
+        result['explanation'] = f"{str(e)} 잠시 후 다시 시도해주세요."
+        return result, False
+    except Exception as e:
+        result['explanation'] = f"팩트체크 중 오류 발생: {str(e)}\n상세: {traceback.format_exc()}"
+        return result, False
+
+
+# 1단계 (로컬): 교사 참고 자료 / 주제 자료집 검색
+def reference_search(claim: str, references: ReferenceIndex, kind: str = 'teacher') -> Tuple[Dict, bool]:
+    """로컬 색인에서 주장과 관련된 단락을 찾아 검증 근거로 사용 (충분히 관련된 단락이 없으면 실패)
+
+    kind는 'teacher'(교사 참고 자료) 또는 'dossier'(미리 검색한 주제 자료집)이고 결과의 reference에 남는다.
+    """
+    result = _new_result()
+    with metrics.span(f"fact_check.{'reference' if kind == 'teacher' else 'dossier'}_search"):
+        passages = references.search(claim, k=REFERENCE_PASSAGES)
+    passages = [p for p in passages if p['coverage'] >= REFERENCE_MIN_COVERAGE]
+    if not passages:
+        return result, False
+
+    sources = []
+    for p in passages:
+        # 원문 URL이 있는 자료(자료집)는 URL을, 없으면 자료 이름을 출처로
+        sources.extend(references.urls.get(p['source']) or [f"참고 자료: {p['source']}"])
+    result['search_results'] = "\n\n".join(f"[{p['source']}] {p['text']}" for p in passages)
+    result['reference'] = kind
+    result['reference_sources'] = list(dict.fromkeys(sources))[:3]
+    return result, True
+
+
+def find_evidence(claim: str, source_text: str, clients: Dict, references: ReferenceIndex = None,
+                  dossier: ReferenceIndex = None, on_progress: Callable[[Dict], None] = None) -> Tuple[Dict, bool]:
+    """교사 참고 자료 → 주제 자료집 순으로 먼저 찾고, 둘 다 없을 때만 Perplexity 웹 검색"""
+    # 로컬 근거 판정은 Groundedness Check가 있어야 의미가 있음
+    if 'upstage' in clients:
+        for kind, index in (('teacher', references), ('dossier', dossier)):
+            if index is not None:
+                result, ok = reference_search(claim, index, kind)
+                if ok:
+                    return result, True
+    return search_claim(claim, source_text, clients, on_progress)
+
+
+# 2단계: Upstage Groundedness Check (검색 결과를 ground truth로 사용)
+def ground_claim(claim: str, result: Dict, clients: Dict) -> Tuple[Dict, bool]:
+    """검색 결과에 대해 주장 검증 후 신뢰도와 출처 URL 채우기"""
+    search_results = result['search_results']
+    ok = True
+
+    if 'upstage' in clients:
+        try:
+            with metrics.span("fact_check.grounding"):
+                ground_response = clients['upstage'].chat.completions.create(
+                    model=GROUNDEDNESS_MODEL,
+                    messages=[
+                        {"role": "user", "content": search_results},
+                        {"role": "assistant", "content": claim}
+                    ],
+                    priority='fact_check'
+                )
+
+            ground_content = ground_response.choices[0].message.content
+
+            # 응답 파싱 개선
+            ground_lower = ground_content.lower()
+
+            # 다양한 긍정 표현 체크
+            if any(word in ground_lower for word in ['grounded', 'supported', 'verified', '사실', '확인', '입증']):
+                result['is_grounded'] = True
+                result['confidence'] = 0.85
+            elif any(word in ground_lower for word in ['partially', 'partly', '부분적', '일부']):
+                result['is_grounded'] = True
+                result['confidence'] = 0.5
+            elif any(word in ground_lower for word in ['not grounded', 'unsupported', 'false', '거짓', '틀림', '오류']):
+                result['is_grounded'] = False
+                result['confidence'] = 0.1
+            else:
+                # 기본값: 약한 신뢰도
+                result['is_grounded'] = True
+                result['confidence'] = 0.3
+
+            result['explanation'] = ground_content
+        except Exception as e:
+            result['explanation'] = f"Groundedness Check 오류: {str(e)}"
+            ok = False
+    else:
+        # Upstage API가 없는 경우 Perplexity 결과만으로 판단
+        search_lower = search_results.lower()
+        if any(word in search_lower for word in ['사실', '확인', '맞습니다', '정확', 'true', 'correct', 'verified']):
+            result['is_grounded'] = True
+            result['confidence'] = 0.7
+        elif any(word in search_lower for word in ['거짓', '틀림', '오류', 'false', 'incorrect', 'wrong']):
+            result['is_grounded'] = False
+            result['confidence'] = 0.1
+        else:
+            result['is_grounded'] = True
+            result['confidence'] = 0.4
+        result['explanation'] = search_results
+
+    # 출처 추출 (로컬 자료의 URL/이름, 또는 Perplexity 응답의 URL 상위 3개)
+    result['sources'] = result.get('reference_sources') or _URL.findall(search_results)[:3]
+    return result, ok
+
+
+# Perplexity를 통한 팩트체크
+def perplexity_fact_check(claim: str, source_text: str, clients: Dict, cache: FactCheckCache = None,
+                          references: ReferenceIndex = None, dossier: ReferenceIndex = None) -> Dict:
+    """교사 참고 자료나 주제 자료집(없으면 Perplexity 웹 검색)을 근거로 Groundedness Check 수행"""
+    cache_key = None
+    if cache is not None and _cacheable(clients, references, dossier):
+        cache_key = _cache_key(claim, source_text, clients, references, dossier)
+        with metrics.span("fact_check.cache_lookup"):
+            cached = cache.get(cache_key)
+        if cached is not None:
+            cached['cached'] = True
+            return cached
+
+    result, ok = find_evidence(claim, source_text, clients, references, dossier)
+    if not ok:
+        return result
+
+    result, ok = ground_claim(claim, result, clients)
+
+    # 두 단계가 모두 성공한 결과만 캐시
+    if cache_key and ok:
+        cache.set(cache_key, result)
+    return result
+
+
+# 여러 주장 동시 팩트체크 (진행 상황 포함)
+def iter_fact_check_events(claims: List[Dict], clients: Dict, cache: FactCheckCache = None,
+                           references: ReferenceIndex = None, dossier: ReferenceIndex = None,
+                           stream: bool = True, max_search: int = MAX_SEARCH_WORKERS,
+                           max_ground: int = MAX_GROUND_WORKERS) -> Iterator[Tuple[int, str, Dict]]:
+    """주장마다 검색 → 검증 파이프라인을 겹쳐 실행하고 (인덱스, 단계, 내용)을 도착하는 순서대로 반환
+
+    단계 'evidence'는 판정 전 근거({search_results, sources, reference, complete})로, stream이면
+    웹 검색 답변이 생성되는 동안 여러 번(complete=False) 오고 검색이 끝나면 complete=True로 한 번 온다.
+    검증은 검색이 끝나는 즉시 시작하고, 단계 'done'이 주장의 최종 결과다 (주장마다 정확히 한 번).
+    검색과 검증은 각각 크기가 제한된 스레드 풀에서 돌기 때문에 한 주장의 검증과
+    다른 주장의 검색이 동시에 진행된다.
+    """
+    if not claims:
+        return
+
+    events = queue.Queue()
+    keys = {}
+
+    def finish(idx: int, result: Dict, start: float) -> None:
+        metrics.observe("fact_check.claim_total", time.perf_counter() - start)
+        events.put((idx, 'done', result))
+
+    def ground(idx: int, result: Dict, start: float) -> None:
+        try:
+            result, ok = ground_claim(claims[idx]['claim'], result, clients)
+        except Exception as e:
+            result, ok = _new_result(), False
+            result['explanation'] = f"팩트체크 중 오류 발생: {str(e)}"
+        # 캐시 저장은 판정과 별개 (저장이 실패해도 받은 판정은 그대로 돌려줌)
+        if ok and idx in keys:
+            cache.set(keys[idx], result)
+        finish(idx, result, start)
+
+    def search(idx: int) -> None:
+        start = time.perf_counter()
+        first = []
+
+        def progress(evidence: Dict) -> None:
+            if not first:
+                first.append(True)
+                metrics.observe("fact_check.first_evidence", time.perf_counter() - start)
+            events.put((idx, 'evidence', evidence))
+
+        try:
+            result, ok = find_evidence(claims[idx]['claim'], claims[idx]['source'], clients, references, dossier,
+                                       on_progress=progress if stream else None)
+        except Exception as e:
+            result, ok = _new_result(), False
+            result['explanation'] = f"팩트체크 중 오류 발생: {str(e)}"
+        if not ok:
+            finish(idx, result, start)
+            return
+        if stream:
+            progress(_evidence(result))
+        ground_pool.submit(ground, idx, result, start)
+
+    with ThreadPoolExecutor(max_workers=max_search) as search_pool, \
+            ThreadPoolExecutor(max_workers=max_ground) as ground_pool:
+        remaining = 0
+        for idx, item in enumerate(claims):
+            if cache is not None and _cacheable(clients, references, dossier):
+                keys[idx] = _cache_key(item['claim'], item['source'], clients, references, dossier)
+                cached = cache.get(keys[idx])
+                if cached is not None:
+                    cached['cached'] = True
+                    yield idx, 'done', cached
+                    continue
+            search_pool.submit(search, idx)
+            remaining += 1
+
+        while remaining:
+            idx, stage, payload = events.get()
+            if stage == 'done':
+                remaining -= 1
+            yield idx, stage, payload
+
+
+def iter_fact_checks(claims: List[Dict], clients: Dict, cache: FactCheckCache = None,
+                     references: ReferenceIndex = None, dossier: ReferenceIndex = None,
+                     max_search: int = MAX_SEARCH_WORKERS,
+                     max_ground: int = MAX_GROUND_WORKERS) -> Iterator[Tuple[int, Dict]]:
+    """주장마다 검색 → 검증 파이프라인을 겹쳐 실행하고, 끝나는 순서대로 (인덱스, 결과) 반환"""
+    for idx, stage, result in iter_fact_check_events(claims, clients, cache, references, dossier, stream=False,
+                                                     max_search=max_search, max_ground=max_ground):
+        if stage == 'done':
+            yield idx, result
+
+
+def run_fact_checks(claims: List[Dict], clients: Dict, cache: FactCheckCache = None,
+                    references: ReferenceIndex = None, dossier: ReferenceIndex = None) -> List[Dict]:
+    """모든 주장을 동시에 팩트체크하고 주장 순서대로 결과 반환 (백그라운드 작업용)"""
+    results = [None] * len(claims)
+    for idx, result in iter_fact_checks(claims, clients, cache=cache, references=references, dossier=dossier):
+        results[idx] = result
+    return results
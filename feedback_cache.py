@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from fact_cache import DISK_EVICT_SLACK, normalize_text
+from sqlite_db import open_sqlite
+
+# 기본 설정 (환경 변수로 조정 가능)
+DEFAULT_SIMILARITY = float(os.environ.get("FEEDBACK_CACHE_SIMILARITY", 0.9))   # 재사용할 최소 유사도 (0~1)
+DEFAULT_MAX_ENTRIES = int(os.environ.get("FEEDBACK_CACHE_ENTRIES", 2000))
+DEFAULT_BYPASS_RATE = float(os.environ.get("FEEDBACK_CACHE_BYPASS", 0.2))       # 다양성을 위해 새로 생성할 확률
+DEFAULT_VARIANTS = int(os.environ.get("FEEDBACK_CACHE_VARIANTS", 3))            # 같은 글에 보관할 피드백 수
+# 여러 프로세스가 공유할 SQLite 경로 (비어 있으면 프로세스 메모리만 사용)
+DEFAULT_CACHE_PATH = os.environ.get("FEEDBACK_CACHE_PATH", "")
+DEFAULT_DISK_ENTRIES = int(os.environ.get("FEEDBACK_CACHE_DISK_ENTRIES", 20000))
+
+SIMHASH_BITS = 64
+NGRAM_SIZE = 3
+
+
+def _ngrams(text: str, n: int = NGRAM_SIZE):
+    compact = text.replace(' ', '')
+    if len(compact) <= n:
+        return [compact] if compact else []
+    return [compact[i:i + n] for i in range(len(compact) - n + 1)]
+
+
+def simhash(text: str) -> int:
+    """정규화된 텍스트의 글자 n-gram으로 만든 64비트 SimHash (비슷한 글일수록 비트 차이가 적음)"""
+    weights = [0] * SIMHASH_BITS
+    for gram in _ngrams(normalize_text(text)):
+        value = int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def similarity(a: int, b: int) -> float:
+    return 1.0 - bin(a ^ b).count('1') / SIMHASH_BITS
+
+
+def feedback_key(structure: Dict, position: str = None, topic: str = None, model: str = None) -> tuple:
+    """같은 피드백을 공유해도 되는 조건 (주제, 입장, 섹션, 근거 수, 생성 모델)"""
+    return (
+        normalize_text(topic or ''),
+        position or '',
+        structure.get('section_type', 'body'),
+        structure.get('evidence_count', 0),
+        model or ''
+    )
+
+
+class FeedbackCache:
+    """거의 같은 제출에 대한 코칭 피드백 캐시 (프로세스 내 LRU + 선택적 SQLite 공유 계층)
+
+    (주제, 입장, 섹션, 근거 수, 생성 모델)이 같은 항목 중 SimHash 유사도가 기준 이상인 글의 피드백을
+    재사용한다. 모델을 키에 넣어 빠른 경로의 짧은 피드백이 전체 모델 요청에 쓰이지 않게 한다. bypass_rate 확률로 캐시를 건너뛰고 새로 생성해 같은 글에 여러 피드백을 쌓고,
+    적중 시 그중 하나를 무작위로 돌려준다.
+    path를 주면 저장한 피드백을 SQLite에도 기록하고, 메모리에서 못 찾으면 같은 조건의 항목 중
+    아직 읽지 않은 행만 디스크에서 읽어 와 다른 프로세스(서비스 워커)가 만든 피드백도 재사용한다.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_SIMILARITY, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 bypass_rate: float = DEFAULT_BYPASS_RATE, max_variants: int = DEFAULT_VARIANTS, seed: int = None,
+                 path: str = DEFAULT_CACHE_PATH, max_disk_entries: int = DEFAULT_DISK_ENTRIES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.bypass_rate = bypass_rate
+        self.max_variants = max_variants
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+
+        self._entries = OrderedDict()  # (key, 지문) -> 피드백 목록
+        self._buckets = {}             # key -> 지문 목록
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._stats = {'hits': 0, 'misses': 0, 'bypassed': 0, 'stores': 0, 'evictions': 0, 'disk_loads': 0}
+
+        self._db = None
+        self._disk_seen = {}   # key -> 디스크에서 읽은 마지막 rowid
+        self._disk_rows = 0    # 디스크 행 수 (다른 프로세스의 기록은 정리할 때 다시 셈)
+        if path:
+            self._db = open_sqlite(path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS feedback_cache ("
+                " key TEXT NOT NULL,"
+                " fingerprint TEXT NOT NULL,"
+                " feedback TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (key, fingerprint, feedback))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_feedback_cache_created ON feedback_cache(created_at)")
+            self._db.commit()
+            self._disk_rows = self._db.execute("SELECT COUNT(*) FROM feedback_cache").fetchone()[0]
+
+    def _find(self, key: tuple, fingerprint: int) -> Optional[int]:
+        # similarity() >= threshold와 같은 조건을 비트 차이 수로 비교 (버킷 전체를 훑으므로 가볍게)
+        best, best_distance = None, (1.0 - self.threshold) * SIMHASH_BITS
+        for candidate in self._buckets.get(key, ()):
+            distance = (candidate ^ fingerprint).bit_count()
+            if distance <= best_distance:
+                best, best_distance = candidate, distance
+        return best
+
+    def _add(self, key: tuple, fingerprint: int, feedback: str, merge: bool = True) -> None:
+        """merge가 False면 지문이 정확히 같은 항목에만 합침 (디스크에서 한꺼번에 읽을 때)"""
+        if merge:
+            match = self._find(key, fingerprint)
+        else:
+            match = fingerprint if (key, fingerprint) in self._entries else None
+        if match is None:
+            self._entries[(key, fingerprint)] = [feedback]
+            self._buckets.setdefault(key, []).append(fingerprint)
+        else:
+            variants = self._entries[(key, match)]
+            if feedback not in variants:
+                variants.append(feedback)
+                del variants[:-self.max_variants]
+            self._entries.move_to_end((key, match))
+
+        while len(self._entries) > self.max_entries:
+            (old_key, old_fingerprint), _ = self._entries.popitem(last=False)
+            bucket = self._buckets[old_key]
+            bucket.remove(old_fingerprint)
+            if not bucket:
+                del self._buckets[old_key]
+            self._stats['evictions'] += 1
+
+    def _load_from_disk(self, key: tuple) -> None:
+        # 같은 조건(주제/입장/섹션/근거 수/모델)의 항목 중 지난번에 읽은 뒤 새로 생긴 행만 읽음
+        # 메모리에 다 들어가지 못할 오래된 행은 읽지 않음
+        seen = self._disk_seen.get(key, 0)
+        rows = self._db.execute(
+            "SELECT rowid, fingerprint, feedback FROM feedback_cache WHERE key = ? AND rowid > ?"
+            " ORDER BY rowid DESC LIMIT ?",
+            (json.dumps(key, ensure_ascii=False), seen, self.max_entries)
+        ).fetchall()
+        for rowid, fingerprint, feedback in reversed(rows):
+            self._add(key, int(fingerprint, 16), feedback, merge=False)
+        if rows:
+            self._disk_seen[key] = rows[0][0]
+        self._stats['disk_loads'] += 1
+
+    def get(self, text: str, structure: Dict, position: str = None, topic: str = None,
+            model: str = None) -> Optional[str]:
+        """비슷한 글의 피드백 (없거나 다양성을 위해 건너뛰면 None)"""
+        key = feedback_key(structure, position, topic, model)
+        fingerprint = simhash(text)
+        with self._lock:
+            if self._random.random() < self.bypass_rate:
+                self._stats['bypassed'] += 1
+                return None
+            match = self._find(key, fingerprint)
+            if match is None and self._db is not None:
+                self._load_from_disk(key)
+                match = self._find(key, fingerprint)
+            if match is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end((key, match))
+            self._stats['hits'] += 1
+            return self._random.choice(self._entries[(key, match)])
+
+    def set(self, text: str, structure: Dict, feedback: str, position: str = None, topic: str = None,
+            model: str = None) -> None:
+        """새로 생성한 피드백 저장 (비슷한 글이 이미 있으면 그 항목의 변형으로 추가)"""
+        key = feedback_key(structure, position, topic, model)
+        fingerprint = simhash(text)
+        with self._lock:
+            self._add(key, fingerprint, feedback)
+            self._stats['stores'] += 1
+            if self._db is not None:
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO feedback_cache (key, fingerprint, feedback, created_at) VALUES (?, ?, ?, ?)",
+                    (json.dumps(key, ensure_ascii=False), f"{fingerprint:016x}", feedback, time.time())
+                )
+                self._disk_rows += cursor.rowcount
+                if self._disk_rows > self.max_disk_entries:
+                    self._evict_disk()
+                self._db.commit()
+
+    def _evict_disk(self) -> None:
+        # 다른 프로세스가 쓴 행까지 다시 센 뒤, 한도보다 조금 더 지워 정리를 드물게 함
+        count = self._db.execute("SELECT COUNT(*) FROM feedback_cache").fetchone()[0]
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            overflow += int(self.max_disk_entries * DISK_EVICT_SLACK)
+            self._db.execute(
+                "DELETE FROM feedback_cache WHERE rowid IN "
+                "(SELECT rowid FROM feedback_cache ORDER BY created_at ASC LIMIT ?)", (overflow,)
+            )
+            count -= overflow
+        self._disk_rows = max(count, 0)
+
+    def stats(self) -> Dict:
+        """적중률과 절약한 API 호출 수"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses'] + stats['bypassed']
+        stats['lookups'] = lookups
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['calls_saved'] = stats['hits']
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self._disk_seen.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM feedback_cache")
+                self._db.commit()
+                self._disk_rows = 0
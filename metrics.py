@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict
+
+# 단계별로 보관할 최근 측정값 수 (백분위 계산용)
+METRICS_WINDOW = int(os.environ.get("METRICS_WINDOW", 1000))
+# Prometheus 텍스트 파일 경로 (비어 있으면 내보내지 않음)
+METRICS_PATH = os.environ.get("METRICS_PATH", "")
+METRICS_EXPORT_INTERVAL = float(os.environ.get("METRICS_EXPORT_INTERVAL", 15))
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _quantile(ordered: list, q: float) -> float:
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    """프로세스 전체가 공유하는 단계별 지연 시간과 토큰 사용량 기록"""
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._recent = {}   # 단계 -> 최근 측정값(초)
+        self._totals = {}   # 단계 -> [횟수, 합계]
+        self._tokens = {}   # (제공자, 모델) -> {'calls', 'prompt_tokens', 'completion_tokens'}
+        self._counters = {}  # (이름, 라벨 튜플) -> 횟수
+        self._last_export = 0.0
+
+    def observe(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            recent = self._recent.get(phase)
+            if recent is None:
+                recent = self._recent[phase] = deque(maxlen=self.window)
+                self._totals[phase] = [0, 0.0]
+            recent.append(seconds)
+            totals = self._totals[phase]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def record_usage(self, provider: str, model: str, usage) -> None:
+        """API 응답의 usage(객체 또는 dict)에서 토큰 수 기록"""
+        if usage is None:
+            return
+        if isinstance(usage, dict):
+            prompt = usage.get('prompt_tokens') or 0
+            completion = usage.get('completion_tokens') or 0
+        else:
+            prompt = getattr(usage, 'prompt_tokens', 0) or 0
+            completion = getattr(usage, 'completion_tokens', 0) or 0
+        with self._lock:
+            entry = self._tokens.setdefault((provider, model), {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0})
+            entry['calls'] += 1
+            entry['prompt_tokens'] += prompt
+            entry['completion_tokens'] += completion
+
+    def count(self, name: str, **labels) -> None:
+        """이름과 라벨별 사건 수 (라우팅 결정 등)"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def counters(self, name: str) -> Dict[tuple, int]:
+        """라벨 튜플 -> 횟수"""
+        with self._lock:
+            return {labels: n for (counter, labels), n in self._counters.items() if counter == name}
+
+    def quantile(self, phase: str, q: float, last: int = None):
+        """단계의 최근 last개(없으면 전체 구간) 측정값 백분위 (기록이 없으면 None)"""
+        with self._lock:
+            recent = self._recent.get(phase)
+            if not recent:
+                return None
+            values = list(recent)[-last:] if last else list(recent)
+        return _quantile(sorted(values), q)
+
+    def summary(self) -> Dict:
+        """단계별 횟수, 평균, 최근 구간 백분위"""
+        with self._lock:
+            snapshot = {phase: (sorted(values), tuple(self._totals[phase])) for phase, values in self._recent.items()}
+        result = {}
+        for phase, (ordered, (count, total)) in sorted(snapshot.items()):
+            result[phase] = {
+                'count': count,
+                'mean': total / count if count else 0.0,
+                'p50': _quantile(ordered, 0.5),
+                'p95': _quantile(ordered, 0.95),
+                'p99': _quantile(ordered, 0.99)
+            }
+        return result
+
+    def token_usage(self) -> Dict:
+        with self._lock:
+            return {key: dict(value) for key, value in self._tokens.items()}
+
+    def to_prometheus(self) -> str:
+        """Prometheus 텍스트 형식"""
+        lines = [
+            "# HELP debate_coach_phase_seconds Latency of each processing phase.",
+            "# TYPE debate_coach_phase_seconds summary"
+        ]
+        with self._lock:
+            snapshot = {phase: (sorted(values), tuple(self._totals[phase])) for phase, values in self._recent.items()}
+            tokens = {key: dict(value) for key, value in self._tokens.items()}
+            counters = dict(self._counters)
+        for phase, (ordered, (count, total)) in sorted(snapshot.items()):
+            label = f'phase="{_escape(phase)}"'
+            for q in QUANTILES:
+                lines.append(f'debate_coach_phase_seconds{{{label},quantile="{q}"}} {_quantile(ordered, q):.6f}')
+            lines.append(f'debate_coach_phase_seconds_sum{{{label}}} {total:.6f}')
+            lines.append(f'debate_coach_phase_seconds_count{{{label}}} {count}')
+
+        lines.append("# HELP debate_coach_api_calls_total API responses that reported token usage.")
+        lines.append("# TYPE debate_coach_api_calls_total counter")
+        for (provider, model), entry in sorted(tokens.items()):
+            lines.append(f'debate_coach_api_calls_total{{provider="{_escape(provider)}",model="{_escape(model)}"}} {entry["calls"]}')
+        lines.append("# HELP debate_coach_tokens_total Prompt and completion tokens reported by the APIs.")
+        lines.append("# TYPE debate_coach_tokens_total counter")
+        for (provider, model), entry in sorted(tokens.items()):
+            for kind in ('prompt', 'completion'):
+                lines.append(
+                    f'debate_coach_tokens_total{{provider="{_escape(provider)}",model="{_escape(model)}",kind="{kind}"}} '
+                    f'{entry[kind + "_tokens"]}'
+                )
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# HELP debate_coach_{name}_total Count of {name} events.")
+            lines.append(f"# TYPE debate_coach_{name}_total counter")
+            for (counter, labels), n in sorted(counters.items()):
+                if counter == name:
+                    label = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels)
+                    lines.append(f'debate_coach_{name}_total{{{label}}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str = None, force: bool = False) -> None:
+        """METRICS_PATH에 Prometheus 텍스트를 기록 (node_exporter textfile 수집기 호환, 주기 제한)"""
+        path = path or METRICS_PATH
+        if not path:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_export < METRICS_EXPORT_INTERVAL:
+                return
+            self._last_export = now
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._totals.clear()
+            self._tokens.clear()
+            self._counters.clear()
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def span(phase: str):
+    """with 블록의 실행 시간을 phase 이름으로 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(phase, time.perf_counter() - start)
+
+
+def observe(phase: str, seconds: float) -> None:
+    registry.observe(phase, seconds)
+
+
+def record_usage(provider: str, model: str, usage) -> None:
+    registry.record_usage(provider, model, usage)
+
+
+def count(name: str, **labels) -> None:
+    registry.count(name, **labels)
@@ -0,0 +1,342 @@
+"""교사가 올린 주제별 참고 자료의 BM25 색인
+
+자료(.txt/.md, PDF는 텍스트로 추출해서)를 문장 단위로 묶은 단락으로 나누고, 한국어 글자
+2-gram으로 BM25 역색인을 만들어 디스크에 저장한다. 검색할 때는 포스팅과 단락 본문을
+mmap으로 열어 필요한 부분만 읽는다.
+
+디렉터리 구조 (REFERENCE_DIR 아래 주제별):
+    <주제 키>/topic.txt          원래 주제 이름
+    <주제 키>/docs/              올린 자료 원본
+    <주제 키>/CURRENT            현재 색인 버전 디렉터리 이름
+    <주제 키>/.lock              자료와 색인을 바꾸는 동안 잡는 파일 잠금
+    <주제 키>/v<버전>/meta.json     단락 수, 평균 길이, 자료 이름과 원문 URL
+    <주제 키>/v<버전>/terms.json    용어 -> [포스팅 시작, 문서 빈도]
+    <주제 키>/v<버전>/postings.bin  (단락 번호, 빈도) uint32 쌍
+    <주제 키>/v<버전>/doclen.bin    단락별 용어 수 uint32
+    <주제 키>/v<버전>/passages.bin  단락 본문 UTF-8
+    <주제 키>/v<버전>/offsets.bin   단락 본문 위치 uint32 (단락 수 + 1)
+    <주제 키>/v<버전>/sources.bin   단락별 자료 번호 uint32
+
+교사용 CLI:
+    python reference_index.py add "학교 내 스마트폰 사용" 자료1.txt 자료2.md
+"""
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import uuid
+from array import array
+from collections import Counter
+from typing import Dict, List
+
+import segmenter
+from fact_cache import normalize_text
+
+REFERENCE_DIR = os.environ.get("REFERENCE_DIR", "references")
+REFERENCE_EXTENSIONS = ('.txt', '.md')
+PASSAGE_CHARS = 400    # 단락 하나의 목표 길이(문자)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r'[가-힣A-Za-z0-9]+')
+
+
+def topic_key(topic: str) -> str:
+    """주제 이름의 공백/대소문자 차이를 무시한 디렉터리 이름"""
+    return hashlib.sha1(normalize_text(topic).encode('utf-8')).hexdigest()[:16]
+
+
+def tokenize(text: str) -> List[str]:
+    """낱말마다 글자 2-gram (한 글자 낱말은 그대로)"""
+    tokens = []
+    for word in _WORD.findall(normalize_text(text)):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def split_passages(text: str, size: int = PASSAGE_CHARS) -> List[str]:
+    """문장 경계를 지키며 size 안팎의 단락으로 묶음"""
+    passages = []
+    current_start = current_end = None
+    for start, end in segmenter.sentence_spans(text):
+        if current_start is not None and end - current_start > size:
+            passages.append(text[current_start:current_end])
+            current_start = None
+        if current_start is None:
+            current_start = start
+        current_end = end
+    if current_start is not None:
+        passages.append(text[current_start:current_end])
+    return passages
+
+
+def version_time(version: str) -> float:
+    """버전 이름(v<만든 시각 ms>-<고유 값>)의 생성 시각(초)"""
+    return int(version[1:].split('-', 1)[0]) / 1000
+
+
+@contextlib.contextmanager
+def topic_lock(topic_dir: str):
+    """주제의 자료와 색인을 바꾸는 동안 잡는 파일 잠금 (프로세스와 스레드 사이에서 한 번에 하나만)"""
+    os.makedirs(topic_dir, exist_ok=True)
+    with open(os.path.join(topic_dir, '.lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_array(path: str, typecode: str, values) -> None:
+    with open(path, 'wb') as f:
+        array(typecode, values).tofile(f)
+
+
+# 색인 생성
+def build_index(topic_dir: str, urls: Dict[str, List[str]] = None) -> str:
+    """docs/의 모든 자료로 새 버전 색인을 만들고 CURRENT를 바꿈 (새 버전 디렉터리 이름 반환)
+
+    호출하는 쪽이 topic_lock(topic_dir)을 잡고 있어야 한다.
+    urls: 자료 이름 -> 원문 URL 목록 (있으면 검증 결과의 출처로 표시)
+    """
+    docs_dir = os.path.join(topic_dir, 'docs')
+    names = sorted(n for n in os.listdir(docs_dir) if n.lower().endswith(REFERENCE_EXTENSIONS)) \
+        if os.path.isdir(docs_dir) else []
+
+    passages, passage_sources = [], []
+    for source_id, name in enumerate(names):
+        with open(os.path.join(docs_dir, name), encoding='utf-8', errors='replace') as f:
+            for passage in split_passages(f.read()):
+                passages.append(passage)
+                passage_sources.append(source_id)
+
+    postings = {}  # 용어 -> [단락 번호, 빈도, ...]
+    doc_lengths = []
+    for passage_id, passage in enumerate(passages):
+        counts = Counter(tokenize(passage))
+        doc_lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            postings.setdefault(term, []).extend((passage_id, tf))
+
+    version = f"v{int(time.time() * 1000)}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    out_dir = os.path.join(topic_dir, version)
+    os.makedirs(out_dir)
+
+    terms = {}
+    flat = array('I')
+    for term in sorted(postings):
+        terms[term] = [len(flat) // 2, len(postings[term]) // 2]
+        flat.extend(postings[term])
+    with open(os.path.join(out_dir, 'postings.bin'), 'wb') as f:
+        flat.tofile(f)
+
+    encoded = [p.encode('utf-8') for p in passages]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    with open(os.path.join(out_dir, 'passages.bin'), 'wb') as f:
+        f.write(b''.join(encoded))
+    _write_array(os.path.join(out_dir, 'offsets.bin'), 'I', offsets)
+    _write_array(os.path.join(out_dir, 'doclen.bin'), 'I', doc_lengths)
+    _write_array(os.path.join(out_dir, 'sources.bin'), 'I', passage_sources)
+
+    with open(os.path.join(out_dir, 'terms.json'), 'w', encoding='utf-8') as f:
+        json.dump(terms, f, ensure_ascii=False, separators=(',', ':'))
+    with open(os.path.join(out_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'passages': len(passages),
+            'avgdl': sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0,
+            'sources': names,
+            'urls': {name: list(urls[name]) for name in names if urls and urls.get(name)}
+        }, f, ensure_ascii=False)
+
+    # 읽는 쪽이 항상 완성된 색인을 보도록 CURRENT를 마지막에 원자적으로 교체
+    previous = current_version(topic_dir)
+    pointer = os.path.join(topic_dir, 'CURRENT')
+    with open(pointer + '.tmp', 'w') as f:
+        f.write(version)
+    os.replace(pointer + '.tmp', pointer)
+
+    # 직전 버전보다 오래된 버전만 정리 (직전 버전은 다른 프로세스가 아직 읽고 있을 수 있음)
+    if previous is not None:
+        cutoff = version_time(previous)
+        for name in os.listdir(topic_dir):
+            if not name.startswith('v') or name in (version, previous):
+                continue
+            try:
+                old = version_time(name) < cutoff
+            except ValueError:
+                continue
+            if old:
+                shutil.rmtree(os.path.join(topic_dir, name), ignore_errors=True)
+    return version
+
+
+def add_documents(topic: str, files: Dict[str, bytes], root: str = REFERENCE_DIR) -> str:
+    """자료 원본을 주제 디렉터리에 저장하고 색인을 다시 만듦 (files: 파일 이름 -> 내용)"""
+    for name in files:
+        if not name.lower().endswith(REFERENCE_EXTENSIONS):
+            raise ValueError(f"지원하지 않는 파일 형식입니다: {os.path.basename(name)} (.txt/.md만 가능, PDF는 텍스트로 추출해 올려주세요)")
+    topic_dir = os.path.join(root, topic_key(topic))
+    docs_dir = os.path.join(topic_dir, 'docs')
+    with topic_lock(topic_dir):
+        os.makedirs(docs_dir, exist_ok=True)
+        with open(os.path.join(topic_dir, 'topic.txt'), 'w', encoding='utf-8') as f:
+            f.write(topic)
+        for name, data in files.items():
+            with open(os.path.join(docs_dir, os.path.basename(name)), 'wb') as f:
+                f.write(data)
+        return build_index(topic_dir)
+
+
+def current_version(topic_dir: str):
+    try:
+        with open(os.path.join(topic_dir, 'CURRENT')) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+# 색인 검색
+class ReferenceIndex:
+    """디스크 색인을 mmap으로 열어 BM25로 단락을 찾는다 (용어 사전만 메모리에 올림)"""
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self.version = os.path.basename(index_dir)
+        with open(os.path.join(index_dir, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(os.path.join(index_dir, 'terms.json'), encoding='utf-8') as f:
+            self._terms = json.load(f)
+        self.size = meta['passages']
+        self.avgdl = meta['avgdl'] or 1.0
+        self.sources = meta['sources']
+        self.urls = meta.get('urls', {})
+
+        self._files = []
+        self._postings = self._map('postings.bin')
+        self._passages = self._map('passages.bin', cast=False)
+        self._offsets = self._map('offsets.bin')
+        self._doclen = self._map('doclen.bin')
+        self._source_ids = self._map('sources.bin')
+
+    def _map(self, name: str, cast: bool = True):
+        f = open(os.path.join(self.index_dir, name), 'rb')
+        self._files.append(f)
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(b'').cast('I') if cast else b''
+        view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return view.cast('I') if cast else view
+
+    @classmethod
+    def open(cls, topic: str, root: str = REFERENCE_DIR):
+        """주제의 현재 색인 (자료가 없으면 None)"""
+        topic_dir = os.path.join(root, topic_key(topic))
+        version = current_version(topic_dir)
+        if version is None:
+            return None
+        index = cls(os.path.join(topic_dir, version))
+        return index if index.size else None
+
+    def passage(self, passage_id: int) -> Dict:
+        start, end = self._offsets[passage_id], self._offsets[passage_id + 1]
+        return {
+            'id': passage_id,
+            'text': bytes(self._passages[start:end]).decode('utf-8'),
+            'source': self.sources[self._source_ids[passage_id]]
+        }
+
+    def search(self, query: str, k: int = 3) -> List[Dict]:
+        """BM25 상위 k개 단락 (coverage: 질의 용어 중 단락에 있는 비율)"""
+        query_terms = set(tokenize(query))
+        scores = {}
+        matched = {}
+        for term in query_terms:
+            entry = self._terms.get(term)
+            if entry is None:
+                continue
+            start, df = entry
+            idf = max(0.0, math.log((self.size - df + 0.5) / (df + 0.5) + 1))
+            postings = self._postings[start * 2:(start + df) * 2]
+            for i in range(0, len(postings), 2):
+                passage_id, tf = postings[i], postings[i + 1]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doclen[passage_id] / self.avgdl)
+                scores[passage_id] = scores.get(passage_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+                matched[passage_id] = matched.get(passage_id, 0) + 1
+
+        results = []
+        for passage_id, score in heapq.nlargest(k, scores.items(), key=lambda item: item[1]):
+            passage = self.passage(passage_id)
+            passage['score'] = score
+            passage['coverage'] = matched[passage_id] / len(query_terms)
+            results.append(passage)
+        return results
+
+    def close(self) -> None:
+        for f in self._files:
+            f.close()
+
+
+_open_indexes = {}  # (주제 디렉터리, 버전) -> ReferenceIndex
+_open_lock = threading.Lock()
+
+
+def load_index(topic: str, root: str = REFERENCE_DIR):
+    """주제의 현재 색인을 프로세스 안에서 공유 (다른 프로세스가 다시 만들면 새 버전을 염)"""
+    if not topic:
+        return None
+    topic_dir = os.path.join(root, topic_key(topic))
+    version = current_version(topic_dir)
+    if version is None:
+        return None
+    with _open_lock:
+        key = (topic_dir, version)
+        if key not in _open_indexes:
+            for old_key in [k for k in _open_indexes if k[0] == topic_dir]:
+                _open_indexes.pop(old_key).close()
+            index = ReferenceIndex(os.path.join(topic_dir, version))
+            _open_indexes[key] = index if index.size else None
+        return _open_indexes[key]
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="주제별 참고 자료 색인")
+    sub = parser.add_subparsers(dest='command', required=True)
+    add = sub.add_parser('add', help="자료를 추가하고 색인을 다시 만듦")
+    add.add_argument('topic')
+    add.add_argument('files', nargs='+')
+    search = sub.add_parser('search', help="색인에서 단락 검색")
+    search.add_argument('topic')
+    search.add_argument('query')
+    args = parser.parse_args(argv)
+
+    if args.command == 'add':
+        files = {}
+        for path in args.files:
+            with open(path, 'rb') as f:
+                files[os.path.basename(path)] = f.read()
+        version = add_documents(args.topic, files)
+        print(f"색인 완료: {args.topic} ({version})", file=sys.stderr)
+    else:
+        index = ReferenceIndex.open(args.topic)
+        if index is None:
+            sys.exit(f"'{args.topic}' 주제의 자료가 없습니다.")
+        for passage in index.search(args.query):
+            print(f"[{passage['score']:.2f} / {passage['coverage']:.0%}] {passage['source']}: {passage['text'][:120]}")
+
+
+if __name__ == "__main__":
+    main()
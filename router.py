@@ -0,0 +1,154 @@
+"""코칭 요청 모델 라우팅
+
+제출마다 섹션, 근거 수, 글 길이, 제공자의 최근 지연을 보고 세 가지 중 하나를 고른다.
+  - template : 짧은 서론/결론처럼 섹션별 템플릿으로 충분한 경우 (API 호출 없음)
+  - fast     : 간단한 단락이거나 큰 모델이 느린 경우 (coaching.COACHING_FAST_MODEL)
+  - full     : 근거가 여럿이거나 긴 본론 (coaching.COACHING_MODEL)
+
+결정은 route 지표(Prometheus)로 세고, ROUTER_LOG_PATH가 있으면 응답 시간과 함께 JSONL로 남긴다.
+기록 요약 (경로별 비율, 응답 시간, 큰 모델만 썼을 때 대비 예상 비용):
+    python router.py .cache/routing.jsonl
+"""
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List
+
+import metrics
+
+# 라우팅 기준 (환경 변수로 조정 가능)
+ROUTER_ENABLED = os.environ.get("ROUTER_ENABLED", "1") != "0"                   # 0이면 항상 큰 모델
+ROUTER_TEMPLATE_MAX_CHARS = int(os.environ.get("ROUTER_TEMPLATE_MAX_CHARS", 60))  # 이하인 서론/결론은 템플릿만
+ROUTER_FAST_MAX_CHARS = int(os.environ.get("ROUTER_FAST_MAX_CHARS", 150))        # 이하인 본론은 빠른 모델
+ROUTER_FAST_MAX_EVIDENCE = int(os.environ.get("ROUTER_FAST_MAX_EVIDENCE", 1))    # 빠른 모델로 보낼 본론의 최대 근거 수
+ROUTER_LATENCY_BUDGET = float(os.environ.get("ROUTER_LATENCY_BUDGET", 3.0))      # 큰 모델 최근 지연 중앙값이 넘으면 빠른 모델(초)
+ROUTER_LATENCY_WINDOW = 20     # 제공자 지연을 판단할 최근 호출 수
+ROUTER_PROBE_EVERY = 10        # 큰 모델이 느려 우회하는 동안에도 이 횟수마다 한 번은 큰 모델로 보내 지연을 다시 잼
+ROUTER_LOG_PATH = os.environ.get("ROUTER_LOG_PATH", "")
+# 호출 한 번의 상대 비용 (가장 비싼 모델 기준, 요약 때 절약 추정에 사용)
+ROUTER_MODEL_COSTS = os.environ.get("ROUTER_MODEL_COSTS", "solar-pro2=1.0,solar-mini=0.2")
+
+ROUTES = ('template', 'fast', 'full')
+
+_log_lock = threading.Lock()
+_slow_decisions = itertools.count(1)
+
+
+def parse_costs(spec: str) -> Dict[str, float]:
+    costs = {}
+    for item in (spec or '').split(','):
+        if '=' in item:
+            name, value = item.split('=', 1)
+            costs[name.strip()] = float(value)
+    return costs
+
+
+def provider_latency(model: str, last: int = ROUTER_LATENCY_WINDOW):
+    """이 프로세스에서 잰 모델의 최근 응답 지연 중앙값 (기록이 없으면 None)
+
+    스케줄러 대기와 재시도 백오프는 빼고 제공자 호출 자체만 본다. 대기가 길어진 것은 빠른 모델도
+    같은 upstage 한도를 쓰므로 모델을 바꿔도 줄지 않는다.
+    """
+    return metrics.registry.quantile(f"api.upstage.{model}.provider", 0.5, last=last)
+
+
+# 라우팅 결정
+def route_coaching(text: str, structure: Dict, full_model: str, fast_model: str) -> Dict:
+    """제출 하나의 코칭 경로 결정 (route, model, reason과 판단에 쓴 값)"""
+    section = structure.get('section_type', 'body')
+    evidence = structure.get('evidence_count', 0)
+    chars = len(text.strip())
+    latency = provider_latency(full_model)
+    decision = {'section': section, 'evidence': evidence, 'chars': chars,
+                'latency': round(latency, 3) if latency is not None else None}
+
+    def choose(route: str, reason: str) -> Dict:
+        model = {'template': None, 'fast': fast_model, 'full': full_model}[route]
+        decision.update(route=route, model=model, reason=reason)
+        metrics.count("route", route=route, reason=reason)
+        return decision
+
+    if not ROUTER_ENABLED:
+        return choose('full', 'disabled')
+    if section != 'body' and chars <= ROUTER_TEMPLATE_MAX_CHARS:
+        return choose('template', f'short_{section}')
+    if latency is not None and latency > ROUTER_LATENCY_BUDGET:
+        # 빠른 모델도 느리다면 바꿔도 이득이 없음
+        fast_latency = provider_latency(fast_model)
+        if fast_latency is None or fast_latency < latency:
+            if next(_slow_decisions) % ROUTER_PROBE_EVERY:
+                return choose('fast', 'slow_provider')
+            return choose('full', 'probe')
+    if section != 'body':
+        return choose('fast', section)
+    if chars <= ROUTER_FAST_MAX_CHARS and evidence <= ROUTER_FAST_MAX_EVIDENCE:
+        return choose('fast', 'simple_body')
+    return choose('full', 'complex_body')
+
+
+def log_decision(decision: Dict, elapsed: float, outcome: str = 'ok', path: str = None) -> None:
+    """결정과 실제 응답 시간을 ROUTER_LOG_PATH에 JSONL로 덧붙임 (경로가 없으면 지표만 남김)"""
+    metrics.observe(f"coaching.route.{decision['route']}", elapsed)
+    path = path if path is not None else ROUTER_LOG_PATH
+    if not path:
+        return
+    record = dict(decision, elapsed=round(elapsed, 3), outcome=outcome, at=round(time.time(), 3))
+    directory = os.path.dirname(path)
+    with _log_lock:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+# 기록 요약
+def summarize(records: List[Dict], costs: Dict[str, float] = None) -> Dict:
+    """경로별 횟수/비율/응답 시간과, 모두 가장 비싼 모델로 보냈을 때 대비 예상 비용"""
+    costs = costs if costs is not None else parse_costs(ROUTER_MODEL_COSTS)
+    routes = {}
+    spent = 0.0
+    for record in records:
+        entry = routes.setdefault(record['route'], {'count': 0, 'elapsed': []})
+        entry['count'] += 1
+        entry['elapsed'].append(record['elapsed'])
+        if record.get('model') and record.get('outcome') != 'cached':
+            spent += costs.get(record['model'], 1.0)
+
+    total = len(records)
+    summary = {'total': total, 'routes': {}}
+    for route, entry in routes.items():
+        ordered = sorted(entry['elapsed'])
+        summary['routes'][route] = {
+            'count': entry['count'],
+            'share': entry['count'] / total,
+            'p50': metrics._quantile(ordered, 0.5),
+            'p95': metrics._quantile(ordered, 0.95)
+        }
+    baseline = total * max(costs.values(), default=1.0)
+    summary['relative_cost'] = spent / baseline if baseline else 0.0
+    return summary
+
+
+def main(argv: List[str] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else ROUTER_LOG_PATH
+    if not path:
+        print("사용법: python router.py <routing.jsonl>", file=sys.stderr)
+        sys.exit(1)
+    with open(path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    summary = summarize(records)
+    print(f"전체 {summary['total']}건")
+    for route in ROUTES:
+        entry = summary['routes'].get(route)
+        if entry:
+            print(f"  {route:<9} {entry['count']:>6}건 ({entry['share']:.0%})  "
+                  f"응답 p50 {entry['p50']:.2f}초 · p95 {entry['p95']:.2f}초")
+    print(f"예상 비용: 모두 큰 모델로 보냈을 때의 {summary['relative_cost']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
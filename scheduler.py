@@ -0,0 +1,181 @@
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+# 요청 우선순위 (작을수록 먼저)
+PRIORITIES = {'coaching': 0, 'normal': 1, 'fact_check': 2, 'prefetch': 3}
+
+# 분당 요청 한도 ("이름=분당횟수"를 쉼표로 구분, 0이면 제한 없음)
+DEFAULT_PROVIDER_RPM = "upstage=100,perplexity=50"
+DEFAULT_MODEL_RPM = ""
+# 제공자별 대기열 최대 길이 (넘으면 바로 거절)
+SCHEDULER_MAX_QUEUE = int(os.environ.get("SCHEDULER_MAX_QUEUE", 200))
+
+
+class SchedulerBusyError(Exception):
+    """대기열이 가득 찼거나 데드라인 안에 차례가 오지 않은 경우"""
+
+
+def parse_rpm(spec: str) -> Dict[str, float]:
+    limits = {}
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        name, value = item.split('=', 1)
+        if float(value) > 0:
+            limits[name.strip()] = float(value)
+    return limits
+
+
+# 토큰 버킷
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 버킷 (잠금은 Scheduler가 담당)"""
+
+    def __init__(self, rate_per_minute: float, burst: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, rate_per_minute / 10.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """토큰 하나가 생길 때까지 남은 시간 (지금 있으면 0)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class _Ticket:
+    __slots__ = ('priority', 'seq', 'provider', 'model')
+
+    def __init__(self, priority: int, seq: int, provider: str, model: str):
+        self.priority = priority
+        self.seq = seq
+        self.provider = provider
+        self.model = model
+
+    def key(self):
+        return (self.priority, self.seq)
+
+
+# 프로세스 전체 공유 스케줄러
+class Scheduler:
+    """제공자/모델별 토큰 버킷과 우선순위 대기열로 API 호출 순서를 정한다
+
+    모든 세션의 API 호출이 같은 스케줄러를 거치므로 한 학급이 동시에 제출해도
+    제공자 한도 안에서 코칭 요청부터 차례로 처리되고, 대기열이 넘치면 바로 거절한다.
+    """
+
+    def __init__(self, provider_rpm: Dict[str, float] = None, model_rpm: Dict[str, float] = None,
+                 max_queue: int = SCHEDULER_MAX_QUEUE):
+        self._buckets = {name: TokenBucket(rpm) for name, rpm in (provider_rpm or {}).items()}
+        self._model_buckets = {name: TokenBucket(rpm) for name, rpm in (model_rpm or {}).items()}
+        self.max_queue = max_queue
+        self._queues = {}  # 제공자 -> 대기 중인 티켓 목록
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._local = threading.local()
+        self.stats = {'granted': 0, 'rejected': 0, 'timed_out': 0, 'max_wait': 0.0}
+
+    @classmethod
+    def from_env(cls) -> 'Scheduler':
+        return cls(
+            provider_rpm=parse_rpm(os.environ.get("PROVIDER_RPM", DEFAULT_PROVIDER_RPM)),
+            model_rpm=parse_rpm(os.environ.get("MODEL_RPM", DEFAULT_MODEL_RPM))
+        )
+
+    def _buckets_for(self, ticket: _Ticket):
+        return [b for b in (self._buckets.get(ticket.provider), self._model_buckets.get(ticket.model)) if b]
+
+    def _position(self, ticket: _Ticket) -> int:
+        """같은 제공자 대기열에서 내 앞에 있는 요청 수"""
+        key = ticket.key()
+        return sum(1 for other in self._queues.get(ticket.provider, []) if other.key() < key)
+
+    def _next_ready(self, provider: str, now: float):
+        """토큰이 있는 요청 중 우선순위가 가장 높은 것과, 없으면 다음 토큰까지 남은 시간"""
+        best = None
+        wait = None
+        for ticket in self._queues[provider]:
+            ticket_wait = max([b.wait_time(now) for b in self._buckets_for(ticket)] or [0.0])
+            if ticket_wait == 0:
+                if best is None or ticket.key() < best.key():
+                    best = ticket
+            elif wait is None or ticket_wait < wait:
+                wait = ticket_wait
+        return best, wait
+
+    def acquire(self, provider: str, model: str, priority: str = 'normal', timeout: float = None) -> float:
+        """차례가 올 때까지 기다린 뒤 토큰을 가져간다 (기다린 시간 반환)"""
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        on_wait = getattr(self._local, 'on_wait', None)
+        last_position = None
+
+        with self._cond:
+            queue = self._queues.setdefault(provider, [])
+            if len(queue) >= self.max_queue:
+                self.stats['rejected'] += 1
+                raise SchedulerBusyError(f"{provider} 요청이 많아 대기열이 가득 찼습니다.")
+            ticket = _Ticket(PRIORITIES.get(priority, PRIORITIES['normal']), next(self._seq), provider, model)
+            queue.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    best, wait = self._next_ready(provider, now)
+                    if best is ticket:
+                        for bucket in self._buckets_for(ticket):
+                            bucket.take()
+                        break
+                    if deadline is not None and now >= deadline:
+                        self.stats['timed_out'] += 1
+                        raise SchedulerBusyError(f"{provider} 요청 대기 시간이 초과되었습니다.")
+                    if on_wait is not None:
+                        position = self._position(ticket)
+                        if position != last_position:
+                            last_position = position
+                            # 화면 갱신 같은 느린 콜백이 모든 제공자의 대기열을 막지 않도록 잠금을 풀고 호출
+                            self._cond.release()
+                            try:
+                                on_wait(position)
+                            finally:
+                                self._cond.acquire()
+                            continue
+                    # 다른 요청이 토큰을 가져갔거나 토큰이 다시 채워질 때까지 대기
+                    timeouts = [t for t in (wait, deadline - now if deadline else None) if t is not None]
+                    self._cond.wait(min(timeouts + [0.5]))
+            finally:
+                queue.remove(ticket)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            self.stats['granted'] += 1
+            self.stats['max_wait'] = max(self.stats['max_wait'], waited)
+            return waited
+
+    def queue_lengths(self) -> Dict[str, int]:
+        with self._cond:
+            return {provider: len(queue) for provider, queue in self._queues.items()}
+
+    @contextmanager
+    def report_position(self, callback: Callable[[int], None]):
+        """이 스레드에서 대기하는 동안 대기 순번이 바뀔 때마다 callback(앞선 요청 수) 호출"""
+        previous = getattr(self._local, 'on_wait', None)
+        self._local.on_wait = callback
+        try:
+            yield
+        finally:
+            self._local.on_wait = previous
+
+
+scheduler = Scheduler.from_env()
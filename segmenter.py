@@ -0,0 +1,82 @@
+import bisect
+import re
+from typing import List, Optional, Tuple
+
+# 문장 경계 후보를 한 번의 정규식 순회로 찾는다 (입력 길이에 선형)
+#   url  : URL 안의 마침표는 경계가 아님
+#   punct: 마침표/물음표/느낌표 묶음과 뒤따르는 닫는 따옴표·괄호
+#   nl   : 줄바꿈
+#   ending: 마침표 없이 끝나는 평서/의문 어미 ('~합니다 다음 문장', '~합니까 다음 문장')
+#           '니까'는 받침 ㅂ 뒤('습니까', '합니까')만 보므로 '그러니까' 같은 접속어는 나누지 않는다
+#   맨 앞의 전방 탐색은 후보가 될 수 없는 글자를 문자 클래스 한 번으로 건너뛰게 한다
+_B_FINAL = ''.join(chr(0xAC00 + i * 28 + 17) for i in range(399))   # 받침이 ㅂ인 음절
+_BOUNDARY = re.compile(
+    r'(?=[h.!?。…\n니어아해에예죠했한된있없같였])'
+    r'(?:(?P<url>https?://\S+)'
+    r'|(?P<punct>[.!?。…]+["\'”’)\]]*)'
+    r'|(?P<nl>\n)'
+    r'|(?P<ending>(?:니다|(?<=[' + _B_FINAL + r'])니까|[어아해에예죠]요|[했한된있없같였]다)(?=[ \t]+[^\s.!?])))'
+)
+
+# 줄임표('...', '…') 앞이 문장을 끝내는 어미일 때만 줄임표를 문장 끝으로 봄
+_ELLIPSIS = re.compile(r'(?:\.{2,}|…)[.…]*["\'”’)\]]*')
+_FINAL_BEFORE = re.compile(r'(?:다|요|죠|까)$')
+
+# 문장 앞 번호 ('1.', '12.')
+_NUMBERING = re.compile(r'\s*\d{1,2}$')
+
+
+def sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """문장별 (시작, 끝) 위치 목록 (앞뒤 공백 제외, 입력 길이에 선형)
+
+    소수점('3.5%'), URL, 문장 앞 번호('1.'), 어미 없이 이어지는 줄임표('그런데...')를 문장 끝으로
+    보지 않고, 마침표 없이 '~니다', '~요' 같은 어미로 끝나는 문장도 나눈다.
+    """
+    spans = []
+    start = 0
+    for m in _BOUNDARY.finditer(text):
+        kind = m.lastgroup
+        if kind == 'url':
+            continue
+        end = m.end()
+        if kind == 'punct':
+            # '그런데... 다음'처럼 문장 중간의 줄임표
+            if _ELLIPSIS.fullmatch(m.group()) and not _FINAL_BEFORE.search(text, max(start, m.start() - 1), m.start()):
+                continue
+            # 소수점/버전 번호처럼 바로 뒤에 숫자나 글자가 붙으면 경계가 아님
+            if end < len(text) and not text[end].isspace() and text[m.start()] == '.':
+                continue
+            # 문장 맨 앞의 '1.' 같은 번호
+            if m.group() == '.' and _NUMBERING.fullmatch(text, start, m.start()):
+                continue
+        _append_span(text, start, end, spans)
+        start = end
+    _append_span(text, start, len(text), spans)
+    return spans
+
+
+def _append_span(text: str, start: int, end: int, spans: list) -> None:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    if end > start:
+        spans.append((start, end))
+
+
+def sentences(text: str) -> List[str]:
+    return [text[s:e] for s, e in sentence_spans(text)]
+
+
+def count_sentences(text: str) -> int:
+    return len(sentence_spans(text))
+
+
+def sentence_at(spans: List[Tuple[int, int]], offset: int) -> Optional[Tuple[int, int]]:
+    """offset이 속한 문장 구간 (문장 사이 공백이면 다음 문장, 없으면 None)"""
+    i = bisect.bisect_right(spans, (offset, float('inf'))) - 1
+    if i >= 0 and spans[i][0] <= offset < spans[i][1]:
+        return spans[i]
+    if i + 1 < len(spans):
+        return spans[i + 1]
+    return None
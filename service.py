@@ -0,0 +1,230 @@
+"""논증 분석/코칭/팩트체크 HTTP 서비스
+
+Streamlit 앱과 같은 핵심 모듈(analyzer, coaching, fact_check)을 JSON API로 제공해 LMS 플러그인
+같은 다른 클라이언트가 얇은 호출자로 붙을 수 있게 한다.
+
+  POST /analyze     {"text": ...} 또는 {"texts": [...]}           -> 논증 구조
+  POST /coach       {"text", "topic", "position", "context", "slo", "class_id", "new_session"}
+                                                                  -> 코칭 피드백
+  POST /fact-check  {"text": ...} 또는 {"claims": [{"source", "claim"}]}, "topic", "class_id"
+                                                                  -> 주장별 팩트체크 결과
+  GET  /healthz, GET /metrics (Prometheus 텍스트)
+
+요청 처리는 비동기이고, 동기 코어 호출은 워커 프로세스마다 크기가 제한된 스레드 풀에서 돈다.
+처리량은 워커 프로세스 수(--workers)로 늘린다. 워커끼리 공유하는 상태는 SERVICE_STATE로 고른다.
+  - sqlite : 팩트체크 캐시, 코칭 피드백 캐시, 학급 집계를 SQLite(WAL) 파일로 모든 워커가 공유 (기본)
+  - memory : 워커 프로세스마다 따로 (개발/테스트용)
+분당 요청 한도(스케줄러)는 워커마다 따로 적용되므로 워커 수에 맞춰 UPSTAGE/PERPLEXITY 한도를 나눠 준다.
+
+실행:
+    python service.py --workers 4 --port 8000
+"""
+import argparse
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict
+
+import anyio.to_thread
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+import analyzer
+import metrics
+from api_clients import create_clients, warm_up
+from class_stats import create_class_stats
+from coaching import CoachingReply
+from dossier import load_dossier
+from fact_cache import FactCheckCache
+from fact_check import extract_claims, run_fact_checks
+from feedback_cache import FeedbackCache
+from reference_index import load_index
+
+# 기본 설정 (환경 변수로 조정 가능)
+SERVICE_STATE = os.environ.get("SERVICE_STATE", "sqlite")        # sqlite | memory
+SERVICE_THREADS = int(os.environ.get("SERVICE_THREADS", 40))     # 워커 하나가 동시에 처리할 코어 호출 수
+SERVICE_FEEDBACK_CACHE_PATH = os.environ.get("SERVICE_FEEDBACK_CACHE_PATH",
+                                             os.path.join(".cache", "feedback.sqlite3"))
+MAX_BATCH_TEXTS = 256   # /analyze 한 번에 받을 최대 글 수
+
+_state = {}
+
+
+class BadRequest(Exception):
+    """요청 본문이 올바르지 않음 (400)"""
+
+
+# 워커 프로세스별 공유 자원
+def create_state(kind: str = SERVICE_STATE) -> Dict:
+    """SERVICE_STATE에 맞는 클라이언트/캐시/집계 저장소 생성"""
+    if kind == 'memory':
+        fact_cache = FactCheckCache(':memory:')
+        feedback_cache = FeedbackCache(path='')
+    elif kind == 'sqlite':
+        fact_cache = FactCheckCache()
+        feedback_cache = FeedbackCache(path=SERVICE_FEEDBACK_CACHE_PATH)
+    else:
+        raise ValueError(f"알 수 없는 SERVICE_STATE: {kind}")
+    return {
+        'clients': create_clients(),
+        'fact_cache': fact_cache,
+        'feedback_cache': feedback_cache,
+        'class_stats': create_class_stats(kind)
+    }
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = SERVICE_THREADS
+    _state.update(create_state())
+    warm_up(_state['clients'])
+    yield
+
+
+# 요청 본문 읽기
+async def read_body(request: Request) -> Dict:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise BadRequest("본문이 올바른 JSON이 아닙니다.")
+    if not isinstance(body, dict):
+        raise BadRequest("본문은 JSON 객체여야 합니다.")
+    return body
+
+
+def require_text(body: Dict, field: str = 'text') -> str:
+    text = body.get(field)
+    if not isinstance(text, str) or not text.strip():
+        raise BadRequest(f"'{field}' 필드(문자열)가 필요합니다.")
+    return text.strip()
+
+
+async def handle_errors(request: Request, exc: BadRequest) -> JSONResponse:
+    return JSONResponse({'error': str(exc)}, status_code=400)
+
+
+# 논증 구조 분석
+async def analyze_endpoint(request: Request) -> JSONResponse:
+    body = await read_body(request)
+    if 'texts' in body:
+        texts = body['texts']
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            raise BadRequest("'texts' 필드는 문자열 목록이어야 합니다.")
+        if len(texts) > MAX_BATCH_TEXTS:
+            raise BadRequest(f"한 번에 최대 {MAX_BATCH_TEXTS}개까지 분석할 수 있습니다.")
+        structures = await run_in_threadpool(analyzer.analyze_batch, texts)
+        return JSONResponse({'structures': structures})
+    text = require_text(body)
+    return JSONResponse({'structure': await run_in_threadpool(analyzer.analyze, text)})
+
+
+# 코칭 피드백
+def coach(text: str, topic: str = None, position: str = None, context: str = None, slo: float = 0,
+          class_id: str = None, new_session: bool = False) -> Dict:
+    """분석 후 코칭 피드백 생성 (slo초가 지나면 섹션별 템플릿을 provisional로 반환)"""
+    start = time.perf_counter()
+    with metrics.span("service.analyze"):
+        structure = analyzer.analyze(text)
+    if class_id:
+        _state['class_stats'].record_submission(class_id, topic or '', structure, new_session=new_session)
+
+    # 늦게 온 응답도 캐시에 저장되므로 같은 글을 다시 보내면 LLM 피드백을 받음
+    reply = CoachingReply(text, structure, _state['clients'], position, topic,
+                          cache=_state['feedback_cache'], context=context, slo=slo)
+    feedback = reply.wait()
+    elapsed = time.perf_counter() - start
+    metrics.observe("service.coach", elapsed)
+    return {
+        'feedback': feedback,
+        'structure': structure,
+        'provisional': reply.provisional,
+        'cached': reply.cached,
+        'fell_back': reply.fell_back,
+        'route': reply.route,
+        'elapsed': round(elapsed, 3)
+    }
+
+
+async def coach_endpoint(request: Request) -> JSONResponse:
+    body = await read_body(request)
+    text = require_text(body)
+    try:
+        slo = float(body.get('slo') or 0)
+    except (TypeError, ValueError):
+        raise BadRequest("'slo' 필드는 숫자(초)여야 합니다.")
+    result = await run_in_threadpool(
+        coach, text, body.get('topic'), body.get('position'), body.get('context'), slo,
+        body.get('class_id'), bool(body.get('new_session'))
+    )
+    return JSONResponse(result)
+
+
+# 팩트체크
+def fact_check(claims, topic: str = None, class_id: str = None) -> Dict:
+    """주장들을 교사 참고 자료, 주제 자료집, 웹 검색 순으로 근거를 찾아 검증"""
+    start = time.perf_counter()
+    results = run_fact_checks(claims, _state['clients'], _state['fact_cache'],
+                              load_index(topic) if topic else None, load_dossier(topic) if topic else None)
+    if class_id:
+        _state['class_stats'].record_fact_checks(class_id, topic or '', results)
+    elapsed = time.perf_counter() - start
+    metrics.observe("service.fact_check", elapsed)
+    return {
+        'claims': [{'source': item['source'], 'claim': item['claim'], 'result': result}
+                   for item, result in zip(claims, results)],
+        'elapsed': round(elapsed, 3)
+    }
+
+
+async def fact_check_endpoint(request: Request) -> JSONResponse:
+    body = await read_body(request)
+    if 'claims' in body:
+        claims = body['claims']
+        if not isinstance(claims, list) or not all(
+                isinstance(c, dict) and isinstance(c.get('claim'), str) for c in claims):
+            raise BadRequest("'claims' 필드는 {\"source\", \"claim\"} 객체 목록이어야 합니다.")
+        claims = [{'source': c.get('source') or '', 'claim': c['claim']} for c in claims]
+    else:
+        claims = extract_claims(require_text(body))
+    result = await run_in_threadpool(fact_check, claims, body.get('topic'), body.get('class_id'))
+    return JSONResponse(result)
+
+
+# 상태 확인 / 지표
+async def healthz(request: Request) -> JSONResponse:
+    return JSONResponse({'status': 'ok', 'pid': os.getpid(), 'providers': sorted(_state.get('clients', {}))})
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(metrics.registry.to_prometheus(), media_type='text/plain; version=0.0.4')
+
+
+app = Starlette(
+    routes=[
+        Route('/analyze', analyze_endpoint, methods=['POST']),
+        Route('/coach', coach_endpoint, methods=['POST']),
+        Route('/fact-check', fact_check_endpoint, methods=['POST']),
+        Route('/healthz', healthz, methods=['GET']),
+        Route('/metrics', metrics_endpoint, methods=['GET']),
+    ],
+    exception_handlers={BadRequest: handle_errors},
+    lifespan=lifespan
+)
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="논증 분석/코칭/팩트체크 HTTP 서비스")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="워커 프로세스 수")
+    args = parser.parse_args(argv)
+    uvicorn.run("service:app", host=args.host, port=args.port, workers=args.workers, log_level='warning')
+
+
+if __name__ == "__main__":
+    main()
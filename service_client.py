@@ -0,0 +1,52 @@
+"""service.py HTTP 서비스를 부르는 얇은 클라이언트 (LMS 플러그인, 다른 프런트엔드용)
+
+    client = ServiceClient("http://127.0.0.1:8000")
+    client.coach("저는 찬성합니다.", topic="학교 내 스마트폰 사용", position="찬성")
+"""
+import os
+from typing import Dict, List
+
+import httpx
+
+SERVICE_URL = os.environ.get("SERVICE_URL", "http://127.0.0.1:8000")
+SERVICE_TIMEOUT = float(os.environ.get("SERVICE_TIMEOUT", 60))   # 요청 한 번의 최대 시간(초)
+
+
+class ServiceError(Exception):
+    """서비스가 오류 응답을 돌려준 경우"""
+
+
+class ServiceClient:
+    """/analyze, /coach, /fact-check 호출 (keep-alive 연결 재사용)"""
+
+    def __init__(self, base_url: str = SERVICE_URL, timeout: float = SERVICE_TIMEOUT, http_client=None):
+        self.base_url = base_url.rstrip('/')
+        self._http = http_client or httpx.Client(timeout=timeout)
+
+    def _post(self, path: str, body: Dict) -> Dict:
+        response = self._http.post(f"{self.base_url}{path}", json={k: v for k, v in body.items() if v is not None})
+        payload = response.json()
+        if response.status_code >= 400:
+            raise ServiceError(payload.get('error') or f"HTTP {response.status_code}")
+        return payload
+
+    def analyze(self, text: str) -> Dict:
+        return self._post('/analyze', {'text': text})['structure']
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        return self._post('/analyze', {'texts': texts})['structures']
+
+    def coach(self, text: str, topic: str = None, position: str = None, context: str = None, slo: float = None,
+              class_id: str = None, new_session: bool = None) -> Dict:
+        """피드백과 구조 분석 결과 (provisional이면 slo 안에 LLM 응답이 오지 않아 템플릿을 받은 것)"""
+        return self._post('/coach', {'text': text, 'topic': topic, 'position': position, 'context': context,
+                                     'slo': slo, 'class_id': class_id, 'new_session': new_session})
+
+    def fact_check(self, text: str = None, claims: List[Dict] = None, topic: str = None,
+                   class_id: str = None) -> List[Dict]:
+        """글(출처 표지로 주장 추출) 또는 {"source", "claim"} 목록을 검증하고 주장별 결과 반환"""
+        return self._post('/fact-check', {'text': text, 'claims': claims, 'topic': topic,
+                                          'class_id': class_id})['claims']
+
+    def close(self) -> None:
+        self._http.close()
@@ -0,0 +1,172 @@
+import abc
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlite_db import open_sqlite
+
+# 기본 설정 (환경 변수로 조정 가능)
+SESSION_STORE = os.environ.get("SESSION_STORE", "sqlite")   # sqlite | memory
+SESSION_DB_PATH = os.environ.get("SESSION_DB_PATH", os.path.join(".cache", "sessions.sqlite3"))
+
+
+class SessionStore(abc.ABC):
+    """대화 기록 저장소 인터페이스
+
+    세션마다 종류('message', 'fact_check' 등)별로 항목을 순서대로 덧붙인다. 덧붙인 항목은
+    늦게 도착한 코칭 응답으로 임시 피드백을 바꿀 때만 순번으로 교체한다.
+    앱은 최근 항목만 메모리에 두고 이전 항목은 필요할 때 범위로 읽는다.
+    """
+
+    @abc.abstractmethod
+    def append(self, session_id: str, kind: str, item: Dict) -> int:
+        """항목을 덧붙이고 순번(0부터) 반환"""
+
+    @abc.abstractmethod
+    def replace(self, session_id: str, kind: str, seq: int, item: Dict) -> None:
+        """순번 seq의 항목을 바꿈 (없으면 무시)"""
+
+    @abc.abstractmethod
+    def count(self, session_id: str, kind: str) -> int:
+        """세션의 해당 종류 항목 수"""
+
+    @abc.abstractmethod
+    def load_range(self, session_id: str, kind: str, start: int, end: int) -> List[Dict]:
+        """순번 start 이상 end 미만 항목 (오래된 것부터)"""
+
+    def load_recent(self, session_id: str, kind: str, limit: int) -> List[Dict]:
+        total = self.count(session_id, kind)
+        return self.load_range(session_id, kind, max(total - limit, 0), total)
+
+    @abc.abstractmethod
+    def save_meta(self, session_id: str, meta: Dict) -> None:
+        """주제, 입장 같은 세션 설정 저장 (덮어쓰기)"""
+
+    @abc.abstractmethod
+    def load_meta(self, session_id: str) -> Optional[Dict]:
+        """저장한 세션 설정 (없으면 None)"""
+
+
+class MemorySessionStore(SessionStore):
+    """프로세스 메모리 저장소 (재시작하면 사라짐, 개발/테스트용)"""
+
+    def __init__(self):
+        self._items = {}  # (세션, 종류) -> 항목 목록
+        self._meta = {}
+        self._lock = threading.Lock()
+
+    def append(self, session_id: str, kind: str, item: Dict) -> int:
+        with self._lock:
+            items = self._items.setdefault((session_id, kind), [])
+            items.append(dict(item))
+            return len(items) - 1
+
+    def replace(self, session_id: str, kind: str, seq: int, item: Dict) -> None:
+        with self._lock:
+            items = self._items.get((session_id, kind), [])
+            if 0 <= seq < len(items):
+                items[seq] = dict(item)
+
+    def count(self, session_id: str, kind: str) -> int:
+        with self._lock:
+            return len(self._items.get((session_id, kind), ()))
+
+    def load_range(self, session_id: str, kind: str, start: int, end: int) -> List[Dict]:
+        with self._lock:
+            return [dict(item) for item in self._items.get((session_id, kind), [])[start:end]]
+
+    def save_meta(self, session_id: str, meta: Dict) -> None:
+        with self._lock:
+            self._meta[session_id] = dict(meta)
+
+    def load_meta(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            meta = self._meta.get(session_id)
+            return dict(meta) if meta is not None else None
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite(WAL) 덧붙이기 위주 저장소 (서버를 재시작해도 세션 ID로 이어서 진행)"""
+
+    def __init__(self, path: str = SESSION_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = open_sqlite(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS session_items ("
+            " session_id TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " item TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (session_id, kind, seq))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " meta TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def append(self, session_id: str, kind: str, item: Dict) -> int:
+        with self._lock:
+            # 순번 계산과 삽입을 한 문장으로 처리해 여러 프로세스가 같은 파일을 써도 순번이 겹치지 않음
+            cursor = self._db.execute(
+                "INSERT INTO session_items (session_id, kind, seq, item, created_at) "
+                "SELECT ?, ?, COALESCE(MAX(seq), -1) + 1, ?, ? FROM session_items WHERE session_id = ? AND kind = ? "
+                "RETURNING seq",
+                (session_id, kind, json.dumps(item, ensure_ascii=False), time.time(), session_id, kind)
+            )
+            seq = cursor.fetchone()[0]
+            self._db.commit()
+            return seq
+
+    def replace(self, session_id: str, kind: str, seq: int, item: Dict) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE session_items SET item = ? WHERE session_id = ? AND kind = ? AND seq = ?",
+                (json.dumps(item, ensure_ascii=False), session_id, kind, seq)
+            )
+            self._db.commit()
+
+    def count(self, session_id: str, kind: str) -> int:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM session_items WHERE session_id = ? AND kind = ?",
+                (session_id, kind)
+            ).fetchone()
+        return row[0]
+
+    def load_range(self, session_id: str, kind: str, start: int, end: int) -> List[Dict]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT item FROM session_items WHERE session_id = ? AND kind = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session_id, kind, start, end)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def save_meta(self, session_id: str, meta: Dict) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, meta, updated_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(meta, ensure_ascii=False), time.time())
+            )
+            self._db.commit()
+
+    def load_meta(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute("SELECT meta FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+# 저장소 생성
+def create_session_store(kind: str = SESSION_STORE, path: str = SESSION_DB_PATH) -> SessionStore:
+    """SESSION_STORE 설정에 맞는 저장소 생성"""
+    if kind == 'memory':
+        return MemorySessionStore()
+    if kind == 'sqlite':
+        return SQLiteSessionStore(path)
+    raise ValueError(f"알 수 없는 SESSION_STORE: {kind}")
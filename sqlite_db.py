@@ -0,0 +1,21 @@
+import os
+import sqlite3
+
+# 여러 프로세스(앱, 서비스 워커, 배치)가 같은 파일을 쓸 때 쓰기 잠금을 기다릴 최대 시간(초)
+SQLITE_BUSY_TIMEOUT = float(os.environ.get("SQLITE_BUSY_TIMEOUT", 30))
+
+
+def open_sqlite(path: str) -> sqlite3.Connection:
+    """저장소/캐시가 함께 쓰는 SQLite 연결 (WAL, synchronous=NORMAL, 상위 디렉터리 생성)
+
+    Streamlit 세션이나 서비스 요청마다 다른 스레드에서 호출되므로 스레드 공유를 허용한다.
+    연결을 쓰는 쪽이 자기 잠금으로 호출을 직렬화해야 한다.
+    """
+    if path != ':memory:':
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False, timeout=SQLITE_BUSY_TIMEOUT)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db